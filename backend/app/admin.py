@@ -0,0 +1,90 @@
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from fastapi.responses import PlainTextResponse
+import asyncio
+import os
+import logging
+from .api_v1 import get_current_user
+from .models import User
+from . import job_ingest
+from .tasks import ingest_jobs
+from .utils.profiler import SamplingProfiler
+from .utils.memory import tracemalloc_session, rss_bytes
+
+router = APIRouter(prefix="/v1/admin", tags=["Admin"])
+logger = logging.getLogger(__name__)
+
+# Comma-separated emails allowed to use the admin endpoints
+ADMIN_EMAILS = {email.strip().lower() for email in os.getenv("ADMIN_EMAILS", "").split(",") if email.strip()}
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "60"))
+
+# One profile per process at a time
+_profile_lock = asyncio.Lock()
+
+async def require_admin(current_user: User = Depends(get_current_user)) -> User:
+    if not current_user.email or current_user.email.lower() not in ADMIN_EMAILS:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return current_user
+
+@router.post("/profile", response_class=PlainTextResponse)
+async def profile_worker(
+    seconds: float = Query(10, gt=0),
+    interval_ms: float = Query(5, ge=1, le=1000),
+    admin: User = Depends(require_admin)
+):
+    """Sample every thread of this worker process and return collapsed stacks for a flamegraph"""
+    if seconds > PROFILE_MAX_SECONDS:
+        raise HTTPException(status_code=400, detail=f"Profiles are limited to {PROFILE_MAX_SECONDS:g} seconds")
+    if _profile_lock.locked():
+        raise HTTPException(status_code=409, detail="A profile is already running on this worker")
+    async with _profile_lock:
+        logger.info(f"Profiling worker {os.getpid()} for {seconds}s at {interval_ms}ms, requested by {admin.email}")
+        profiler = SamplingProfiler(interval=interval_ms / 1000)
+        await asyncio.to_thread(profiler.run, seconds)
+    return PlainTextResponse(
+        profiler.collapsed(),
+        headers={"Content-Disposition": f'attachment; filename="profile-{os.getpid()}.collapsed"'}
+    )
+
+@router.post("/tracemalloc/start")
+async def start_tracemalloc(frames: int = Query(10, ge=1, le=64), admin: User = Depends(require_admin)):
+    """Start tracing allocations on this worker; the current state becomes the diff baseline"""
+    tracemalloc_session.start(frames)
+    logger.info(f"tracemalloc started on worker {os.getpid()} by {admin.email}")
+    return {"status": "tracing", "pid": os.getpid(), "rss_bytes": rss_bytes()}
+
+@router.get("/tracemalloc/snapshot")
+async def tracemalloc_snapshot(
+    limit: int = Query(20, ge=1, le=200),
+    key_type: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+    admin: User = Depends(require_admin)
+):
+    """Top allocation sites by growth since the previous snapshot"""
+    if not tracemalloc_session.active:
+        raise HTTPException(status_code=409, detail="tracemalloc is not running; start it first")
+    report = await asyncio.to_thread(tracemalloc_session.diff, limit, key_type)
+    return {"pid": os.getpid(), **report}
+
+@router.post("/tracemalloc/stop")
+async def stop_tracemalloc(admin: User = Depends(require_admin)):
+    tracemalloc_session.stop()
+    return {"status": "stopped", "pid": os.getpid(), "rss_bytes": rss_bytes()}
+
+@router.post("/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def ingest_job_feed(file: UploadFile = File(...), admin: User = Depends(require_admin)):
+    """Queue a JSONL job feed ({"title", "description"} per line) for ingestion on the bulk queue"""
+    errors = []
+
+    def queue_batches():
+        lines = (line.decode("utf-8", errors="replace") for line in file.file)
+        postings = job_ingest.read_postings(lines, errors)
+        batches = queued = 0
+        # Postings go to the shared staging dir; each message only names its file
+        for path, size in job_ingest.stage_batches(postings):
+            ingest_jobs.delay(path)
+            batches += 1
+            queued += size
+        return batches, queued
+
+    batches, queued = await asyncio.to_thread(queue_batches)
+    logger.info(f"Job feed {file.filename}: {queued} postings in {batches} batches, queued by {admin.email}")
+    return {"postings": queued, "batches": batches, "invalid": len(errors), "errors": errors[:100]}
@@ -1,35 +1,40 @@
 from fastapi import APIRouter, UploadFile, File, BackgroundTasks, HTTPException, status, Request, Response, Depends, Cookie
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+import asyncio
 import os
 import uuid
-from .tasks import process_pdf
-from PyPDF2 import PdfReader
+import zipfile
+from .tasks import process_pdf, recommend_jobs
+from .celery_queues import PRIORITY_INTERACTIVE
+from .events import event_broker, sse_message, EVENT_KEEPALIVE_SECONDS
+from . import bulk_import
 from authlib.integrations.starlette_client import OAuth
 from starlette.config import Config
 from sqlalchemy.ext.asyncio import AsyncSession
-from .db import get_db
-from .models import User, Resume, Job, Match
+from .db import get_db, get_read_db
+from . import queries
+from .models import User, Resume, ResumeStatus, Job, Match, ImportJob, ImportItem
 from jose import jwt, JWTError
 from datetime import datetime, timedelta
 from app.utils.pdf_sanitizer import sanitize_pdf
+from app.utils.pdf_validation import validate_pdf_bytes
 import logging
-from fastapi_limiter.depends import RateLimiter
-from passlib.context import CryptContext
-from sqlalchemy import select, update, delete
+from .rate_limiter import RateLimit
+from sqlalchemy import update, delete, insert
 from typing import List, Optional
-from .utils.resume_parser import resume_parser
+from .utils.resume_parser import get_resume_parser
 from .utils.job_parser import parse_job_description
-from .utils.skills_matcher import skills_matcher
+from .utils.skills_matcher import get_skills_matcher
+from .utils.stage_timer import stage, collect_timings, server_timing_header
+from .utils.password_hashing import hash_password, verify_password, PasswordHasherBusy
 import json
 
 router = APIRouter(prefix="/v1", tags=["Resumes"])
+logger = logging.getLogger(__name__)
 
 UPLOAD_DIR = os.getenv("UPLOAD_DIR", "./uploads")
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-MAX_PDF_PAGES = 20
-MAX_TEXT_SIZE = 50 * 1024  # 50KB
-
 config = Config('.env')
 oauth = OAuth(config)
 
@@ -46,8 +51,6 @@ JWT_ALGORITHM = 'HS256'
 JWT_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
 REFRESH_TOKEN_EXPIRE_DAYS = 30
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 def create_jwt(user, is_refresh_token=False):
     expire_minutes = REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 if is_refresh_token else JWT_EXPIRE_MINUTES
     payload = {
@@ -83,7 +86,7 @@ async def get_current_user(
             raise HTTPException(status_code=401, detail="Invalid token payload")
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
-    result = await db.execute(select(User).where(User.id == int(user_id)))
+    result = await db.execute(queries.user_by_id, {"user_id": int(user_id)})
     user = result.scalar_one_or_none()
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
@@ -98,10 +101,19 @@ async def login_user(request: Request, db: AsyncSession = Depends(get_db)):
     if not email or not password:
         raise HTTPException(status_code=400, detail="Email and password are required")
     
-    result = await db.execute(select(User).where(User.email == email))
+    result = await db.execute(queries.user_by_email, {"email": email})
     user = result.scalar_one_or_none()
-    if not user or not pwd_context.verify(password, user.password_hash):
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    try:
+        valid, new_hash = await verify_password(password, user.password_hash)
+    except PasswordHasherBusy:
+        raise HTTPException(status_code=503, detail="Login temporarily unavailable", headers={"Retry-After": "5"})
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        user.password_hash = new_hash
+        await db.commit()
     
     access_token = create_jwt(user)
     refresh_token = create_jwt(user, is_refresh_token=True)
@@ -137,7 +149,7 @@ async def refresh_token(request: Request, db: AsyncSession = Depends(get_db)):
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid refresh token")
     
-    result = await db.execute(select(User).where(User.id == int(user_id)))
+    result = await db.execute(queries.user_by_id, {"user_id": int(user_id)})
     user = result.scalar_one_or_none()
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
@@ -199,7 +211,7 @@ async def update_profile(
     }
 
 # OAuth endpoints
-@router.get('/auth/google/login', dependencies=[Depends(RateLimiter(times=10, seconds=60))])
+@router.get('/auth/google/login', dependencies=[Depends(RateLimit(times=10, seconds=60))])
 async def google_login(request: Request):
     redirect_uri = os.getenv('OAUTH_REDIRECT_URI', 'http://localhost:3000/login')
     return await oauth.google.authorize_redirect(request, redirect_uri)
@@ -209,7 +221,7 @@ async def google_callback(request: Request, db: AsyncSession = Depends(get_db)):
     token = await oauth.google.authorize_access_token(request)
     user_info = await oauth.google.parse_id_token(request, token)
     
-    result = await db.execute(select(User).where(User.email == user_info['email']))
+    result = await db.execute(queries.user_by_email, {"email": user_info['email']})
     user = result.scalar_one_or_none()
     if not user:
         user = User(
@@ -231,7 +243,7 @@ async def google_callback(request: Request, db: AsyncSession = Depends(get_db)):
     return Response(status_code=302, headers={"Location": redirect_url})
 
 # Resume endpoints
-@router.post("/resumes", status_code=status.HTTP_202_ACCEPTED, dependencies=[Depends(RateLimiter(times=5, seconds=60))])
+@router.post("/resumes", status_code=status.HTTP_202_ACCEPTED, dependencies=[Depends(RateLimit(times=5, seconds=60))])
 async def upload_resume(
     file: UploadFile = File(...),
     current_user: User = Depends(get_current_user),
@@ -248,24 +260,7 @@ async def upload_resume(
     file_bytes = first_bytes + await file.read()
     # Structural validation and sanitization
     try:
-        from io import BytesIO
-        pdf = PdfReader(BytesIO(file_bytes))
-        num_pages = len(pdf.pages)
-        if num_pages > MAX_PDF_PAGES:
-            raise HTTPException(status_code=400, detail=f"PDF exceeds max page limit of {MAX_PDF_PAGES}")
-        # Extract text, limit to 50KB
-        extracted_text = ""
-        for page in pdf.pages:
-            if len(extracted_text) > MAX_TEXT_SIZE:
-                break
-            extracted_text += page.extract_text() or ""
-        if len(extracted_text.encode('utf-8')) > MAX_TEXT_SIZE:
-            raise HTTPException(status_code=400, detail="PDF text content exceeds 50KB limit")
-        # Check for JavaScript or embedded files (basic check)
-        if "/JavaScript" in str(pdf) or "/JS" in str(pdf):
-            raise HTTPException(status_code=400, detail="PDF contains JavaScript, which is not allowed")
-        if any("/EmbeddedFile" in str(obj) for obj in pdf.pages):
-            raise HTTPException(status_code=400, detail="PDF contains embedded files, which are not allowed")
+        validate_pdf_bytes(file_bytes)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"PDF parsing failed: {str(e)}")
     # Save file to disk
@@ -293,43 +288,157 @@ async def upload_resume(
     db.add(resume)
     await db.commit()
     
-    # Queue Celery task
-    process_pdf.delay(resume_id, file_path)
+    # A user is waiting on this one: keep it off the queues bulk backfills use
+    # Matches are computed as soon as the skills are stored (links run without a result backend)
+    recommend = recommend_jobs.si([resume_id], current_user.id).set(queue="interactive", priority=PRIORITY_INTERACTIVE)
+    process_pdf.apply_async((resume_id, file_path, current_user.id), queue="interactive", priority=PRIORITY_INTERACTIVE,
+                            link=recommend)
     return JSONResponse(
         status_code=status.HTTP_202_ACCEPTED,
-        content={"message": "Resume upload accepted for processing", "resume_id": resume_id}
+        content={"message": "Resume upload accepted for processing", "resume_id": resume_id,
+                 "status": ResumeStatus.queued.value}
     )
 
-@router.get("/resumes", dependencies=[Depends(RateLimiter(times=10, seconds=60))])
-async def get_resumes(
+@router.get("/resumes/{resume_id}/status", dependencies=[Depends(RateLimit(times=60, seconds=60))])
+async def get_resume_status(
+    resume_id: str,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Cheap processing-status poll: one indexed row, no matches"""
+    result = await db.execute(
+        queries.resume_status_for_user, {"resume_id": resume_id, "user_id": current_user.id}
+    )
+    row = result.one_or_none()
+    if not row:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    return {
+        "id": resume_id,
+        "status": row.status.value,
+        "skills": row.skills if row.status == ResumeStatus.ready else None,
+        "error": row.error,
+        "processed_at": row.processed_at,
+    }
+
+@router.post("/imports", status_code=status.HTTP_202_ACCEPTED, dependencies=[Depends(RateLimit(times=2, seconds=60))])
+async def create_import(
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Bulk-import the PDFs in a zip archive; progress via GET /v1/imports/{id} or /v1/events"""
+    # Starlette spools large uploads to disk, so the archive is never held in memory
+    try:
+        staged, skipped = await asyncio.to_thread(bulk_import.stage_zip, file.file, UPLOAD_DIR)
+    except (zipfile.BadZipFile, bulk_import.ImportTooLarge) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid import archive: {e}")
+    if not staged:
+        raise HTTPException(status_code=400, detail="Archive contains no PDFs")
+    import_id = uuid.uuid4().hex
+    job, items = bulk_import.import_statements(import_id, current_user.id, f"zip:{file.filename}", staged)
+    try:
+        await db.execute(job)
+        await db.execute(insert(ImportItem), items)
+        await db.commit()
+    except Exception:
+        await asyncio.to_thread(bulk_import.discard_staged, staged)
+        raise
+    item_ids = list((await db.execute(bulk_import.unfinished_items(import_id))).scalars())
+    bulk_import.enqueue(import_id, item_ids)
+    return {"import_id": import_id, "total": len(staged), "skipped": skipped}
+
+@router.get("/imports/{import_id}", dependencies=[Depends(RateLimit(times=60, seconds=60))])
+async def get_import(
+    import_id: str,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
+):
+    job = await db.get(ImportJob, import_id)
+    if job is None or job.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Import not found")
+    failures = (await db.execute(bulk_import.failed_items(import_id))).all()
+    return {
+        **bulk_import.import_summary(job),
+        "errors": [{"filename": filename, "error": error} for filename, error in failures],
+    }
+
+@router.post("/imports/{import_id}/resume", dependencies=[Depends(RateLimit(times=5, seconds=60))])
+async def resume_import(
+    import_id: str,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Re-queue the files an interrupted import has not finished"""
+    job = await db.get(ImportJob, import_id)
+    if job is None or job.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Import not found")
+    item_ids = list((await db.execute(bulk_import.unfinished_items(import_id))).scalars())
+    return {"import_id": import_id, "requeued": len(item_ids), "chunks": bulk_import.enqueue(import_id, item_ids)}
+
+@router.get("/events", dependencies=[Depends(RateLimit(times=10, seconds=60))])
+async def events(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Server-sent events for the current user: a `resume` event with the status
+    (and, once ready, the skills) each time one of their resumes changes.
+    """
+    user_id = current_user.id
+    # The stream outlives the request's dependencies; don't pin a pooled DB connection to it
+    await db.close()
+    queue = await event_broker.subscribe(user_id)
+
+    async def stream():
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    data = await asyncio.wait_for(queue.get(), EVENT_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield sse_message(data, event="resume")
+        finally:
+            await event_broker.unsubscribe(user_id, queue)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/resumes", dependencies=[Depends(RateLimit(times=10, seconds=60))])
+async def get_resumes(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     result = await db.execute(
-        select(Resume).where(Resume.user_id == current_user.id).order_by(Resume.uploaded_at.desc())
+        queries.resumes_for_user, {"user_id": current_user.id}
     )
-    resumes = result.scalars().all()
     return {
         "resumes": [
             {
                 "id": resume.id,
                 "filename": resume.filename,
                 "skills": resume.skills,
+                "status": resume.status.value,
                 "uploaded_at": resume.uploaded_at,
-                "matches_count": len(resume.matches)
+                "matches_count": matches_count
             }
-            for resume in resumes
+            for resume, matches_count in result.all()
         ]
     }
 
-@router.get("/resumes/{resume_id}", dependencies=[Depends(RateLimiter(times=10, seconds=60))])
+@router.get("/resumes/{resume_id}", dependencies=[Depends(RateLimit(times=10, seconds=60))])
 async def get_resume(
     resume_id: str,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     result = await db.execute(
-        select(Resume).where(Resume.id == resume_id, Resume.user_id == current_user.id)
+        queries.resume_detail_for_user, {"resume_id": resume_id, "user_id": current_user.id}
     )
     resume = result.scalar_one_or_none()
     if not resume:
@@ -340,7 +449,10 @@ async def get_resume(
             "id": resume.id,
             "filename": resume.filename,
             "skills": resume.skills,
+            "status": resume.status.value,
+            "error": resume.error,
             "uploaded_at": resume.uploaded_at,
+            "processed_at": resume.processed_at,
             "matches": [
                 {
                     "id": match.id,
@@ -353,14 +465,14 @@ async def get_resume(
         }
     }
 
-@router.delete("/resumes/{resume_id}", dependencies=[Depends(RateLimiter(times=5, seconds=60))])
+@router.delete("/resumes/{resume_id}", dependencies=[Depends(RateLimit(times=5, seconds=60))])
 async def delete_resume(
     resume_id: str,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     result = await db.execute(
-        select(Resume).where(Resume.id == resume_id, Resume.user_id == current_user.id)
+        queries.resume_for_user, {"resume_id": resume_id, "user_id": current_user.id}
     )
     resume = result.scalar_one_or_none()
     if not resume:
@@ -372,45 +484,66 @@ async def delete_resume(
         os.remove(file_path)
     
     # Delete from database
+    await db.execute(delete(Match).where(Match.resume_id == resume_id))
     await db.execute(delete(Resume).where(Resume.id == resume_id))
     await db.commit()
     
     return {"message": "Resume deleted successfully"}
 
 # Job matching endpoints
-@router.get("/matches", dependencies=[Depends(RateLimiter(times=10, seconds=60))])
-async def get_matches(
+@router.post("/resumes/{resume_id}/matches", status_code=status.HTTP_202_ACCEPTED,
+             dependencies=[Depends(RateLimit(times=5, seconds=60))])
+async def refresh_matches(
+    resume_id: str,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
+    """Recompute a resume's top jobs (e.g. after new postings); the result arrives as a resume.matches event"""
     result = await db.execute(
-        select(Match)
-        .join(Resume)
-        .where(Resume.user_id == current_user.id)
-        .order_by(Match.score.desc())
+        queries.resume_status_for_user, {"resume_id": resume_id, "user_id": current_user.id}
     )
-    matches = result.scalars().all()
+    row = result.one_or_none()
+    if not row:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    if row.status != ResumeStatus.ready:
+        raise HTTPException(status_code=409, detail="Resume has not been processed yet")
+    recommend_jobs.apply_async(([resume_id], current_user.id), queue="interactive", priority=PRIORITY_INTERACTIVE)
+    return {"resume_id": resume_id, "status": "queued"}
+
+@router.get("/matches", dependencies=[Depends(RateLimit(times=10, seconds=60))])
+async def get_matches(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    result = await db.execute(queries.matches_for_user, {"user_id": current_user.id})
     
     return {
         "matches": [
             {
                 "id": match.id,
-                "resume_filename": match.resume.filename,
-                "job_title": match.job.title,
+                "resume_filename": match.filename,
+                "job_title": match.title,
                 "score": match.score,
                 "created_at": match.created_at
             }
-            for match in matches
+            for match in result.all()
         ]
     }
 
-@router.post("/analyze", dependencies=[Depends(RateLimiter(times=5, seconds=60))])
+@router.post("/analyze", dependencies=[Depends(RateLimit(times=5, seconds=60))])
 async def analyze_resume(
     request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Analyze a resume against a job description and return match scores"""
+    with collect_timings() as timings:
+        analysis_result = await _analyze_resume(request, current_user, db)
+    response.headers["Server-Timing"] = server_timing_header(timings)
+    return analysis_result
+
+async def _analyze_resume(request: Request, current_user: User, db: AsyncSession):
     try:
         data = await request.json()
         resume_id = data.get('resume_id')
@@ -420,9 +553,10 @@ async def analyze_resume(
             raise HTTPException(status_code=400, detail="resume_id and job_description are required")
         
         # Get resume from database
-        result = await db.execute(
-            select(Resume).where(Resume.id == resume_id, Resume.user_id == current_user.id)
-        )
+        with stage("db"):
+            result = await db.execute(
+                queries.resume_for_user, {"resume_id": resume_id, "user_id": current_user.id}
+            )
         resume = result.scalar_one_or_none()
         if not resume:
             raise HTTPException(status_code=404, detail="Resume not found")
@@ -433,19 +567,19 @@ async def analyze_resume(
             raise HTTPException(status_code=404, detail="Resume file not found")
         
         # Parse resume using AI pipeline
-        resume_analysis = resume_parser.parse_resume(resume_file_path)
+        resume_analysis = get_resume_parser().parse_resume(resume_file_path)
         
         # Parse job description
         job_analysis = parse_job_description(job_description)
         
         # Calculate match scores
-        match_results = skills_matcher.calculate_overall_match_score(
+        match_results = get_skills_matcher().calculate_overall_match_score(
             resume_analysis, 
             job_analysis
         )
         
         # Get detailed skill matching
-        detailed_matching = skills_matcher.get_detailed_matching(
+        detailed_matching = get_skills_matcher().get_detailed_matching(
             resume_analysis.get('skills', []),
             job_analysis.get('skills', [])
         )
@@ -453,7 +587,8 @@ async def analyze_resume(
         # Update resume with extracted skills if not already set
         if not resume.skills:
             resume.skills = resume_analysis.get('skills', [])
-            await db.commit()
+            with stage("db"):
+                await db.commit()
         
         # Create analysis result
         analysis_result = {
@@ -493,6 +628,8 @@ async def analyze_resume(
         
         return analysis_result
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in resume analysis: {e}")
         raise HTTPException(status_code=500, detail="Analysis failed")
@@ -540,13 +677,20 @@ def _generate_recommendations(detailed_matching, match_results, resume_analysis,
     
     return recommendations
 
-@router.post("/analyze/batch", dependencies=[Depends(RateLimiter(times=3, seconds=60))])
+@router.post("/analyze/batch", dependencies=[Depends(RateLimit(times=3, seconds=60))])
 async def analyze_multiple_jobs(
     request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Analyze a resume against multiple job descriptions"""
+    with collect_timings() as timings:
+        batch_result = await _analyze_multiple_jobs(request, current_user, db)
+    response.headers["Server-Timing"] = server_timing_header(timings)
+    return batch_result
+
+async def _analyze_multiple_jobs(request: Request, current_user: User, db: AsyncSession):
     try:
         data = await request.json()
         resume_id = data.get('resume_id')
@@ -559,9 +703,10 @@ async def analyze_multiple_jobs(
             raise HTTPException(status_code=400, detail="Maximum 10 job descriptions allowed per request")
         
         # Get resume
-        result = await db.execute(
-            select(Resume).where(Resume.id == resume_id, Resume.user_id == current_user.id)
-        )
+        with stage("db"):
+            result = await db.execute(
+                queries.resume_for_user, {"resume_id": resume_id, "user_id": current_user.id}
+            )
         resume = result.scalar_one_or_none()
         if not resume:
             raise HTTPException(status_code=404, detail="Resume not found")
@@ -571,14 +716,14 @@ async def analyze_multiple_jobs(
         if not os.path.exists(resume_file_path):
             raise HTTPException(status_code=404, detail="Resume file not found")
         
-        resume_analysis = resume_parser.parse_resume(resume_file_path)
+        resume_analysis = get_resume_parser().parse_resume(resume_file_path)
         
         # Analyze against each job description
         results = []
         for i, job_desc in enumerate(job_descriptions):
             try:
                 job_analysis = parse_job_description(job_desc)
-                match_results = skills_matcher.calculate_overall_match_score(
+                match_results = get_skills_matcher().calculate_overall_match_score(
                     resume_analysis, 
                     job_analysis
                 )
@@ -607,6 +752,8 @@ async def analyze_multiple_jobs(
             "results": results
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in batch analysis: {e}")
         raise HTTPException(status_code=500, detail="Batch analysis failed")
@@ -621,11 +768,14 @@ async def register_user(request: Request, db: AsyncSession = Depends(get_db)):
     if not all([name, email, password]):
         raise HTTPException(status_code=400, detail="Name, email, and password are required.")
     
-    result = await db.execute(select(User).where(User.email == email))
+    result = await db.execute(queries.user_by_email, {"email": email})
     if result.scalar_one_or_none():
         raise HTTPException(status_code=400, detail="Email already registered.")
     
-    password_hash = pwd_context.hash(password)
+    try:
+        password_hash = await hash_password(password)
+    except PasswordHasherBusy:
+        raise HTTPException(status_code=503, detail="Registration temporarily unavailable", headers={"Retry-After": "5"})
     user = User(name=name, email=email, provider='email', password_hash=password_hash)
     db.add(user)
     await db.commit()
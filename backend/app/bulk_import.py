@@ -0,0 +1,242 @@
+"""
+Bulk resume import from a zip archive (POST /v1/imports) or a local directory (CLI).
+
+Files are staged into UPLOAD_DIR under their final resume file names and
+recorded as ImportItems, then processed in chunks of IMPORT_CHUNK_SIZE by a
+Celery chain per chunk: sanitize (io queue) -> parse and bulk-insert ->
+recommend jobs (bulk queue, lowest priority). Parallelism is bounded by those queues' worker pools,
+and interactive uploads never wait behind an import.
+
+Every step only touches items in the status it expects, so after a crash
+`resume` re-queues whatever is unfinished without redoing finished files:
+
+    python -m app.bulk_import import ./resumes --user-email recruiter@example.com
+    python -m app.bulk_import status <import_id>
+    python -m app.bulk_import resume <import_id>
+"""
+import os
+import sys
+import uuid
+import shutil
+import zipfile
+import argparse
+import logging
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Tuple
+
+from celery import chain, group
+from sqlalchemy import insert, select
+
+from .celery_queues import PRIORITY_BULK
+from .models import ImportJob, ImportItem, ImportItemStatus, ImportStatus, User
+from .tasks import import_sanitize_chunk, import_parse_chunk, recommend_jobs
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "./uploads")
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "25"))
+IMPORT_MAX_FILES = int(os.getenv("IMPORT_MAX_FILES", "10000"))
+IMPORT_MAX_FILE_BYTES = int(os.getenv("IMPORT_MAX_FILE_BYTES", str(10 * 1024 * 1024)))
+# Cap on the archive's total uncompressed size (zip bombs)
+IMPORT_MAX_TOTAL_BYTES = int(os.getenv("IMPORT_MAX_TOTAL_BYTES", str(2 * 1024 ** 3)))
+
+Staged = List[Dict]
+Skipped = List[Dict]
+
+
+class ImportTooLarge(ValueError):
+    pass
+
+
+def _stage_target(upload_dir: str, name: str) -> Dict:
+    resume_id = uuid.uuid4().hex
+    basename = os.path.basename(name.replace("\\", "/"))
+    return {"filename": name, "resume_id": resume_id, "path": os.path.join(upload_dir, f"{resume_id}_{basename}")}
+
+
+def _is_candidate(name: str) -> bool:
+    parts = name.replace("\\", "/").split("/")
+    return name.lower().endswith(".pdf") and not any(p.startswith(".") or p == "__MACOSX" for p in parts)
+
+
+def stage_zip(fileobj: BinaryIO, upload_dir: str = UPLOAD_DIR) -> Tuple[Staged, Skipped]:
+    """Extract the archive's PDFs into `upload_dir`; other entries are skipped with a reason"""
+    staged, skipped, total_bytes = [], [], 0
+    try:
+        with zipfile.ZipFile(fileobj) as archive:
+            for info in archive.infolist():
+                if info.is_dir():
+                    continue
+                if not _is_candidate(info.filename):
+                    skipped.append({"filename": info.filename, "reason": "not a PDF"})
+                    continue
+                if info.file_size > IMPORT_MAX_FILE_BYTES:
+                    skipped.append({"filename": info.filename, "reason": f"larger than {IMPORT_MAX_FILE_BYTES} bytes"})
+                    continue
+                if len(staged) >= IMPORT_MAX_FILES:
+                    raise ImportTooLarge(f"Archive has more than {IMPORT_MAX_FILES} PDFs")
+                total_bytes += info.file_size
+                if total_bytes > IMPORT_MAX_TOTAL_BYTES:
+                    raise ImportTooLarge(f"Archive expands to more than {IMPORT_MAX_TOTAL_BYTES} bytes")
+                target = _stage_target(upload_dir, info.filename)
+                # The declared size can lie; never write more than the cap
+                with archive.open(info) as source:
+                    data = source.read(IMPORT_MAX_FILE_BYTES + 1)
+                if len(data) > IMPORT_MAX_FILE_BYTES:
+                    skipped.append({"filename": info.filename, "reason": f"larger than {IMPORT_MAX_FILE_BYTES} bytes"})
+                    continue
+                staged.append(target)
+                with open(target["path"], "wb") as f:
+                    f.write(data)
+    except BaseException:
+        # A rejected or corrupt archive leaves nothing behind in the upload dir
+        discard_staged(staged)
+        raise
+    return staged, skipped
+
+
+def stage_directory(directory: Path, upload_dir: str = UPLOAD_DIR) -> Tuple[Staged, Skipped]:
+    staged, skipped = [], []
+    try:
+        for path in sorted(Path(directory).rglob("*")):
+            name = str(path.relative_to(directory))
+            if not path.is_file():
+                continue
+            if not _is_candidate(name):
+                skipped.append({"filename": name, "reason": "not a PDF"})
+            elif path.stat().st_size > IMPORT_MAX_FILE_BYTES:
+                skipped.append({"filename": name, "reason": f"larger than {IMPORT_MAX_FILE_BYTES} bytes"})
+            elif len(staged) >= IMPORT_MAX_FILES:
+                raise ImportTooLarge(f"Directory has more than {IMPORT_MAX_FILES} PDFs")
+            else:
+                target = _stage_target(upload_dir, name)
+                staged.append(target)
+                shutil.copyfile(path, target["path"])
+    except BaseException:
+        discard_staged(staged)
+        raise
+    return staged, skipped
+
+
+def discard_staged(staged: Staged):
+    for item in staged:
+        try:
+            os.remove(item["path"])
+        except OSError:
+            pass
+
+
+def import_statements(import_id: str, user_id: int, source: str, staged: Staged):
+    """INSERTs for the job and (multi-row) its items; run them in one transaction"""
+    job = insert(ImportJob).values(
+        id=import_id, user_id=user_id, source=source, status=ImportStatus.running, total=len(staged),
+        succeeded=0, failed=0,
+    )
+    items = [{**item, "import_id": import_id, "status": ImportItemStatus.pending} for item in staged]
+    return job, items
+
+
+def unfinished_items(import_id: str):
+    return select(ImportItem.id).where(
+        ImportItem.import_id == import_id,
+        ImportItem.status.in_([ImportItemStatus.pending, ImportItemStatus.sanitized]),
+    ).order_by(ImportItem.id)
+
+
+def enqueue(import_id: str, item_ids: List[int]) -> int:
+    """Queue one sanitize -> parse -> recommend chain per chunk; returns the number of chunks"""
+    chunks = [item_ids[i:i + IMPORT_CHUNK_SIZE] for i in range(0, len(item_ids), IMPORT_CHUNK_SIZE)]
+    if chunks:
+        group(
+            chain(
+                import_sanitize_chunk.si(import_id, chunk).set(queue="io", priority=PRIORITY_BULK),
+                import_parse_chunk.s(import_id).set(queue="bulk", priority=PRIORITY_BULK),
+                recommend_jobs.s().set(queue="bulk", priority=PRIORITY_BULK),
+            )
+            for chunk in chunks
+        ).apply_async()
+    return len(chunks)
+
+
+def import_summary(job: ImportJob) -> Dict:
+    return {
+        "import_id": job.id,
+        "status": job.status.value,
+        "source": job.source,
+        "total": job.total,
+        "succeeded": job.succeeded,
+        "failed": job.failed,
+        "remaining": job.total - job.succeeded - job.failed,
+        "created_at": job.created_at,
+        "finished_at": job.finished_at,
+    }
+
+
+def failed_items(import_id: str, limit: int = 200):
+    return select(ImportItem.filename, ImportItem.error).where(
+        ImportItem.import_id == import_id, ImportItem.status == ImportItemStatus.failed,
+    ).order_by(ImportItem.id).limit(limit)
+
+
+def run_import(session, directory: Path, user_email: str) -> Dict:
+    user = session.execute(select(User).where(User.email == user_email)).scalar_one_or_none()
+    if user is None:
+        raise SystemExit(f"No user with email {user_email}")
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    staged, skipped = stage_directory(directory)
+    import_id = uuid.uuid4().hex
+    job, items = import_statements(import_id, user.id, f"directory:{directory}", staged)
+    try:
+        session.execute(job)
+        if items:
+            session.execute(insert(ImportItem), items)
+        session.commit()
+    except Exception:
+        discard_staged(staged)
+        raise
+    chunks = enqueue(import_id, list(session.execute(unfinished_items(import_id)).scalars()))
+    return {"import_id": import_id, "staged": len(staged), "skipped": skipped, "chunks": chunks}
+
+
+def resume_import(session, import_id: str) -> int:
+    """Re-queue everything not yet finished (e.g. after a broker or worker crash)"""
+    job = session.get(ImportJob, import_id)
+    if job is None:
+        raise SystemExit(f"No import {import_id}")
+    return enqueue(import_id, list(session.execute(unfinished_items(import_id)).scalars()))
+
+
+def main(argv=None) -> int:
+    from .db import cli_session
+
+    parser = argparse.ArgumentParser(description="Bulk-import resumes through the Celery pipeline")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("import", help="Import every PDF under a directory")
+    run.add_argument("directory", type=Path)
+    run.add_argument("--user-email", required=True, help="Owner of the imported resumes")
+    commands.add_parser("status").add_argument("import_id")
+    commands.add_parser("resume").add_argument("import_id")
+    args = parser.parse_args(argv)
+
+    with cli_session() as session:
+        if args.command == "import":
+            result = run_import(session, args.directory, args.user_email)
+            print(f"Import {result['import_id']}: {result['staged']} files queued in {result['chunks']} chunks")
+            for item in result["skipped"]:
+                print(f"  skipped {item['filename']}: {item['reason']}")
+        elif args.command == "resume":
+            print(f"Re-queued {resume_import(session, args.import_id)} chunks")
+        else:
+            job = session.get(ImportJob, args.import_id)
+            if job is None:
+                print(f"No import {args.import_id}")
+                return 1
+            for key, value in import_summary(job).items():
+                print(f"{key:<12} {value}")
+            for filename, error in session.execute(failed_items(args.import_id)).all():
+                print(f"  failed {filename}: {error}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
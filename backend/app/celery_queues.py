@@ -0,0 +1,140 @@
+"""
+Celery queue topology and per-queue worker profiles.
+
+Each queue gets its own worker pool so long ML jobs and bulk backfills never
+hold up interactive work. Start one worker per queue (or list several queues
+for one worker; they are drained in the order given):
+
+    ./start-worker.sh interactive
+    ./start-worker.sh ml
+    ./start-worker.sh bulk
+    ./start-worker.sh io
+"""
+import os
+import sys
+from typing import Dict, List, Tuple
+
+from kombu import Exchange, Queue
+
+from .utils import thread_budget
+
+# Redis emulates priorities with one list per step; 0 is consumed first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_DEFAULT = 5
+PRIORITY_BULK = 9
+PRIORITY_STEPS = list(range(10))
+
+# pool: prefork for CPU-bound model work, threads for I/O-bound work
+# prefetch: messages reserved per child; 1 so a long job never sits on queued ones
+# max_tasks_per_child: recycle model workers to bound fragmentation growth
+# target_latency: seconds a message may wait; drives desired workers (app.queue_metrics)
+# Override concurrency with CELERY_<QUEUE>_CONCURRENCY.
+QUEUE_PROFILES = {
+    "interactive": {
+        "target_latency": 5,
+        "pool": "prefork",
+        "concurrency": 2,
+        "prefetch": 1,
+        "max_tasks_per_child": 500,
+    },
+    "ml": {
+        "target_latency": 60,
+        "pool": "prefork",
+        "concurrency": None,  # one child per usable CPU
+        "prefetch": 1,
+        "max_tasks_per_child": 200,
+    },
+    "bulk": {
+        "target_latency": 3600,
+        "pool": "prefork",
+        "concurrency": 1,
+        "prefetch": 1,
+        "max_tasks_per_child": 200,
+    },
+    "io": {
+        "target_latency": 30,
+        "pool": "threads",
+        "concurrency": 8,
+        "prefetch": 4,
+        "max_tasks_per_child": None,
+    },
+}
+
+DEFAULT_QUEUE = "ml"
+
+# Task name -> queue. Callers override per call, e.g. bulk imports send
+# process_pdf with queue="bulk" so backfills stay off the ml workers.
+TASK_ROUTES = {
+    "process_pdf": {"queue": "ml"},
+    "ingest_jobs": {"queue": "bulk", "priority": PRIORITY_BULK},
+    "recommend_jobs": {"queue": "ml"},
+}
+
+
+def task_queues() -> List[Queue]:
+    exchange = Exchange("resumatch", type="direct")
+    return [Queue(name, exchange, routing_key=name) for name in QUEUE_PROFILES]
+
+
+def celery_queue_config() -> Dict:
+    return {
+        "task_queues": task_queues(),
+        "task_default_queue": DEFAULT_QUEUE,
+        "task_default_exchange": "resumatch",
+        "task_default_routing_key": DEFAULT_QUEUE,
+        "task_routes": TASK_ROUTES,
+        "task_default_priority": PRIORITY_DEFAULT,
+        # Acknowledge after the task finishes so a killed child's job is redelivered
+        "task_acks_late": True,
+        "task_reject_on_worker_lost": True,
+        "worker_prefetch_multiplier": int(os.getenv("CELERY_PREFETCH_MULTIPLIER", "1")),
+    }
+
+
+def broker_priority_options() -> Dict:
+    return {
+        "priority_steps": PRIORITY_STEPS,
+        # A worker on several queues drains them in the order it lists them
+        "queue_order_strategy": "priority",
+        # With acks_late, an unacked job is redelivered after this; keep it above the longest task
+        "visibility_timeout": int(os.getenv("CELERY_VISIBILITY_TIMEOUT", "7200")),
+    }
+
+
+def worker_command(queues: List[str], extra: List[str] = ()) -> Tuple[List[str], Dict[str, str]]:
+    """celery argv and environment for a worker consuming `queues` (the first queue's profile applies)"""
+    unknown = [q for q in queues if q not in QUEUE_PROFILES]
+    if unknown:
+        raise ValueError(f"Unknown queue(s) {', '.join(unknown)}; choose from {', '.join(QUEUE_PROFILES)}")
+    name = queues[0]
+    profile = QUEUE_PROFILES[name]
+    concurrency = int(os.getenv(f"CELERY_{name.upper()}_CONCURRENCY", profile["concurrency"] or thread_budget.usable_cpus()))
+    argv = [
+        "celery", "-A", "app.celery_worker", "worker",
+        "-Q", ",".join(queues),
+        "-n", f"{name}@%h",
+        "--pool", profile["pool"],
+        "--concurrency", str(concurrency),
+        "--prefetch-multiplier", str(profile["prefetch"]),
+        "--loglevel", os.getenv("CELERY_LOG_LEVEL", "info"),
+    ]
+    if profile["max_tasks_per_child"] and profile["pool"] == "prefork":
+        argv += ["--max-tasks-per-child", str(profile["max_tasks_per_child"])]
+    # Sizes the DB pool and compute thread budget of each child (app.db, thread_budget)
+    env = {"CELERY_CONCURRENCY": str(concurrency if profile["pool"] == "prefork" else 1)}
+    return argv + list(extra), env
+
+
+def main(argv=None) -> int:
+    args = list(sys.argv[1:] if argv is None else argv)
+    if not args or args[0].startswith("-"):
+        print(f"usage: python -m app.celery_queues QUEUE[,QUEUE...] [celery worker args]\n"
+              f"queues: {', '.join(QUEUE_PROFILES)}")
+        return 2
+    command, env = worker_command(args[0].split(","), args[1:])
+    os.environ.update(env)
+    os.execvp(command[0], command)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
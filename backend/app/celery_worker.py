@@ -1,29 +1,201 @@
 import os
+# Workers size their DB pools from the worker profile in app.db. The API also
+# imports this module (to publish tasks) but has set its own role by then.
+os.environ.setdefault("DB_ROLE", "worker")
+from .utils import thread_budget
+# Before the task modules import numpy/torch: their thread pools are sized at load
+if not thread_budget.settings():
+    thread_budget.configure("worker")
 from celery import Celery
-from prometheus_client import start_http_server
+from celery.signals import task_prerun, task_postrun, worker_init, worker_process_init, worker_process_shutdown
+from billiard.process import current_process
+from prometheus_client import start_http_server, Histogram, Gauge
 import threading
-
-CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
-CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", "redis://localhost:6379/0")
+import logging
+from .utils.profiler import SamplingProfiler
+from .utils.memory import rss_bytes
+from .redis_client import celery_redis_config
+from .celery_queues import celery_queue_config, broker_priority_options
+from .metrics import multiprocess_enabled, mark_process_dead, run_refreshers
+from .utils import preload
+from .utils import models
+from . import queue_metrics  # noqa: F401  enqueue timestamps, wait/runtime histograms
 
 celery_app = Celery(
     "resumatch",
-    broker=CELERY_BROKER_URL,
-    backend=CELERY_RESULT_BACKEND,
     include=["app.tasks"]
 )
 
+# Broker/backend URLs, pool limits, keepalive and health checks come from the
+# shared Redis factory so Celery follows the same connection policy as the API
+celery_app.conf.update(celery_redis_config())
+# Named queues, routing and late acks (see app.celery_queues); priority
+# emulation rides on the Redis transport options
+celery_app.conf.update(celery_queue_config())
+celery_app.conf.broker_transport_options.update(broker_priority_options())
 celery_app.conf.update(
     task_serializer="json",
     result_serializer="json",
     accept_content=["json"],
     timezone="UTC",
     enable_utc=True,
-    task_track_started=True,
+    # Tasks are fire-and-forget and record outcomes in Postgres (resumes.status),
+    # so nothing is written to a result backend unless a task opts in
+    task_ignore_result=True,
+    task_track_started=False,
     broker_connection_retry_on_startup=True,
 )
+# The parent kills a child that hasn't finished worker_process_init within
+# this, and model warm-up takes several seconds
+celery_app.conf.worker_proc_alive_timeout = float(os.getenv("CELERY_PROC_ALIVE_TIMEOUT", "120"))
+if os.getenv("CELERY_CONCURRENCY"):
+    # Also divides the DB connection and compute thread budgets between children
+    celery_app.conf.worker_concurrency = int(os.getenv("CELERY_CONCURRENCY"))
+
+@worker_process_init.connect
+def pin_child_cpus(**kwargs):
+    thread_budget.pin_to_slice(getattr(current_process(), "index", 0), thread_budget.process_count("worker"))
+
+# PRELOAD_MODELS=true loads the models in the worker parent before the pool
+# forks, so prefork children share them copy-on-write
+@worker_init.connect
+def preload_worker_models(**kwargs):
+    if preload.PRELOAD_MODELS:
+        preload.preload_models()
+        preload.freeze_for_fork()
+
+@worker_process_init.connect
+def enable_child_gc(**kwargs):
+    if preload.PRELOAD_MODELS:
+        preload.after_fork_in_child()
+
+# Each child loads and warms its models before it accepts a task, so the
+# first task after a (re)start or scale-up doesn't pay the cold start
+@worker_process_init.connect
+def warm_child_models(**kwargs):
+    if models.MODEL_WARMUP:
+        state = models.warm_up()
+        logging.info(f"Worker child {os.getpid()} models {'ready' if state['warm'] else 'NOT ready'}: {state}")
+
+# Per-task profiling: "off" (default, no hooks installed), "header" (only tasks
+# sent with headers={"profile": True}), or a comma-separated list of task names
+CELERY_TASK_PROFILING = os.getenv("CELERY_TASK_PROFILING", "off")
+CELERY_PROFILE_DIR = os.getenv("CELERY_PROFILE_DIR", "./profiles")
+CELERY_PROFILE_INTERVAL_MS = float(os.getenv("CELERY_PROFILE_INTERVAL_MS", "5"))
+_profiled_tasks = {name.strip() for name in CELERY_TASK_PROFILING.split(",")} - {"off", "header", ""}
+_task_profilers = {}
+
+def _should_profile(task) -> bool:
+    if task.name in _profiled_tasks:
+        return True
+    return CELERY_TASK_PROFILING == "header" and bool(getattr(task.request, "profile", False))
+
+def start_task_profiler(task_id=None, task=None, **kwargs):
+    if _should_profile(task):
+        profiler = SamplingProfiler(interval=CELERY_PROFILE_INTERVAL_MS / 1000, thread_id=threading.get_ident())
+        profiler.start()
+        _task_profilers[task_id] = profiler
+
+def stop_task_profiler(task_id=None, task=None, **kwargs):
+    profiler = _task_profilers.pop(task_id, None)
+    if profiler is None:
+        return
+    profiler.stop()
+    os.makedirs(CELERY_PROFILE_DIR, exist_ok=True)
+    path = os.path.join(CELERY_PROFILE_DIR, f"{task.name}-{task_id}.collapsed")
+    with open(path, "w") as f:
+        f.write(profiler.collapsed())
+    logging.info(f"Wrote task profile to {path}")
+
+if CELERY_TASK_PROFILING != "off":
+    task_prerun.connect(start_task_profiler)
+    task_postrun.connect(stop_task_profiler)
+
+# Memory policy: a child exits after the task that pushes its RSS past
+# worker_max_memory_per_child. Disabled by default: no limit applies until it
+# is configured, either as CELERY_MAX_MEMORY_PER_CHILD_MB or as
+# CELERY_CHILD_BASELINE_MB (the measured celery_child_baseline_rss_bytes, i.e.
+# RSS after the first task with models loaded) plus CELERY_MEMORY_GROWTH_LIMIT_MB
+# of growth on top of it. The baseline cannot be measured and applied inside
+# each child: the pool reads the limit once, when the child starts its loop.
+CELERY_TASK_MEMORY_TRACKING = os.getenv("CELERY_TASK_MEMORY_TRACKING", "false").lower() == "true"
+
+def max_memory_per_child_kb():
+    explicit = os.getenv("CELERY_MAX_MEMORY_PER_CHILD_MB")
+    if explicit:
+        return int(float(explicit) * 1024)
+    baseline = os.getenv("CELERY_CHILD_BASELINE_MB")
+    growth = os.getenv("CELERY_MEMORY_GROWTH_LIMIT_MB")
+    if baseline and growth:
+        return int((float(baseline) + float(growth)) * 1024)
+    return None
+
+_max_memory_kb = max_memory_per_child_kb()
+if _max_memory_kb:
+    celery_app.conf.worker_max_memory_per_child = _max_memory_kb
+elif os.getenv("CELERY_MEMORY_GROWTH_LIMIT_MB"):
+    logging.warning(
+        "CELERY_MEMORY_GROWTH_LIMIT_MB is set without CELERY_CHILD_BASELINE_MB: no memory limit applies. "
+        "Run with CELERY_TASK_MEMORY_TRACKING=true to measure the baseline"
+    )
+
+celery_task_rss_growth = Histogram(
+    'celery_task_rss_growth_bytes',
+    'Growth in worker child RSS while running a task',
+    ['task'],
+    buckets=(0, 65536, 1048576, 4194304, 16777216, 67108864, 268435456, 1073741824),
+)
+celery_child_rss = Gauge('celery_child_rss_bytes', 'RSS of the worker child after its last task', multiprocess_mode='liveall')
+celery_child_baseline_rss = Gauge('celery_child_baseline_rss_bytes', 'RSS of the worker child after its first task', multiprocess_mode='liveall')
+_task_rss = {}
+_child_baseline = None
+
+def record_task_rss_start(task_id=None, task=None, **kwargs):
+    _task_rss[task_id] = rss_bytes()
+
+def record_task_rss_end(task_id=None, task=None, **kwargs):
+    global _child_baseline
+    before = _task_rss.pop(task_id, None)
+    now = rss_bytes()
+    if before is not None:
+        celery_task_rss_growth.labels(task=task.name).observe(max(0, now - before))
+    celery_child_rss.set(now)
+    if _child_baseline is None:
+        _child_baseline = now
+        celery_child_baseline_rss.set(now)
+        growth = os.getenv("CELERY_MEMORY_GROWTH_LIMIT_MB")
+        if growth and not os.getenv("CELERY_CHILD_BASELINE_MB"):
+            logging.warning(
+                f"Worker child baseline RSS is {now / 2**20:.0f} MB; set CELERY_CHILD_BASELINE_MB to it "
+                f"to recycle children above {now / 2**20 + float(growth):.0f} MB"
+            )
+
+if CELERY_TASK_MEMORY_TRACKING:
+    task_prerun.connect(record_task_rss_start)
+    task_postrun.connect(record_task_rss_end)
+
+CELERY_METRICS_PORT = int(os.getenv("CELERY_METRICS_PORT", "9100"))
+
+@worker_init.connect
+def start_metrics_server(**kwargs):
+    """
+    Serve metrics from the worker parent only. Prefork children record into
+    their own memory, which a parent-side server never sees, so with more than
+    one child run with PROMETHEUS_MULTIPROC_DIR set and scrape the host
+    exporter (python -m app.metrics_exporter) instead.
+    """
+    if multiprocess_enabled():
+        return
+    if (celery_app.conf.worker_concurrency or os.cpu_count() or 1) > 1 and celery_app.conf.worker_pool in (None, "prefork"):
+        logging.warning(
+            "PROMETHEUS_MULTIPROC_DIR is not set: metrics recorded in prefork children will not be exported"
+        )
+    start_http_server(CELERY_METRICS_PORT)
 
-def start_prometheus_metrics_server():
-    start_http_server(9100)
+@worker_process_shutdown.connect
+def drop_child_metrics(pid=None, **kwargs):
+    mark_process_dead(pid or os.getpid())
 
-threading.Thread(target=start_prometheus_metrics_server, daemon=True).start() 
\ No newline at end of file
+@task_postrun.connect
+def refresh_metrics(**kwargs):
+    run_refreshers()
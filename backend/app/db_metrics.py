@@ -0,0 +1,176 @@
+import os
+import re
+import time
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from prometheus_client import Histogram
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+logger = logging.getLogger(__name__)
+
+# Statements slower than this are logged with their route
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "200"))
+
+db_statement_seconds = Histogram(
+    'db_statement_seconds',
+    'SQL statement latency by normalized statement fingerprint',
+    ['fingerprint'],
+)
+db_queries_per_request = Histogram(
+    'db_queries_per_request',
+    'Number of SQL statements executed per HTTP request',
+    ['route'],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+db_pool_wait_seconds = Histogram(
+    'db_pool_wait_seconds',
+    'Time spent waiting to check a connection out of the pool',
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+_LITERALS = [
+    (re.compile(r"--[^\n]*"), ""),
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"\$\d+|%\(\w+\)s|(?<![:\w]):\w+|\?"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(?)"),
+    # Multi-row VALUES: one label however many rows the batch had
+    (re.compile(r"(\([^()]*\))(?:\s*,\s*\1)+"), r"\1"),
+    (re.compile(r"\s+"), " "),
+]
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """Normalize SQL so statements differing only in literals/parameters share a label"""
+    normalized = statement
+    for pattern, replacement in _LITERALS:
+        normalized = pattern.sub(replacement, normalized)
+    return normalized.strip()[:300]
+
+
+class QueryStats:
+    """Statements executed within a request (or a query_budget block)"""
+
+    def __init__(self, scope: Optional[Dict] = None, parent: Optional["QueryStats"] = None):
+        self.scope = scope
+        self.parent = parent
+        self.count = 0
+        self.total_time = 0.0
+        self.pool_wait = 0.0
+        self.statements: List[str] = []
+
+    @property
+    def route(self) -> str:
+        if self.scope is None:
+            return self.parent.route if self.parent else "-"
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or self.scope.get("path", "-")
+
+    def record(self, statement: str, elapsed: float):
+        stats = self
+        while stats is not None:
+            stats.count += 1
+            stats.total_time += elapsed
+            stats.statements.append(statement)
+            stats = stats.parent
+
+    def record_pool_wait(self, elapsed: float):
+        stats = self
+        while stats is not None:
+            stats.pool_wait += elapsed
+            stats = stats.parent
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("db_query_stats", default=None)
+
+
+def current_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+@contextmanager
+def track_queries(scope: Optional[Dict] = None):
+    """Collect statements executed in this context; nested blocks also count towards outer ones"""
+    stats = QueryStats(scope, parent=_current_stats.get())
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+@contextmanager
+def query_budget(max_queries: int):
+    """
+    Fail if more than `max_queries` statements run inside the block.
+    Use in tests around an endpoint call to catch N+1 and lazy-load regressions.
+    """
+    with track_queries() as stats:
+        yield stats
+    if stats.count > max_queries:
+        listing = "\n".join(f"  {fingerprint(s)}" for s in stats.statements)
+        raise AssertionError(f"Expected at most {max_queries} queries, got {stats.count}:\n{listing}")
+
+
+class _TimedCheckout:
+    """Pool mixin that records how long checkouts wait for a free connection"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            elapsed = time.perf_counter() - start
+            db_pool_wait_seconds.observe(elapsed)
+            stats = _current_stats.get()
+            if stats is not None:
+                stats.record_pool_wait(elapsed)
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    """For the blocking engine Celery tasks use"""
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    _observe(statement, elapsed)
+
+
+def _handle_error(exception_context):
+    starts = exception_context.connection.info.get("query_start") if exception_context.connection else None
+    if starts:
+        _observe(exception_context.statement or "", time.perf_counter() - starts.pop())
+
+
+def _observe(statement: str, elapsed: float):
+    label = fingerprint(statement)
+    db_statement_seconds.labels(fingerprint=label).observe(elapsed)
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    if elapsed * 1000 >= DB_SLOW_QUERY_MS:
+        route = stats.route if stats is not None else "-"
+        logger.warning(f"Slow query ({elapsed * 1000:.1f} ms) on {route}: {label}")
+
+
+def instrument_engine(engine):
+    """Attach latency/count instrumentation to an AsyncEngine (or sync Engine)"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+    return engine
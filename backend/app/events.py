@@ -0,0 +1,127 @@
+"""
+Per-user event stream: Celery tasks publish resume status changes to Redis
+pub/sub and each API process relays them to its connected SSE clients.
+
+Each API process holds a single pub/sub connection ("events" purpose),
+subscribed to the channels of the users that have at least one client
+connected to it. Pub/sub does not buffer, so a client should read the
+current state once (GET /v1/resumes) after it connects; later changes then
+arrive as events.
+"""
+import asyncio
+import json
+import os
+import logging
+from typing import Dict, Optional, Set
+
+from prometheus_client import Gauge
+
+from .redis_client import get_async_redis, get_sync_redis
+
+logger = logging.getLogger(__name__)
+
+# Events buffered per connected client; a client that falls further behind loses the oldest
+EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", "100"))
+# A comment is sent this often so proxies don't drop idle streams
+EVENT_KEEPALIVE_SECONDS = float(os.getenv("EVENT_KEEPALIVE_SECONDS", "15"))
+
+event_stream_clients = Gauge(
+    'event_stream_clients',
+    'Connected event stream (SSE) clients',
+    multiprocess_mode='livesum',
+)
+
+
+def channel(user_id: int) -> str:
+    return f"user:{user_id}:events"
+
+
+def publish_event(user_id: int, event: Dict):
+    """Publish from synchronous code (Celery tasks); never raises"""
+    try:
+        get_sync_redis("events").publish(channel(user_id), json.dumps(event, default=str))
+    except Exception as e:
+        logger.warning(f"Could not publish {event.get('type')} event for user {user_id}: {e}")
+
+
+def resume_event(resume_id: str, status: str, **fields) -> Dict:
+    return {"type": "resume.status", "resume_id": resume_id, "status": status, **fields}
+
+
+class EventBroker:
+    """Fans one pub/sub connection out to the in-process queues of connected clients"""
+
+    def __init__(self):
+        self._listeners: Dict[str, Set[asyncio.Queue]] = {}
+        self._pubsub = None
+        self._reader: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    async def subscribe(self, user_id: int) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=EVENT_QUEUE_SIZE)
+        name = channel(user_id)
+        async with self._lock:
+            if self._pubsub is None:
+                self._pubsub = get_async_redis("events").pubsub()
+            listeners = self._listeners.setdefault(name, set())
+            listeners.add(queue)
+            if len(listeners) == 1:
+                await self._pubsub.subscribe(name)
+            if self._reader is None or self._reader.done():
+                self._reader = asyncio.create_task(self._read())
+        event_stream_clients.inc()
+        return queue
+
+    async def unsubscribe(self, user_id: int, queue: asyncio.Queue):
+        name = channel(user_id)
+        async with self._lock:
+            listeners = self._listeners.get(name, set())
+            listeners.discard(queue)
+            if not listeners and name in self._listeners:
+                del self._listeners[name]
+                try:
+                    await self._pubsub.unsubscribe(name)
+                except Exception as e:
+                    logger.warning(f"Unsubscribe from {name} failed: {e}")
+        event_stream_clients.dec()
+
+    def _dispatch(self, name: str, data: str):
+        for queue in list(self._listeners.get(name, ())):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(data)
+
+    async def _read(self):
+        while self._listeners:
+            try:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # redis-py reconnects and resubscribes on the next read
+                logger.warning(f"Event subscription read failed: {e}")
+                await asyncio.sleep(1)
+                continue
+            if message and message.get("type") == "message":
+                self._dispatch(message["channel"], message["data"])
+
+    async def close(self):
+        if self._reader is not None:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except (asyncio.CancelledError, Exception):
+                pass
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+        self._listeners.clear()
+        self._pubsub = self._reader = None
+
+
+event_broker = EventBroker()
+
+
+def sse_message(data: str, event: Optional[str] = None) -> str:
+    lines = [f"event: {event}"] if event else []
+    lines += [f"data: {line}" for line in data.splitlines() or [""]]
+    return "\n".join(lines) + "\n\n"
@@ -0,0 +1,179 @@
+import asyncio
+import os
+import time
+import logging
+from typing import Awaitable, Callable, Dict, Optional
+
+from prometheus_client import Gauge
+from sqlalchemy import text
+
+from .db import engine
+from .redis_client import get_async_redis
+from .metrics import register_refresher
+from .utils.models import model_state
+
+logger = logging.getLogger(__name__)
+
+# Per-check timeout; a check that exceeds it is reported as "timeout"
+HEALTH_CHECK_TIMEOUT = float(os.getenv("HEALTH_CHECK_TIMEOUT", "1.0"))
+# Probe results are reused for this long so frequent probes don't add load
+HEALTH_CACHE_TTL = float(os.getenv("HEALTH_CACHE_TTL", "2.0"))
+EVENT_LOOP_LAG_INTERVAL = float(os.getenv("EVENT_LOOP_LAG_INTERVAL", "0.5"))
+# Above this lag the worker reports not ready so it gets drained
+MAX_EVENT_LOOP_LAG = float(os.getenv("MAX_EVENT_LOOP_LAG", "0.5"))
+
+event_loop_lag_gauge = Gauge(
+    'event_loop_lag_seconds',
+    'Delay between scheduled and actual wake-up of the event loop monitor',
+    multiprocess_mode='livemax',
+)
+db_pool_checked_out_gauge = Gauge(
+    'db_pool_checked_out',
+    'Database connections currently checked out of the pool',
+    multiprocess_mode='livesum',
+)
+db_pool_overflow_gauge = Gauge(
+    'db_pool_overflow',
+    'Database connections opened beyond pool_size',
+    multiprocess_mode='livesum',
+)
+
+
+class CachedCheck:
+    """Runs an async check with a timeout and caches the result for `ttl` seconds"""
+
+    def __init__(self, name: str, check: Callable[[], Awaitable[Dict]], ttl: float = HEALTH_CACHE_TTL,
+                 timeout: float = HEALTH_CHECK_TIMEOUT):
+        self.name = name
+        self.check = check
+        self.ttl = ttl
+        self.timeout = timeout
+        self._result: Optional[Dict] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _fresh(self) -> bool:
+        return self._result is not None and time.monotonic() - self._checked_at < self.ttl
+
+    async def run(self) -> Dict:
+        if self._fresh():
+            return self._result
+        # Concurrent probes share a single in-flight check
+        async with self._lock:
+            if self._fresh():
+                return self._result
+            start = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(self.check(), timeout=self.timeout)
+                result.setdefault("status", "ok")
+            except asyncio.TimeoutError:
+                result = {"status": "timeout"}
+            except Exception as e:
+                logger.warning(f"Health check {self.name} failed: {e}")
+                result = {"status": "error", "error": str(e)}
+            result["latency_ms"] = round((time.perf_counter() - start) * 1000, 2)
+            self._result = result
+            self._checked_at = time.monotonic()
+            return result
+
+
+class EventLoopMonitor:
+    """Measures how late the event loop wakes a sleeping task"""
+
+    def __init__(self, interval: float = EVENT_LOOP_LAG_INTERVAL):
+        self.interval = interval
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            scheduled = loop.time()
+            await asyncio.sleep(self.interval)
+            self.lag = max(0.0, loop.time() - scheduled - self.interval)
+            self.max_lag = max(self.max_lag, self.lag)
+            event_loop_lag_gauge.set(self.lag)
+
+    def stats(self) -> Dict:
+        return {
+            "running": self._task is not None,
+            "lag_ms": round(self.lag * 1000, 2),
+            "max_lag_ms": round(self.max_lag * 1000, 2),
+        }
+
+
+async def _check_database() -> Dict:
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+    return {}
+
+
+async def _check_redis() -> Dict:
+    await get_async_redis("limiter").ping()
+    return {}
+
+
+def pool_stats() -> Dict:
+    pool = engine.pool
+    if not hasattr(pool, "checkedout"):
+        return {"pool": type(pool).__name__}
+    size = pool.size()
+    max_overflow = getattr(pool, "_max_overflow", 0)
+    checked_out = pool.checkedout()
+    overflow = max(0, pool.overflow())
+    db_pool_checked_out_gauge.set(checked_out)
+    db_pool_overflow_gauge.set(overflow)
+    return {
+        "size": size,
+        "max_overflow": max_overflow,
+        "checked_out": checked_out,
+        "checked_in": pool.checkedin(),
+        "overflow": overflow,
+        "saturated": max_overflow >= 0 and checked_out >= size + max_overflow,
+    }
+
+
+register_refresher(pool_stats)
+
+
+loop_monitor = EventLoopMonitor()
+database_check = CachedCheck("database", _check_database)
+redis_check = CachedCheck("redis", _check_redis)
+
+
+async def collect_health() -> Dict:
+    database, redis = await asyncio.gather(database_check.run(), redis_check.run())
+    return {
+        "database": database,
+        "db_pool": pool_stats(),
+        "redis": redis,
+        "models": model_state(),
+        "event_loop": loop_monitor.stats(),
+    }
+
+
+def is_ready(report: Dict) -> bool:
+    """
+    Redis is optional (the limiter degrades to local-only) and so are warm models:
+    only a warm-up still in progress holds traffic back. Everything else must be healthy.
+    """
+    return (
+        report["database"]["status"] == "ok"
+        and not report["db_pool"].get("saturated", False)
+        and report["models"]["status"] != "warming"
+        and report["event_loop"]["lag_ms"] <= MAX_EVENT_LOOP_LAG * 1000
+    )
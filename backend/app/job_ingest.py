@@ -0,0 +1,220 @@
+"""
+Job feed ingestion: JSONL postings ({"title": ..., "description": ...} per
+line) become Job rows with parsed requirements and precomputed skill
+embeddings.
+
+Descriptions stream through spaCy's nlp.pipe; every batch of
+JOB_INGEST_BATCH_SIZE postings embeds its distinct skills once and is
+written with one multi-row INSERT .. ON CONFLICT (content_hash) DO UPDATE.
+Postings whose hash is already stored are skipped before parsing, so
+re-loading a nightly feed only pays for what changed (--refresh re-parses
+everything, e.g. after a parser change).
+
+    python -m app.job_ingest feed.jsonl --n-process 4
+    gunzip -c feed.jsonl.gz | python -m app.job_ingest -
+
+Through the API, POST /v1/admin/jobs stages the same batches as files in
+JOB_FEED_STAGING_DIR (shared with the workers, like UPLOAD_DIR) and queues
+one bulk task per file, so broker messages carry a path, not the postings.
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import hashlib
+import argparse
+import logging
+from datetime import datetime, timezone
+from itertools import islice, tee
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+
+from .models import Job
+from .utils import models
+from .utils.embeddings import l2_normalize, to_bytes
+
+logger = logging.getLogger(__name__)
+
+JOB_INGEST_BATCH_SIZE = int(os.getenv("JOB_INGEST_BATCH_SIZE", "500"))
+MAX_TITLE_LENGTH = 500
+MAX_DESCRIPTION_LENGTH = int(os.getenv("JOB_MAX_DESCRIPTION_LENGTH", str(50 * 1024)))
+JOB_FEED_STAGING_DIR = os.getenv("JOB_FEED_STAGING_DIR", os.path.join(os.getenv("UPLOAD_DIR", "./uploads"), "job-feeds"))
+
+
+class InvalidPosting(ValueError):
+    pass
+
+
+def content_hash(title: str, description: str) -> str:
+    normalized = " ".join(title.split()).lower() + "\n" + " ".join(description.split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def parse_posting(line: str) -> Dict:
+    """One JSONL line as {"title", "description", "content_hash"}; raises InvalidPosting"""
+    try:
+        record = json.loads(line)
+    except ValueError as e:
+        raise InvalidPosting(f"invalid JSON: {e}")
+    if not isinstance(record, dict):
+        raise InvalidPosting("not a JSON object")
+    title, description = record.get("title"), record.get("description")
+    if not isinstance(title, str) or not title.strip():
+        raise InvalidPosting("missing title")
+    if not isinstance(description, str) or not description.strip():
+        raise InvalidPosting("missing description")
+    if len(title) > MAX_TITLE_LENGTH or len(description) > MAX_DESCRIPTION_LENGTH:
+        raise InvalidPosting("title or description too long")
+    title = title.strip()
+    return {"title": title, "description": description, "content_hash": content_hash(title, description)}
+
+
+def read_postings(lines: Iterable[str], errors: List[Dict]) -> Iterator[Dict]:
+    """Valid postings from JSONL lines; bad lines are appended to `errors` and skipped"""
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            yield parse_posting(line)
+        except InvalidPosting as e:
+            errors.append({"line": number, "error": str(e)})
+
+
+def batched(items: Iterable, size: int) -> Iterator[List]:
+    items = iter(items)
+    while batch := list(islice(items, size)):
+        yield batch
+
+
+def stage_batches(postings: Iterable[Dict], batch_size: int = JOB_INGEST_BATCH_SIZE,
+                  directory: str = JOB_FEED_STAGING_DIR) -> Iterator[Tuple[str, int]]:
+    """Write every batch to its own JSONL file in `directory`; yields (path, postings in it)"""
+    os.makedirs(directory, exist_ok=True)
+    feed_id = uuid.uuid4().hex
+    for number, batch in enumerate(batched(postings, batch_size)):
+        path = os.path.join(directory, f"{feed_id}-{number:06d}.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(posting) + "\n" for posting in batch)
+        yield path, len(batch)
+
+
+def ingest_staged(session, path: str) -> Optional[Dict]:
+    """Ingest a file written by stage_batches, then delete it; None if a previous delivery finished it"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            postings = [json.loads(line) for line in f]
+    except FileNotFoundError:
+        return None
+    stats = ingest(session, postings)
+    os.remove(path)
+    return stats
+
+
+def _upsert_insert(session):
+    if session.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+def upsert_jobs(session, rows: List[Dict]) -> int:
+    """One multi-row INSERT .. ON CONFLICT (content_hash) DO UPDATE; caller commits"""
+    if not rows:
+        return 0
+    # Postgres refuses to update the same row twice in one statement
+    rows = list({row["content_hash"]: row for row in rows}.values())
+    statement = _upsert_insert(session)(Job).values(rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=[Job.content_hash],
+        set_={column: statement.excluded[column] for column in rows[0] if column != "content_hash"},
+    )
+    session.execute(statement)
+    return len(rows)
+
+
+def embed_skills(analyses: List[Dict]) -> List[Tuple[Optional[bytes], Optional[bytes]]]:
+    """(skill_embeddings, embedding) bytes per analysis; each distinct skill is encoded once per batch"""
+    vocabulary = sorted({skill for analysis in analyses for skill in analysis["skills"]})
+    if not vocabulary:
+        return [(None, None)] * len(analyses)
+    vectors = l2_normalize(np.asarray(models.get("embedder").encode(vocabulary), dtype=np.float32))
+    index = {skill: i for i, skill in enumerate(vocabulary)}
+    result = []
+    for analysis in analyses:
+        if not analysis["skills"]:
+            result.append((None, None))
+            continue
+        skill_vectors = vectors[[index[skill] for skill in analysis["skills"]]]
+        result.append((to_bytes(skill_vectors), to_bytes(l2_normalize(skill_vectors.mean(axis=0, keepdims=True))[0])))
+    return result
+
+
+def parse_descriptions(texts: Iterable[str], n_process: int = 1) -> Iterator[Dict]:
+    # spaCy is only imported by processes that ingest
+    from .utils.job_parser import parse_job_descriptions
+    return parse_job_descriptions(texts, n_process=n_process)
+
+
+def _new_postings(session, postings: Iterable[Dict], batch_size: int, stats: Dict) -> Iterator[Dict]:
+    for batch in batched(postings, batch_size):
+        hashes = [posting["content_hash"] for posting in batch]
+        stored = set(session.execute(select(Job.content_hash).where(Job.content_hash.in_(hashes))).scalars())
+        stats["unchanged"] += sum(h in stored for h in hashes)
+        yield from (posting for posting in batch if posting["content_hash"] not in stored)
+
+
+def ingest(session, postings: Iterable[Dict], batch_size: int = JOB_INGEST_BATCH_SIZE, n_process: int = 1,
+           refresh: bool = False) -> Dict:
+    """Parse, embed and upsert a stream of postings, committing every batch"""
+    stats = {"upserted": 0, "unchanged": 0}
+    if not refresh:
+        postings = _new_postings(session, postings, batch_size, stats)
+    # nlp.pipe reads ahead, so the postings are teed to pair them with their analyses
+    postings, texts = tee(postings)
+    analyses = parse_descriptions(
+        (f"{posting['title']}\n\n{posting['description']}" for posting in texts), n_process=n_process,
+    )
+    for batch in batched(zip(postings, analyses), batch_size):
+        started = time.perf_counter()
+        now = datetime.now(timezone.utc)
+        embeddings = embed_skills([analysis for _, analysis in batch])
+        rows = [
+            {
+                **posting, "requirements": analysis, "skill_embeddings": skill_embeddings,
+                "embedding": embedding, "updated_at": now,
+            }
+            for (posting, analysis), (skill_embeddings, embedding) in zip(batch, embeddings)
+        ]
+        stats["upserted"] += upsert_jobs(session, rows)
+        session.commit()
+        logger.info(f"Upserted {len(rows)} jobs in {time.perf_counter() - started:.2f}s")
+    return stats
+
+
+def main(argv=None) -> int:
+    from .db import cli_session
+
+    parser = argparse.ArgumentParser(description="Load a JSONL job feed into the jobs table")
+    parser.add_argument("feed", type=argparse.FileType("r", encoding="utf-8"), help="JSONL file, or - for stdin")
+    parser.add_argument("--batch-size", type=int, default=JOB_INGEST_BATCH_SIZE)
+    parser.add_argument("--n-process", type=int, default=1, help="spaCy worker processes")
+    parser.add_argument("--refresh", action="store_true", help="Re-parse postings that are already stored")
+    args = parser.parse_args(argv)
+
+    errors: List[Dict] = []
+    started = time.perf_counter()
+    with args.feed as feed, cli_session() as session:
+        stats = ingest(session, read_postings(feed, errors), args.batch_size, args.n_process, args.refresh)
+    print(f"{stats['upserted']} jobs upserted, {stats['unchanged']} unchanged, {len(errors)} invalid lines "
+          f"in {time.perf_counter() - started:.1f}s")
+    for error in errors[:50]:
+        print(f"  line {error['line']}: {error['error']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
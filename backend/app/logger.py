@@ -16,8 +16,10 @@ os.makedirs(LOG_DIR, exist_ok=True)
 # Remove default logger
 logger.remove()
 
-# JSON formatter for structured logs
+# JSON formatter for structured logs. loguru treats the returned string as a
+# format template, so the JSON is stashed in extra and referenced from it.
 def json_formatter(record):
+    exception = record["exception"]
     log_record = {
         "timestamp": record["time"].isoformat(),
         "level": record["level"].name,
@@ -25,10 +27,11 @@ def json_formatter(record):
         "file": record["file"].name,
         "function": record["function"],
         "line": record["line"],
-        "extra": record["extra"],
-        "exception": record["exception"].repr if record["exception"] else None,
+        "extra": {k: v for k, v in record["extra"].items() if k != "serialized"},
+        "exception": repr(exception.value) if exception else None,
     }
-    return json.dumps(log_record)
+    record["extra"]["serialized"] = json.dumps(log_record, default=str)
+    return "{extra[serialized]}\n"
 
 # Local file sink with rotation
 logger.add(
@@ -1,22 +1,47 @@
+import os
+# Before api_v1 imports the Celery app, which would otherwise claim the worker role
+os.environ.setdefault("DB_ROLE", "api")
+from .utils import thread_budget
+# Before anything below imports numpy/torch: their thread pools are sized at load
+thread_budget.configure("api")
 from fastapi import FastAPI, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from prometheus_fastapi_instrumentator import Instrumentator
 import sentry_sdk
-import os
 from .api_v1 import router as api_v1_router
-from fastapi_limiter import FastAPILimiter
-import redis.asyncio as aioredis
+from .admin import router as admin_router
 from fastapi.responses import JSONResponse
 from starlette.status import HTTP_429_TOO_MANY_REQUESTS
 import logging
 from datetime import datetime, UTC
-from fastapi_limiter.depends import RateLimiter
+from .rate_limiter import RateLimit, limiter
+from .redis_client import get_async_redis, close_redis
 from contextlib import asynccontextmanager
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import time
 from typing import Optional
-from .db import get_db, engine
+from .health import collect_health, is_ready, loop_monitor
+from .metrics import refresh_loop
+from .events import event_broker
+from .utils import preload  # noqa: F401  shared/private memory gauges
+from .utils import models
+import asyncio
 from .models import Base
+from .db_metrics import track_queries, db_queries_per_request
+from .utils.memory import rss_bytes
+from prometheus_client import Histogram
+from .db import replica_router, READ_YOUR_WRITES_COOKIE, READ_YOUR_WRITES_SECONDS
+
+STARTED_AT = time.time()
+# Per-request RSS accounting; reads /proc on every request, so opt-in
+MEMORY_TRACKING = os.getenv("MEMORY_TRACKING", "false").lower() == "true"
+
+http_request_rss_growth = Histogram(
+    'http_request_rss_growth_bytes',
+    'Growth in process RSS while serving a request',
+    ['route'],
+    buckets=(0, 4096, 65536, 262144, 1048576, 4194304, 16777216, 67108864, 268435456),
+)
 
 # Sentry setup
 SENTRY_DSN = os.getenv("SENTRY_DSN")
@@ -29,13 +54,27 @@ if SENTRY_DSN:
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    redis_url = os.getenv("REDIS_URL", "redis://localhost:6379")
+    redis = get_async_redis("limiter")
     try:
-        redis = await aioredis.from_url(redis_url, encoding="utf-8", decode_responses=True)
-        await FastAPILimiter.init(redis)
+        await redis.ping()
     except Exception as e:
+        # The limiter keeps enforcing limits per process while Redis is down
+        # and resumes syncing once it becomes reachable again
         logging.warning(f"Redis connection failed: {e}")
+    await limiter.start(redis)
+    loop_monitor.start()
+    # Pool gauges are written periodically so they survive multiprocess aggregation
+    metrics_refresher = asyncio.create_task(refresh_loop())
+    if models.MODEL_WARMUP:
+        # In the background so the server starts accepting connections; /ready
+        # answers 503 (models warming) until this finishes
+        app.state.model_warmup = asyncio.create_task(asyncio.to_thread(models.warm_up))
     yield
+    metrics_refresher.cancel()
+    await loop_monitor.stop()
+    await limiter.stop()
+    await event_broker.close()
+    await close_redis()
 
 app = FastAPI(
     title="ResuMatch API",
@@ -43,7 +82,7 @@ app = FastAPI(
     openapi_url="/openapi.json",
     docs_url="/docs",
     redoc_url="/redoc",
-    dependencies=[Depends(RateLimiter(times=1000, seconds=3600))],
+    dependencies=[Depends(RateLimit(times=1000, seconds=3600))],
     lifespan=lifespan
 )
 
@@ -57,12 +96,46 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
+if MEMORY_TRACKING:
+    @app.middleware("http")
+    async def memory_instrumentation(request: Request, call_next):
+        """RSS growth per request; concurrent requests share the process, so read it as a trend"""
+        before = rss_bytes()
+        response = await call_next(request)
+        route = request.scope.get("route")
+        http_request_rss_growth.labels(route=route.path if route else "unmatched").observe(max(0, rss_bytes() - before))
+        return response
+
+@app.middleware("http")
+async def query_instrumentation(request: Request, call_next):
+    """Count SQL statements per request, labelled by route template"""
+    with track_queries(request.scope) as stats:
+        response = await call_next(request)
+    route = request.scope.get("route")
+    db_queries_per_request.labels(route=route.path if route else "unmatched").observe(stats.count)
+    return response
+
+@app.middleware("http")
+async def read_your_writes(request: Request, call_next):
+    """Pin a client's reads to the primary for a short window after it writes"""
+    response = await call_next(request)
+    if replica_router is not None and getattr(request.state, "wrote_to_primary", False):
+        response.set_cookie(
+            key=READ_YOUR_WRITES_COOKIE,
+            value=str(int(time.time()) + READ_YOUR_WRITES_SECONDS),
+            max_age=READ_YOUR_WRITES_SECONDS,
+            httponly=True, secure=True, samesite="lax"
+        )
+    return response
+
 # Prometheus metrics
 Instrumentator().instrument(app).expose(app, endpoint="/metrics")
 
 app.include_router(api_v1_router)
+app.include_router(admin_router)
 
 # Security
 security = HTTPBearer()
@@ -78,98 +151,48 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint for monitoring and deployment validation"""
-    try:
-        # Check if database URL is configured
-        database_url = os.getenv("DATABASE_URL")
-        if not database_url:
-            return JSONResponse(
-                status_code=503,
-                content={
-                    "status": "unhealthy",
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "version": "1.0.0",
-                    "error": "DATABASE_URL not configured",
-                    "database": "not configured"
-                }
-            )
-        
-        # Try database connection
-        try:
-            db = next(get_db())
-            db.execute("SELECT 1")
-            db.close()
-            db_status = "connected"
-        except Exception as db_error:
-            db_status = f"error: {str(db_error)}"
-        
-        return {
-            "status": "healthy",
-            "timestamp": datetime.utcnow().isoformat(),
-            "version": "1.0.0",
-            "database": db_status,
-            "uptime": time.time()
-        }
-    except Exception as e:
-        return JSONResponse(
-            status_code=503,
-            content={
-                "status": "unhealthy",
-                "timestamp": datetime.utcnow().isoformat(),
-                "version": "1.0.0",
-                "error": str(e),
-                "database": "unknown"
-            }
-        )
+    """Liveness check with dependency latency, pool and event-loop stats for monitoring"""
+    report = await collect_health()
+    healthy = report["database"]["status"] == "ok" and report["redis"]["status"] == "ok"
+    return {
+        "status": "healthy" if healthy else "degraded",
+        "timestamp": datetime.utcnow().isoformat(),
+        "version": "1.0.0",
+        "uptime": time.time() - STARTED_AT,
+        **report
+    }
 
 @app.get("/ready")
 async def readiness_check():
     """Readiness check for Kubernetes/container orchestration"""
-    try:
-        # Check environment variables
-        required_env_vars = [
-            "DATABASE_URL",
-            "JWT_SECRET",
-            "JWT_ALGORITHM"
-        ]
-        
-        missing_vars = [var for var in required_env_vars if not os.getenv(var)]
-        
-        if missing_vars:
-            return JSONResponse(
-                status_code=503,
-                content={
-                    "status": "not ready",
-                    "missing_environment_variables": missing_vars
-                }
-            )
-        
-        # Try database connection
-        try:
-            db = next(get_db())
-            db.execute("SELECT 1")
-            db.close()
-        except Exception as e:
-            return JSONResponse(
-                status_code=503,
-                content={
-                    "status": "not ready",
-                    "error": f"Database connection failed: {str(e)}"
-                }
-            )
-        
-        return {
-            "status": "ready",
-            "timestamp": datetime.utcnow().isoformat()
-        }
-    except Exception as e:
+    # Check environment variables
+    required_env_vars = [
+        "DATABASE_URL",
+        "JWT_SECRET",
+        "JWT_ALGORITHM"
+    ]
+    
+    missing_vars = [var for var in required_env_vars if not os.getenv(var)]
+    
+    if missing_vars:
         return JSONResponse(
             status_code=503,
             content={
                 "status": "not ready",
-                "error": str(e)
+                "missing_environment_variables": missing_vars
             }
         )
+    
+    report = await collect_health()
+    ready = is_ready(report)
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if ready else "not ready",
+            "timestamp": datetime.utcnow().isoformat(),
+            **report
+        }
+    )
 
 @app.exception_handler(HTTP_429_TOO_MANY_REQUESTS)
 async def rate_limit_exceeded_handler(request: Request, exc):
@@ -181,5 +204,5 @@ async def rate_limit_exceeded_handler(request: Request, exc):
     return JSONResponse(
         status_code=429,
         content={"error": "Too many requests. Please try again later."},
-        headers={"Retry-After": "60"}
+        headers={"Retry-After": (getattr(exc, "headers", None) or {}).get("Retry-After", "60")}
     ) 
\ No newline at end of file
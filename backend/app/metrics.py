@@ -0,0 +1,71 @@
+import os
+import glob
+import asyncio
+import logging
+from typing import Callable, List
+
+from prometheus_client import CollectorRegistry, REGISTRY
+from prometheus_client import multiprocess
+
+logger = logging.getLogger(__name__)
+
+# When set, every API worker and Celery child writes its metrics to files in
+# this directory and a single exporter aggregates them. prometheus_client
+# reads it at import time, so it must be in the environment before start-up.
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+METRICS_REFRESH_INTERVAL = float(os.getenv("METRICS_REFRESH_INTERVAL", "5"))
+
+_refreshers: List[Callable[[], None]] = []
+
+
+def multiprocess_enabled() -> bool:
+    return bool(PROMETHEUS_MULTIPROC_DIR)
+
+
+class _MetricsTreeCollector:
+    """Merges the files of every process under `directory`, including per-service subdirectories"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def collect(self):
+        files = glob.glob(os.path.join(self.directory, "**", "*.db"), recursive=True)
+        return multiprocess.MultiProcessCollector.merge(files, accumulate=True)
+
+
+def aggregated_registry() -> CollectorRegistry:
+    """Registry exposing metrics from every process writing to PROMETHEUS_MULTIPROC_DIR or below it"""
+    if not multiprocess_enabled():
+        return REGISTRY
+    registry = CollectorRegistry()
+    registry.register(_MetricsTreeCollector(PROMETHEUS_MULTIPROC_DIR))
+    return registry
+
+
+def mark_process_dead(pid: int):
+    """Drop live gauges of an exited process so they stop counting towards livesum/liveall"""
+    if multiprocess_enabled():
+        multiprocess.mark_process_dead(pid)
+
+
+def register_refresher(refresh: Callable[[], None]):
+    """
+    Register a callback that sets gauges from in-process state (pool sizes etc.).
+    Gauge.set_function is not visible to the multiprocess collector, so such
+    gauges are written periodically instead.
+    """
+    _refreshers.append(refresh)
+
+
+def run_refreshers():
+    for refresh in _refreshers:
+        try:
+            refresh()
+        except Exception as e:
+            logger.warning(f"Metrics refresher {refresh.__name__} failed: {e}")
+
+
+async def refresh_loop(interval: float = METRICS_REFRESH_INTERVAL):
+    while True:
+        run_refreshers()
+        await asyncio.sleep(interval)
@@ -0,0 +1,36 @@
+"""
+Host-level Prometheus exporter for multiprocess mode.
+
+start.sh and start-worker.sh give every service on the host its own
+subdirectory of PROMETHEUS_MULTIPROC_ROOT (api, worker-<queues>) and empty it
+when the service starts. Run one exporter per host on the root; it
+aggregates all of them:
+
+    PROMETHEUS_MULTIPROC_DIR=/tmp/resumatch-metrics python -m app.metrics_exporter --port 9100
+"""
+import argparse
+import os
+import time
+
+from prometheus_client import start_http_server
+
+from app.metrics import PROMETHEUS_MULTIPROC_DIR, aggregated_registry
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve aggregated metrics from PROMETHEUS_MULTIPROC_DIR")
+    parser.add_argument("--port", type=int, default=int(os.getenv("METRICS_EXPORTER_PORT", "9100")))
+    parser.add_argument("--addr", default="0.0.0.0")
+    args = parser.parse_args()
+
+    if not PROMETHEUS_MULTIPROC_DIR:
+        parser.error("PROMETHEUS_MULTIPROC_DIR must be set")
+    os.makedirs(PROMETHEUS_MULTIPROC_DIR, exist_ok=True)
+    start_http_server(args.port, addr=args.addr, registry=aggregated_registry())
+    print(f"Serving metrics from {PROMETHEUS_MULTIPROC_DIR} on {args.addr}:{args.port}")
+    while True:
+        time.sleep(3600)
+
+
+if __name__ == "__main__":
+    main()
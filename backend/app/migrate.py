@@ -1,10 +1,11 @@
 import asyncio
 from sqlalchemy.ext.asyncio import AsyncEngine
-from app.db import engine
+from app.db import create_engine_for_role
 from app.models import Base
 from sqlalchemy import text
 
 async def run_migrations():
+    engine = create_engine_for_role("migration")
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
         # Create GIN index for skills array
@@ -34,10 +35,65 @@ async def run_migrations():
                 END IF;
             END$$;
         """))
+        # Resume ids are uuid hex strings assigned by the upload endpoint
+        await conn.execute(text("""
+            DO $$
+            BEGIN
+                IF EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name='resumes' AND column_name='id' AND data_type='integer') THEN
+                    ALTER TABLE matches DROP CONSTRAINT IF EXISTS matches_resume_id_fkey;
+                    ALTER TABLE resumes ALTER COLUMN id DROP DEFAULT;
+                    ALTER TABLE resumes ALTER COLUMN id TYPE VARCHAR(32) USING id::text;
+                    ALTER TABLE matches ALTER COLUMN resume_id TYPE VARCHAR(32) USING resume_id::text;
+                    ALTER TABLE matches ADD CONSTRAINT matches_resume_id_fkey FOREIGN KEY (resume_id) REFERENCES resumes(id);
+                END IF;
+            END$$;
+        """))
+        # Processing status written by the worker (existing rows were processed already)
+        await conn.execute(text("""
+            DO $$
+            BEGIN
+                IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'resumestatus') THEN
+                    CREATE TYPE resumestatus AS ENUM ('queued', 'processing', 'ready', 'failed');
+                END IF;
+                IF NOT EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name='resumes' AND column_name='status') THEN
+                    ALTER TABLE resumes ADD COLUMN status resumestatus NOT NULL DEFAULT 'ready';
+                    ALTER TABLE resumes ALTER COLUMN status SET DEFAULT 'queued';
+                END IF;
+            END$$;
+        """))
+        await conn.execute(text("""
+            ALTER TABLE resumes ADD COLUMN IF NOT EXISTS error TEXT;
+        """))
+        await conn.execute(text("""
+            ALTER TABLE resumes ADD COLUMN IF NOT EXISTS processed_at TIMESTAMPTZ;
+        """))
+        # Columns filled by job feed ingestion (app.job_ingest)
+        await conn.execute(text("""
+            ALTER TABLE jobs ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
+        """))
+        await conn.execute(text("""
+            CREATE UNIQUE INDEX IF NOT EXISTS jobs_content_hash_key ON jobs (content_hash);
+        """))
+        await conn.execute(text("""
+            ALTER TABLE jobs ADD COLUMN IF NOT EXISTS description TEXT;
+        """))
+        await conn.execute(text("""
+            ALTER TABLE jobs ADD COLUMN IF NOT EXISTS skill_embeddings BYTEA;
+        """))
+        await conn.execute(text("""
+            ALTER TABLE jobs ADD COLUMN IF NOT EXISTS embedding BYTEA;
+        """))
+        await conn.execute(text("""
+            ALTER TABLE jobs ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT now();
+        """))
+        await conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_jobs_updated_at ON jobs (updated_at);
+        """))
         # Add password_hash column to users table if not exists
         await conn.execute(text("""
             ALTER TABLE IF NOT EXISTS users ADD COLUMN IF NOT EXISTS password_hash VARCHAR;
         """))
+    await engine.dispose()
     print("Migrations complete.")
 
 if __name__ == "__main__":
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, JSON, Float, ForeignKey, Table, DateTime, func
+from sqlalchemy import Column, Integer, String, Text, JSON, Float, ForeignKey, Table, DateTime, LargeBinary, UniqueConstraint, func
 from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 from sqlalchemy.orm import declarative_base, relationship
 import enum
@@ -17,12 +17,24 @@ class User(Base):
     password_hash = Column(String, nullable=True)  # For email/password auth
     resumes = relationship("Resume", back_populates="user")
 
+class ResumeStatus(enum.Enum):
+    queued = "queued"
+    processing = "processing"
+    ready = "ready"
+    failed = "failed"
+
 class Resume(Base):
     __tablename__ = "resumes"
-    id = Column(Integer, primary_key=True, index=True)
+    # uuid4 hex assigned at upload; also the prefix of the stored file name
+    id = Column(String(32), primary_key=True, index=True)
     filename = Column(String, nullable=False)
-    skills = Column(ARRAY(Text), index=True)
+    skills = Column(ARRAY(Text).with_variant(JSON, "sqlite"), index=True)
     uploaded_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Written by the process_pdf task; clients poll this instead of Celery state
+    status = Column(Enum(ResumeStatus), nullable=False, default=ResumeStatus.queued,
+                    server_default=ResumeStatus.queued.value)
+    error = Column(Text, nullable=True)
+    processed_at = Column(DateTime(timezone=True), nullable=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     user = relationship("User", back_populates="resumes")
     matches = relationship("Match", back_populates="resume")
@@ -31,19 +43,66 @@ class Job(Base):
     __tablename__ = "jobs"
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
-    requirements = Column(JSONB, nullable=False)
+    requirements = Column(JSONB().with_variant(JSON, "sqlite"), nullable=False)
+    # sha256 of title and description; feed ingestion upserts on it
+    content_hash = Column(String(64), unique=True, nullable=True)
+    description = Column(Text, nullable=True)
+    # float32, one row per requirements["skills"] entry (app.utils.embeddings.to_bytes)
+    skill_embeddings = Column(LargeBinary, nullable=True)
+    # Normalized mean of skill_embeddings; NULL when no skills were found
+    embedding = Column(LargeBinary, nullable=True)
+    # The job vector index syncs incrementally on it
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=True, index=True)
     matches = relationship("Match", back_populates="job")
 
 class Match(Base):
     __tablename__ = "matches"
     id = Column(Integer, primary_key=True, index=True)
-    resume_id = Column(Integer, ForeignKey("resumes.id"), nullable=False)
+    resume_id = Column(String(32), ForeignKey("resumes.id"), nullable=False)
     job_id = Column(Integer, ForeignKey("jobs.id"), nullable=False)
     score = Column(Float, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     resume = relationship("Resume", back_populates="matches")
     job = relationship("Job", back_populates="matches")
 
+class ImportStatus(enum.Enum):
+    running = "running"
+    completed = "completed"
+
+class ImportItemStatus(enum.Enum):
+    pending = "pending"
+    sanitized = "sanitized"
+    ready = "ready"
+    failed = "failed"
+
+class ImportJob(Base):
+    """A bulk resume import; counters are recomputed from its items after every chunk"""
+    __tablename__ = "import_jobs"
+    id = Column(String(32), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    source = Column(String, nullable=False)
+    status = Column(Enum(ImportStatus), nullable=False, default=ImportStatus.running)
+    total = Column(Integer, nullable=False, default=0)
+    succeeded = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    items = relationship("ImportItem", back_populates="import_job")
+
+class ImportItem(Base):
+    __tablename__ = "import_items"
+    __table_args__ = (UniqueConstraint("import_id", "filename"),)
+    id = Column(Integer, primary_key=True)
+    import_id = Column(String(32), ForeignKey("import_jobs.id"), nullable=False, index=True)
+    filename = Column(String, nullable=False)
+    # Assigned when the file is staged so a retried chunk never creates a second Resume
+    resume_id = Column(String(32), nullable=False)
+    # Where the staged PDF lives; it becomes the resume's stored file
+    path = Column(String, nullable=False)
+    status = Column(Enum(ImportItemStatus), nullable=False, default=ImportItemStatus.pending)
+    error = Column(Text, nullable=True)
+    import_job = relationship("ImportJob", back_populates="items")
+
 class SanitizationStatus(enum.Enum):
     success = "success"
     failure = "failure"
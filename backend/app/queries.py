@@ -0,0 +1,49 @@
+"""
+Hot-path queries built once at import time.
+
+Each statement uses named bind parameters, so it always compiles to the same
+SQL text. That lets SQLAlchemy reuse the compiled form and lets the asyncpg
+dialect reuse the server-side prepared statement from its per-connection
+cache (DB_PREPARED_STATEMENT_CACHE_SIZE) rather than re-parsing and planning
+on every request. Execute with db.execute(query, {"param": value}).
+"""
+from sqlalchemy import select, bindparam, func
+from sqlalchemy.orm import selectinload
+from .models import User, Resume, Job, Match
+
+user_by_id = select(User).where(User.id == bindparam("user_id"))
+
+user_by_email = select(User).where(User.email == bindparam("email"))
+
+# Counts matches in SQL instead of lazy-loading every Match row per resume
+resumes_for_user = (
+    select(Resume, func.count(Match.id).label("matches_count"))
+    .outerjoin(Match, Match.resume_id == Resume.id)
+    .where(Resume.user_id == bindparam("user_id"))
+    .group_by(Resume.id)
+    .order_by(Resume.uploaded_at.desc())
+)
+
+resume_for_user = select(Resume).where(
+    Resume.id == bindparam("resume_id"),
+    Resume.user_id == bindparam("user_id"),
+)
+
+resume_status_for_user = select(
+    Resume.status, Resume.skills, Resume.error, Resume.processed_at
+).where(
+    Resume.id == bindparam("resume_id"),
+    Resume.user_id == bindparam("user_id"),
+)
+
+resume_detail_for_user = resume_for_user.options(
+    selectinload(Resume.matches).joinedload(Match.job)
+)
+
+matches_for_user = (
+    select(Match.id, Resume.filename, Job.title, Match.score, Match.created_at)
+    .join(Resume, Match.resume_id == Resume.id)
+    .join(Job, Match.job_id == Job.id)
+    .where(Resume.user_id == bindparam("user_id"))
+    .order_by(Match.score.desc())
+)
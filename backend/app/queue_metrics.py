@@ -0,0 +1,205 @@
+"""
+Celery queue backlog and task latency metrics, plus an autoscaling signal.
+
+Inside the workers (connected by app.celery_worker):
+  - every published task carries an `enqueued_at` header
+  - celery_task_wait_seconds: enqueue (or ETA) to start, per queue and task
+  - celery_task_runtime_seconds: start to finish, per queue, task and state
+  - an EWMA of task runtime per queue, kept in Redis for the exporter
+
+A cluster-wide exporter (run exactly one) reads the broker at scrape time:
+
+    python -m app.queue_metrics --port 9101
+
+  - celery_queue_depth, celery_queue_oldest_message_age_seconds
+  - celery_queue_runtime_ewma_seconds
+  - celery_queue_desired_workers = ceil(depth * runtime EWMA / target latency),
+    clamped to [QUEUE_MIN_WORKERS, QUEUE_MAX_WORKERS]: the worker processes
+    needed to drain the current backlog within the queue's target latency
+"""
+import argparse
+import json
+import math
+import os
+import time
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+from celery.signals import before_task_publish, task_prerun, task_postrun
+from prometheus_client import CollectorRegistry, Histogram, start_http_server
+from prometheus_client.core import GaugeMetricFamily
+
+from .celery_queues import QUEUE_PROFILES, PRIORITY_STEPS
+from .redis_client import get_sync_redis
+
+logger = logging.getLogger(__name__)
+
+ENQUEUED_AT_HEADER = "enqueued_at"
+RUNTIME_EWMA_KEY = os.getenv("QUEUE_RUNTIME_EWMA_KEY", "celery:runtime_ewma")
+# Weight of the newest runtime in the moving average
+RUNTIME_EWMA_ALPHA = float(os.getenv("QUEUE_RUNTIME_EWMA_ALPHA", "0.1"))
+QUEUE_MIN_WORKERS = int(os.getenv("QUEUE_MIN_WORKERS", "1"))
+QUEUE_MAX_WORKERS = int(os.getenv("QUEUE_MAX_WORKERS", "64"))
+# kombu's Redis transport keeps priority p > 0 of queue q in the list "q<sep>p"
+BROKER_PRIORITY_SEP = os.getenv("CELERY_BROKER_PRIORITY_SEP", "\x06\x16")
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+task_wait_seconds = Histogram(
+    'celery_task_wait_seconds',
+    'Time a task spent in the queue before a worker started it',
+    ['queue', 'task'],
+    buckets=LATENCY_BUCKETS,
+)
+task_runtime_seconds = Histogram(
+    'celery_task_runtime_seconds',
+    'Time from task start to finish',
+    ['queue', 'task', 'state'],
+    buckets=LATENCY_BUCKETS,
+)
+
+_task_started: Dict[str, float] = {}
+
+
+def target_latency(queue: str) -> float:
+    """Seconds a message of `queue` may wait; CELERY_<QUEUE>_TARGET_LATENCY overrides the profile"""
+    return float(os.getenv(f"CELERY_{queue.upper()}_TARGET_LATENCY", QUEUE_PROFILES[queue]["target_latency"]))
+
+
+def desired_workers(depth: int, runtime_ewma: Optional[float], target: float) -> int:
+    if not depth or not runtime_ewma:
+        return QUEUE_MIN_WORKERS
+    return max(QUEUE_MIN_WORKERS, min(QUEUE_MAX_WORKERS, math.ceil(depth * runtime_ewma / target)))
+
+
+def _queue_of(task) -> str:
+    delivery_info = getattr(task.request, "delivery_info", None) or {}
+    return delivery_info.get("routing_key") or "unknown"
+
+
+@before_task_publish.connect
+def stamp_enqueued_at(headers=None, **kwargs):
+    # Retries are republished, so each attempt measures its own wait
+    if headers is not None:
+        headers[ENQUEUED_AT_HEADER] = time.time()
+
+
+@task_prerun.connect
+def record_task_wait(task_id=None, task=None, **kwargs):
+    now = time.time()
+    _task_started[task_id] = now
+    enqueued_at = getattr(task.request, ENQUEUED_AT_HEADER, None)
+    if enqueued_at is None:
+        return
+    ready_at = float(enqueued_at)
+    eta = task.request.eta
+    if eta:
+        # Scheduled tasks are not waiting before their ETA
+        eta = eta if isinstance(eta, datetime) else datetime.fromisoformat(eta)
+        ready_at = max(ready_at, eta.timestamp())
+    task_wait_seconds.labels(queue=_queue_of(task), task=task.name).observe(max(0.0, now - ready_at))
+
+
+@task_postrun.connect
+def record_task_runtime(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is None:
+        return
+    runtime = time.time() - started
+    queue = _queue_of(task)
+    task_runtime_seconds.labels(queue=queue, task=task.name, state=state or "unknown").observe(runtime)
+    try:
+        update_runtime_ewma(get_sync_redis("cache"), queue, runtime)
+    except Exception as e:
+        # The autoscaling signal must never fail a task
+        logger.debug(f"Could not update runtime EWMA for {queue}: {e}")
+
+
+def update_runtime_ewma(client, queue: str, runtime: float, alpha: float = RUNTIME_EWMA_ALPHA) -> float:
+    """Fold `runtime` into the shared per-queue moving average (optimistic WATCH/MULTI)"""
+    def update(pipe):
+        current = pipe.hget(RUNTIME_EWMA_KEY, queue)
+        value = runtime if current is None else float(current) + alpha * (runtime - float(current))
+        pipe.multi()
+        pipe.hset(RUNTIME_EWMA_KEY, queue, value)
+        return value
+
+    return client.transaction(update, RUNTIME_EWMA_KEY, value_from_callable=True)
+
+
+def priority_keys(queue: str) -> Iterable[str]:
+    return [queue if not step else f"{queue}{BROKER_PRIORITY_SEP}{step}" for step in PRIORITY_STEPS]
+
+
+def _enqueued_at(raw) -> Optional[float]:
+    try:
+        value = json.loads(raw)["headers"].get(ENQUEUED_AT_HEADER)
+        return float(value) if value is not None else None
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def queue_stats(broker, queue: str, now: Optional[float] = None) -> Dict:
+    """Depth over all priority lists, and the age of the oldest message among their tails"""
+    now = now or time.time()
+    keys = priority_keys(queue)
+    with broker.pipeline(transaction=False) as pipe:
+        for key in keys:
+            pipe.llen(key)
+            # Producers LPUSH and workers pop from the right, so the tail is the oldest
+            pipe.lindex(key, -1)
+        replies = pipe.execute()
+    depth = sum(replies[0::2])
+    stamps = [stamp for stamp in map(_enqueued_at, (r for r in replies[1::2] if r)) if stamp is not None]
+    return {"depth": depth, "oldest_age": max(0.0, now - min(stamps)) if stamps else 0.0}
+
+
+class QueueCollector:
+    """Reads the broker on every scrape, so values are never stale"""
+
+    def __init__(self, broker, stats_client, queues: Iterable[str] = tuple(QUEUE_PROFILES)):
+        self.broker = broker
+        self.stats_client = stats_client
+        self.queues = list(queues)
+
+    def collect(self):
+        depth = GaugeMetricFamily('celery_queue_depth', 'Messages waiting in the queue', labels=['queue'])
+        age = GaugeMetricFamily('celery_queue_oldest_message_age_seconds',
+                                'Age of the oldest waiting message', labels=['queue'])
+        ewma = GaugeMetricFamily('celery_queue_runtime_ewma_seconds',
+                                 'Moving average of task runtime on the queue', labels=['queue'])
+        desired = GaugeMetricFamily('celery_queue_desired_workers',
+                                    'Worker processes needed to drain the backlog within the target latency',
+                                    labels=['queue'])
+        target = GaugeMetricFamily('celery_queue_target_latency_seconds',
+                                   'Configured target wait for the queue', labels=['queue'])
+        runtimes = self.stats_client.hgetall(RUNTIME_EWMA_KEY) or {}
+        for queue in self.queues:
+            stats = queue_stats(self.broker, queue)
+            runtime = float(runtimes[queue]) if queue in runtimes else None
+            depth.add_metric([queue], stats["depth"])
+            age.add_metric([queue], stats["oldest_age"])
+            if runtime is not None:
+                ewma.add_metric([queue], runtime)
+            desired.add_metric([queue], desired_workers(stats["depth"], runtime, target_latency(queue)))
+            target.add_metric([queue], target_latency(queue))
+        return [depth, age, ewma, desired, target]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve Celery queue backlog metrics (run one per cluster)")
+    parser.add_argument("--port", type=int, default=int(os.getenv("QUEUE_EXPORTER_PORT", "9101")))
+    parser.add_argument("--addr", default="0.0.0.0")
+    args = parser.parse_args()
+
+    registry = CollectorRegistry()
+    registry.register(QueueCollector(get_sync_redis("celery_broker"), get_sync_redis("cache")))
+    start_http_server(args.port, addr=args.addr, registry=registry)
+    print(f"Serving queue metrics on {args.addr}:{args.port}")
+    while True:
+        time.sleep(3600)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+import asyncio
+import logging
+import math
+import os
+import time
+from typing import Callable, Dict, Optional
+
+from fastapi import HTTPException, Request
+from prometheus_client import Counter, Gauge, Histogram
+from starlette.status import HTTP_429_TOO_MANY_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() != "false"
+# How often locally consumed tokens are reconciled with Redis
+RATE_LIMIT_SYNC_INTERVAL_MS = int(os.getenv("RATE_LIMIT_SYNC_INTERVAL_MS", "250"))
+RATE_LIMIT_SYNC_BATCH_SIZE = int(os.getenv("RATE_LIMIT_SYNC_BATCH_SIZE", "500"))
+RATE_LIMIT_PREFIX = os.getenv("RATE_LIMIT_PREFIX", "ratelimit")
+
+# KEYS[i] is a window counter, ARGV[2i-1] the hits consumed locally since the
+# last sync and ARGV[2i] the window length in ms. Returns {count, pttl} per key.
+SYNC_SCRIPT = """
+local results = {}
+for i, key in ipairs(KEYS) do
+    local delta = tonumber(ARGV[2 * i - 1])
+    local window = tonumber(ARGV[2 * i])
+    local count = redis.call('INCRBY', key, delta)
+    local ttl = redis.call('PTTL', key)
+    if ttl < 0 then
+        redis.call('PEXPIRE', key, window)
+        ttl = window
+    end
+    results[i] = {count, ttl}
+end
+return results
+"""
+
+rate_limit_rejected_total = Counter(
+    'rate_limit_rejected_total',
+    'Requests rejected by the rate limiter',
+    ['route'],
+)
+rate_limit_buckets = Gauge(
+    'rate_limit_buckets',
+    'Token buckets held in memory by this process',
+    multiprocess_mode='livesum',
+)
+rate_limit_sync_seconds = Histogram(
+    'rate_limit_sync_seconds',
+    'Time spent reconciling local buckets with Redis',
+)
+rate_limit_redis_degraded = Gauge(
+    'rate_limit_redis_degraded',
+    'Whether the rate limiter is running local-only because Redis is unavailable',
+    multiprocess_mode='livemax',
+)
+
+
+class TokenBucket:
+    __slots__ = ("capacity", "window", "tokens", "updated", "pending", "blocked_until")
+
+    def __init__(self, capacity: int, window: float, now: float):
+        self.capacity = capacity
+        self.window = window
+        self.tokens = float(capacity)
+        self.updated = now
+        self.pending = 0
+        self.blocked_until = 0.0
+
+    def take(self, now: float) -> float:
+        """Consume one token. Returns 0 on success, otherwise seconds until retry."""
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        rate = self.capacity / self.window
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        if self.tokens < 1:
+            return (1 - self.tokens) / rate
+        self.tokens -= 1
+        self.pending += 1
+        return 0.0
+
+
+class RateLimitStore:
+    """
+    Per-process token buckets that are reconciled with Redis in batches.
+    Requests are admitted or rejected locally; a background task pushes the
+    hits consumed since the last sync through one Lua call and tightens local
+    buckets with the cluster-wide counts. Without Redis the limits still hold
+    per process.
+    """
+
+    def __init__(self, sync_interval_ms: int = RATE_LIMIT_SYNC_INTERVAL_MS):
+        self.sync_interval = sync_interval_ms / 1000
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.redis = None
+        self._script = None
+        self._task: Optional[asyncio.Task] = None
+        self._degraded = False
+
+    async def start(self, redis=None):
+        self.redis = redis
+        if redis is not None:
+            self._script = redis.register_script(SYNC_SCRIPT)
+            self._task = asyncio.create_task(self._sync_loop())
+        else:
+            logger.warning("Rate limiter running local-only: no Redis connection")
+        rate_limit_redis_degraded.set(0 if redis is not None else 1)
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._script is not None:
+            await self.sync()
+
+    def hit(self, key: str, times: int, seconds: int) -> float:
+        now = time.monotonic()
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = TokenBucket(times, seconds, now)
+            rate_limit_buckets.set(len(self.buckets))
+        return bucket.take(now)
+
+    async def _sync_loop(self):
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            await self.sync()
+
+    async def sync(self):
+        now = time.monotonic()
+        batch = []
+        for key, bucket in list(self.buckets.items()):
+            if bucket.pending:
+                batch.append((key, bucket, bucket.pending))
+                bucket.pending = 0
+            elif now - bucket.updated > bucket.window and now >= bucket.blocked_until:
+                # Idle long enough to have fully refilled
+                del self.buckets[key]
+        rate_limit_buckets.set(len(self.buckets))
+        if not batch or self._script is None:
+            return
+
+        start = time.perf_counter()
+        try:
+            for i in range(0, len(batch), RATE_LIMIT_SYNC_BATCH_SIZE):
+                chunk = batch[i:i + RATE_LIMIT_SYNC_BATCH_SIZE]
+                args = []
+                for _, bucket, delta in chunk:
+                    args.extend([delta, int(bucket.window * 1000)])
+                results = await self._script(keys=[f"{RATE_LIMIT_PREFIX}:{key}" for key, _, _ in chunk], args=args)
+                now = time.monotonic()
+                for (_, bucket, _), (count, ttl) in zip(chunk, results):
+                    remaining = max(0, bucket.capacity - int(count))
+                    bucket.tokens = min(bucket.tokens, remaining)
+                    if remaining == 0:
+                        bucket.blocked_until = now + int(ttl) / 1000
+        except Exception as e:
+            # Hits from this round are dropped; local limits keep applying
+            if not self._degraded:
+                logger.warning(f"Rate limiter Redis sync failed, continuing local-only: {e}")
+            self._degraded = True
+            rate_limit_redis_degraded.set(1)
+        else:
+            if self._degraded:
+                logger.info("Rate limiter Redis sync recovered")
+            self._degraded = False
+            rate_limit_redis_degraded.set(0)
+        finally:
+            rate_limit_sync_seconds.observe(time.perf_counter() - start)
+
+
+limiter = RateLimitStore()
+
+
+def default_identifier(request: Request) -> str:
+    forwarded = request.headers.get("X-Forwarded-For")
+    if forwarded:
+        return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+class RateLimit:
+    """
+    FastAPI dependency enforcing `times` requests per `seconds` per client and route.
+    Usage: dependencies=[Depends(RateLimit(times=5, seconds=60))]
+    """
+
+    def __init__(
+        self,
+        times: int,
+        seconds: int,
+        identifier: Callable[[Request], str] = default_identifier,
+        store: RateLimitStore = limiter,
+    ):
+        self.times = times
+        self.seconds = seconds
+        self.identifier = identifier
+        self.store = store
+
+    async def __call__(self, request: Request):
+        if not RATE_LIMIT_ENABLED:
+            return
+        route = request.scope.get("route")
+        path = getattr(route, "path", request.url.path)
+        key = f"{path}:{self.times}/{self.seconds}:{self.identifier(request)}"
+        retry_after = self.store.hit(key, self.times, self.seconds)
+        if retry_after:
+            rate_limit_rejected_total.labels(route=path).inc()
+            raise HTTPException(
+                status_code=HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too Many Requests",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
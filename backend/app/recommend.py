@@ -0,0 +1,188 @@
+"""
+Top-k job recommendations per resume, stored as Match rows.
+
+The resume's skill vector (normalized mean of its skill embeddings, the same
+construction as Job.embedding) is looked up in a VectorIndex over all jobs;
+the RECOMMEND_CANDIDATES nearest are re-ranked with the full
+SkillsMatcher.calculate_overall_match_score, fed the stored job skill
+embeddings so no job is re-embedded, and the best RECOMMEND_TOP_K replace the
+resume's matches. Resumes store only their skills, so experience and
+education requirements score as unknown for every job alike.
+
+Each process keeps one index: loaded from VECTOR_INDEX_PATH when a saved
+copy exists, then caught up with jobs updated since (Job.updated_at), at
+most every VECTOR_INDEX_SYNC_SECONDS. updated_at is stamped by the writer
+before its transaction commits, so every sync re-reads
+VECTOR_INDEX_SYNC_WINDOW_SECONDS behind the high-water mark to catch rows
+that became visible after a later stamp had been synced. Save a fresh copy after feed loads so
+new processes start close to current:
+
+    python -m app.recommend build-index
+    python -m app.recommend recommend <resume_id> [<resume_id> ...]
+"""
+import os
+import sys
+import time
+import argparse
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import delete, insert, select
+
+from .models import Job, Match, Resume
+from .utils import models
+from .utils.embeddings import from_bytes, l2_normalize
+from .utils.vector_index import VectorIndex
+
+logger = logging.getLogger(__name__)
+
+VECTOR_INDEX_PATH = os.getenv("VECTOR_INDEX_PATH", "./models/job-index")
+VECTOR_INDEX_SYNC_SECONDS = float(os.getenv("VECTOR_INDEX_SYNC_SECONDS", "60"))
+VECTOR_INDEX_SYNC_PAGE = 5000
+# Longest expected gap between stamping updated_at and committing, plus clock skew between writers
+VECTOR_INDEX_SYNC_WINDOW_SECONDS = float(os.getenv("VECTOR_INDEX_SYNC_WINDOW_SECONDS", "300"))
+RECOMMEND_TOP_K = int(os.getenv("RECOMMEND_TOP_K", "10"))
+# Nearest jobs re-ranked with the full scorer
+RECOMMEND_CANDIDATES = int(os.getenv("RECOMMEND_CANDIDATES", "50"))
+
+_index: Optional[VectorIndex] = None
+_synced_at = float("-inf")
+_index_lock = threading.Lock()
+
+
+def load_index(path: str = VECTOR_INDEX_PATH) -> VectorIndex:
+    try:
+        index = VectorIndex.load(path)
+        logger.info(f"Loaded job index with {len(index)} jobs from {path}")
+        return index
+    except FileNotFoundError:
+        return VectorIndex()
+
+
+def sync_index(session, index: VectorIndex) -> int:
+    """Apply jobs updated since the index's high-water mark; returns the rows read"""
+    query = select(Job.id, Job.embedding, Job.updated_at).order_by(Job.updated_at, Job.id)
+    synced_until = index.meta.get("synced_until")
+    if synced_until:
+        since = datetime.fromisoformat(synced_until) - timedelta(seconds=VECTOR_INDEX_SYNC_WINDOW_SECONDS)
+        query = query.where(Job.updated_at >= since)
+    applied = 0
+    result = session.execute(query.execution_options(yield_per=VECTOR_INDEX_SYNC_PAGE))
+    for rows in result.partitions():
+        embedded = [(job_id, embedding) for job_id, embedding, _ in rows if embedding]
+        if embedded:
+            index.add([job_id for job_id, _ in embedded], np.stack([from_bytes(e) for _, e in embedded]))
+        index.remove([job_id for job_id, embedding, _ in rows if not embedding])
+        latest = max((updated_at for _, _, updated_at in rows if updated_at), default=None)
+        if latest:
+            index.meta["synced_until"] = latest.isoformat()
+        applied += len(rows)
+    return applied
+
+
+def get_job_index(session) -> VectorIndex:
+    """This process's index, synced with the jobs table at most every VECTOR_INDEX_SYNC_SECONDS"""
+    global _index, _synced_at
+    with _index_lock:
+        if _index is None:
+            _index = load_index()
+        if time.monotonic() - _synced_at >= VECTOR_INDEX_SYNC_SECONDS:
+            applied = sync_index(session, _index)
+            _synced_at = time.monotonic()
+            if applied:
+                logger.info(f"Job index synced {applied} jobs; {len(_index)} indexed")
+    return _index
+
+
+def reset_index():
+    global _index, _synced_at
+    with _index_lock:
+        _index, _synced_at = None, float("-inf")
+
+
+def recommend(session, resume_ids: List[str], k: int = RECOMMEND_TOP_K) -> Dict[str, List[Dict]]:
+    """Replace the resumes' matches with their top-k jobs; returns them per resume, best first"""
+    resumes = session.execute(select(Resume.id, Resume.skills).where(Resume.id.in_(resume_ids))).all()
+    session.execute(delete(Match).where(Match.resume_id.in_([resume_id for resume_id, _ in resumes])))
+    recommendations = {resume_id: [] for resume_id, _ in resumes}
+    resumes = [(resume_id, skills) for resume_id, skills in resumes if skills]
+    if not resumes:
+        session.commit()
+        return recommendations
+
+    # Embed every distinct skill once for the whole batch
+    vocabulary = sorted({skill for _, skills in resumes for skill in skills})
+    vectors = l2_normalize(np.asarray(models.get("embedder").encode(vocabulary), dtype=np.float32))
+    position = {skill: i for i, skill in enumerate(vocabulary)}
+    resume_vectors = [vectors[[position[skill] for skill in skills]] for _, skills in resumes]
+    queries = np.stack([v.mean(axis=0) for v in resume_vectors])
+    candidate_ids, _ = get_job_index(session).search(queries, RECOMMEND_CANDIDATES)
+
+    jobs = {
+        job_id: (requirements, skill_embeddings)
+        for job_id, requirements, skill_embeddings in session.execute(
+            select(Job.id, Job.requirements, Job.skill_embeddings).where(Job.id.in_(np.unique(candidate_ids).tolist()))
+        )
+    }
+    matcher = models.get("skills_matcher")
+    rows = []
+    for (resume_id, skills), resume_embeddings, candidates in zip(resumes, resume_vectors, candidate_ids):
+        scored = []
+        for job_id in candidates.tolist():
+            if job_id not in jobs:
+                continue
+            requirements, skill_embeddings = jobs[job_id]
+            job_skills = requirements.get("skills", [])
+            job_embeddings = from_bytes(skill_embeddings, len(job_skills)) if skill_embeddings and job_skills else None
+            score = matcher.calculate_overall_match_score(
+                {"skills": skills}, requirements,
+                resume_embeddings=resume_embeddings, job_embeddings=job_embeddings,
+            )["overall_score"]
+            scored.append((score, job_id))
+        scored.sort(key=lambda match: match[0], reverse=True)
+        recommendations[resume_id] = [{"job_id": job_id, "score": score} for score, job_id in scored[:k]]
+        rows += [{"resume_id": resume_id, **match} for match in recommendations[resume_id]]
+    if rows:
+        session.execute(insert(Match), rows)
+    session.commit()
+    return recommendations
+
+
+def build_index(session, path: str = VECTOR_INDEX_PATH) -> VectorIndex:
+    """Index every job from scratch and save it to `path`"""
+    index = VectorIndex()
+    sync_index(session, index)
+    index.save(path)
+    return index
+
+
+def main(argv=None) -> int:
+    from .db import cli_session
+
+    parser = argparse.ArgumentParser(description="Job vector index and recommendations")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build-index", help="Rebuild the saved job index from the jobs table")
+    build.add_argument("--path", default=VECTOR_INDEX_PATH)
+    run = commands.add_parser("recommend", help="Recompute the matches of resumes")
+    run.add_argument("resume_ids", nargs="+")
+    run.add_argument("-k", type=int, default=RECOMMEND_TOP_K)
+    args = parser.parse_args(argv)
+
+    with cli_session() as session:
+        if args.command == "build-index":
+            started = time.perf_counter()
+            index = build_index(session, args.path)
+            print(f"Indexed {len(index)} jobs into {args.path} in {time.perf_counter() - started:.1f}s")
+        else:
+            for resume_id, matches in recommend(session, args.resume_ids, args.k).items():
+                print(resume_id)
+                for match in matches:
+                    print(f"  job {match['job_id']:<8} {match['score']:.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
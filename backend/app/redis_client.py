@@ -0,0 +1,168 @@
+import os
+import logging
+from typing import Dict, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+import redis
+import redis.asyncio as aioredis
+from prometheus_client import Gauge
+
+from .metrics import register_refresher
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "20"))
+# Seconds to wait for a free pooled connection before failing
+REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", "2"))
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "5"))
+REDIS_SOCKET_CONNECT_TIMEOUT = float(os.getenv("REDIS_SOCKET_CONNECT_TIMEOUT", "2"))
+REDIS_SOCKET_KEEPALIVE = os.getenv("REDIS_SOCKET_KEEPALIVE", "true").lower() != "false"
+REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", "30"))
+
+# One logical database per purpose so keys, eviction and FLUSHDB stay
+# isolated. Override with e.g. REDIS_DB_LIMITER=5.
+REDIS_DATABASES = {
+    "celery_broker": 0,
+    "celery_results": 1,
+    "limiter": 2,
+    "cache": 3,
+    "events": 4,
+}
+
+redis_pool_in_use = Gauge(
+    'redis_pool_connections_in_use',
+    'Redis connections checked out of the pool',
+    ['purpose'],
+    multiprocess_mode='livesum',
+)
+redis_pool_idle = Gauge(
+    'redis_pool_connections_idle',
+    'Idle Redis connections held by the pool',
+    ['purpose'],
+    multiprocess_mode='livesum',
+)
+redis_pool_max = Gauge(
+    'redis_pool_max_connections',
+    'Configured Redis pool size',
+    ['purpose'],
+    multiprocess_mode='livesum',
+)
+
+_async_clients: Dict[str, aioredis.Redis] = {}
+_sync_clients: Dict[str, redis.Redis] = {}
+
+
+def redis_db(purpose: str) -> int:
+    if purpose not in REDIS_DATABASES:
+        raise ValueError(f"Unknown Redis purpose: {purpose}")
+    return int(os.getenv(f"REDIS_DB_{purpose.upper()}", REDIS_DATABASES[purpose]))
+
+
+def max_connections(purpose: str) -> int:
+    return int(os.getenv(f"REDIS_MAX_CONNECTIONS_{purpose.upper()}", REDIS_MAX_CONNECTIONS))
+
+
+def redis_url(purpose: str) -> str:
+    """REDIS_URL pointed at the logical database reserved for `purpose`"""
+    parts = urlsplit(REDIS_URL)
+    return urlunsplit((parts.scheme, parts.netloc, f"/{redis_db(purpose)}", parts.query, ""))
+
+
+def _pool_kwargs(purpose: str) -> Dict:
+    return {
+        "max_connections": max_connections(purpose),
+        "timeout": REDIS_POOL_TIMEOUT,
+        "socket_timeout": REDIS_SOCKET_TIMEOUT,
+        "socket_connect_timeout": REDIS_SOCKET_CONNECT_TIMEOUT,
+        "socket_keepalive": REDIS_SOCKET_KEEPALIVE,
+        "health_check_interval": REDIS_HEALTH_CHECK_INTERVAL,
+        "retry_on_timeout": True,
+        "decode_responses": True,
+    }
+
+
+def _pool_counts(pool) -> Tuple[int, int]:
+    """(in use, idle) connection counts for an asyncio or blocking pool"""
+    if hasattr(pool, "_in_use_connections"):
+        return len(pool._in_use_connections), len(pool._available_connections)
+    # The sync blocking pool keeps idle connections in a queue padded with None
+    idle = sum(1 for c in list(pool.pool.queue) if c is not None)
+    return len(pool._connections) - idle, idle
+
+
+def _register_metrics(purpose: str, pool):
+    redis_pool_max.labels(purpose=purpose).set(pool.max_connections)
+
+
+def refresh_pool_metrics():
+    for clients in (_async_clients, _sync_clients):
+        for purpose, client in list(clients.items()):
+            in_use, idle = _pool_counts(client.connection_pool)
+            redis_pool_in_use.labels(purpose=purpose).set(in_use)
+            redis_pool_idle.labels(purpose=purpose).set(idle)
+
+
+register_refresher(refresh_pool_metrics)
+
+
+def get_async_redis(purpose: str) -> aioredis.Redis:
+    """Shared asyncio client for `purpose`; every caller in the process reuses one bounded pool"""
+    client = _async_clients.get(purpose)
+    if client is None:
+        pool = aioredis.BlockingConnectionPool.from_url(redis_url(purpose), **_pool_kwargs(purpose))
+        client = _async_clients[purpose] = aioredis.Redis(connection_pool=pool)
+        _register_metrics(purpose, pool)
+    return client
+
+
+def get_sync_redis(purpose: str) -> redis.Redis:
+    """Shared blocking client for `purpose`, for Celery tasks and CLIs"""
+    client = _sync_clients.get(purpose)
+    if client is None:
+        pool = redis.BlockingConnectionPool.from_url(redis_url(purpose), **_pool_kwargs(purpose))
+        client = _sync_clients[purpose] = redis.Redis(connection_pool=pool)
+        _register_metrics(purpose, pool)
+    return client
+
+
+async def close_redis():
+    for client in _async_clients.values():
+        await client.aclose()
+    _async_clients.clear()
+    for client in _sync_clients.values():
+        client.close()
+    _sync_clients.clear()
+
+
+def celery_redis_config() -> Dict:
+    """Broker/backend settings for Celery using the same pooling policy"""
+    transport_options = {
+        "max_connections": max_connections("celery_broker"),
+        "socket_timeout": REDIS_SOCKET_TIMEOUT,
+        "socket_connect_timeout": REDIS_SOCKET_CONNECT_TIMEOUT,
+        "socket_keepalive": REDIS_SOCKET_KEEPALIVE,
+        "health_check_interval": REDIS_HEALTH_CHECK_INTERVAL,
+    }
+    return {
+        "broker_url": os.getenv("CELERY_BROKER_URL", redis_url("celery_broker")),
+        # Redis is a broker only; task outcomes live in Postgres. Set
+        # CELERY_RESULT_BACKEND (e.g. to redis_url("celery_results")) to opt in.
+        "result_backend": os.getenv("CELERY_RESULT_BACKEND") or None,
+        "broker_pool_limit": max_connections("celery_broker"),
+        "broker_transport_options": transport_options,
+        "redis_max_connections": max_connections("celery_results"),
+        "redis_socket_timeout": REDIS_SOCKET_TIMEOUT,
+        "redis_socket_connect_timeout": REDIS_SOCKET_CONNECT_TIMEOUT,
+        "redis_socket_keepalive": REDIS_SOCKET_KEEPALIVE,
+        "redis_backend_health_check_interval": REDIS_HEALTH_CHECK_INTERVAL,
+    }
+
+
+def _reset_after_fork():
+    # Pools must not be shared across fork; children build their own lazily
+    _async_clients.clear()
+    _sync_clients.clear()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
@@ -1,30 +1,170 @@
+import os
 import time
+from datetime import datetime, timezone
 from celery.utils.log import get_task_logger
 from .celery_worker import celery_app
 import sentry_sdk
 from prometheus_client import Histogram
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.exc import IntegrityError, OperationalError
+from .db import get_sync_session
+from .models import Resume, ResumeStatus, ImportJob, ImportItem, ImportItemStatus, ImportStatus
+from .utils.pdf_sanitizer import sanitize_pdf
+from .utils.pdf_validation import validate_pdf_bytes, PDFValidationError
+from .utils import models
+from .events import publish_event, resume_event
+from . import job_ingest, recommend
 
 logger = get_task_logger(__name__)
 
+# Longest error message stored on a failed resume
+MAX_ERROR_LENGTH = 1000
+
 pdf_processing_histogram = Histogram(
     'resume_pdf_processing_seconds',
     'Time spent processing resume PDFs',
     ['status']
 )
 
-@celery_app.task(bind=True, name="process_pdf")
-def process_pdf(self, resume_id: int, file_path: str):
+def set_resume_status(resume_id: str, status: ResumeStatus, user_id: int = None, **values):
+    """
+    The single place task outcomes are recorded; the API reads them from
+    resumes.status and, when `user_id` is known, the owner's event stream gets them too
+    """
+    with get_sync_session() as session:
+        session.execute(update(Resume).where(Resume.id == resume_id).values(status=status, **values))
+        session.commit()
+    if user_id is not None:
+        fields = {key: values[key] for key in ("skills", "error") if values.get(key) is not None}
+        publish_event(user_id, resume_event(resume_id, status.value, **fields))
+
+# user_id is optional so messages queued before it was added still run
+@celery_app.task(bind=True, name="process_pdf", ignore_result=True, max_retries=3)
+def process_pdf(self, resume_id: str, file_path: str, user_id: int = None):
     logger.info(f"[Task] Start processing resume {resume_id} at {file_path}")
     start = time.time()
+    set_resume_status(resume_id, ResumeStatus.processing, user_id)
     try:
-        # Simulate PDF processing
-        time.sleep(2)
-        # Here: extract text, parse skills, store in DB, etc.
-        logger.info(f"[Task] Finished processing resume {resume_id}")
-        pdf_processing_histogram.labels(status="success").observe(time.time() - start)
-        return {"status": "success", "resume_id": resume_id}
+        analysis = models.get("resume_parser").parse_resume(file_path)
     except Exception as e:
         logger.error(f"[Task] Error processing resume {resume_id}: {e}")
         sentry_sdk.capture_exception(e)
         pdf_processing_histogram.labels(status="error").observe(time.time() - start)
-        raise self.retry(exc=e, countdown=10, max_retries=3) 
\ No newline at end of file
+        if self.request.retries >= self.max_retries:
+            set_resume_status(resume_id, ResumeStatus.failed, user_id, error=str(e)[:MAX_ERROR_LENGTH],
+                              processed_at=datetime.now(timezone.utc))
+            raise
+        set_resume_status(resume_id, ResumeStatus.queued, user_id)
+        raise self.retry(exc=e, countdown=10)
+    set_resume_status(resume_id, ResumeStatus.ready, user_id, skills=analysis["skills"], error=None,
+                      processed_at=datetime.now(timezone.utc))
+    logger.info(f"[Task] Finished processing resume {resume_id}")
+    pdf_processing_histogram.labels(status="success").observe(time.time() - start)
+
+# Bulk import pipeline (app.bulk_import): each chunk of files is sanitized on
+# the io queue, then parsed and bulk-inserted on the bulk queue. Item status
+# makes every step idempotent, so redelivered or re-queued chunks only finish
+# what is left.
+
+def _import_items(session, item_ids, status: ImportItemStatus):
+    return session.execute(
+        select(ImportItem).where(ImportItem.id.in_(item_ids), ImportItem.status == status)
+    ).scalars().all()
+
+def _fail_item(item: ImportItem, error: Exception):
+    item.status = ImportItemStatus.failed
+    item.error = str(error)[:MAX_ERROR_LENGTH]
+    remove_file(item.path)
+
+def remove_file(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+# Per-file problems fail the item; only database outages retry the whole chunk
+@celery_app.task(name="import_sanitize_chunk", autoretry_for=(OperationalError,), retry_backoff=True, max_retries=5)
+def import_sanitize_chunk(import_id: str, item_ids: list):
+    """Validate and deep-sanitize the chunk's staged PDFs; returns the ids ready for parsing"""
+    with get_sync_session() as session:
+        for item in _import_items(session, item_ids, ImportItemStatus.pending):
+            try:
+                with open(item.path, "rb") as f:
+                    validate_pdf_bytes(f.read())
+                if not sanitize_pdf(item.path, item.path):
+                    raise PDFValidationError("PDF sanitization failed")
+                item.status = ImportItemStatus.sanitized
+            except Exception as e:
+                _fail_item(item, e)
+        session.commit()
+        return [item.id for item in _import_items(session, item_ids, ImportItemStatus.sanitized)]
+
+@celery_app.task(name="import_parse_chunk", autoretry_for=(OperationalError,), retry_backoff=True, max_retries=5)
+def import_parse_chunk(item_ids: list, import_id: str):
+    """Parse the chunk's sanitized PDFs and insert their resumes in one multi-row INSERT; returns the resume ids"""
+    parser = models.get("resume_parser")
+    now = datetime.now(timezone.utc)
+    with get_sync_session() as session:
+        job = session.get(ImportJob, import_id)
+        resumes = []
+        for item in _import_items(session, item_ids, ImportItemStatus.sanitized):
+            try:
+                analysis = parser.parse_resume(item.path)
+            except Exception as e:
+                _fail_item(item, e)
+                continue
+            resumes.append({
+                "id": item.resume_id, "filename": os.path.basename(item.filename), "user_id": job.user_id,
+                "skills": analysis["skills"], "status": ResumeStatus.ready, "processed_at": now,
+            })
+            item.status = ImportItemStatus.ready
+        if resumes:
+            session.execute(insert(Resume), resumes)
+        try:
+            session.commit()
+        except IntegrityError:
+            # Another delivery of this chunk got there first; its rows stand
+            session.rollback()
+            logger.warning(f"[Task] Import {import_id}: chunk already inserted by another worker")
+        refresh_import_progress(session, import_id)
+        # The chain's next step recommends jobs for them
+        return [item.resume_id for item in _import_items(session, item_ids, ImportItemStatus.ready)]
+
+def refresh_import_progress(session, import_id: str) -> ImportJob:
+    """Recount the job's items (safe under redelivery) and tell the owner"""
+    counts = dict(session.execute(
+        select(ImportItem.status, func.count()).where(ImportItem.import_id == import_id).group_by(ImportItem.status)
+    ).all())
+    job = session.get(ImportJob, import_id)
+    job.succeeded = counts.get(ImportItemStatus.ready, 0)
+    job.failed = counts.get(ImportItemStatus.failed, 0)
+    if job.succeeded + job.failed >= job.total and job.status != ImportStatus.completed:
+        job.status = ImportStatus.completed
+        job.finished_at = datetime.now(timezone.utc)
+    session.commit()
+    publish_event(job.user_id, {
+        "type": "import.progress", "import_id": import_id, "status": job.status.value,
+        "total": job.total, "succeeded": job.succeeded, "failed": job.failed,
+    })
+    return job
+
+@celery_app.task(name="ingest_jobs", autoretry_for=(OperationalError,), retry_backoff=True, max_retries=5)
+def ingest_jobs(path: str):
+    """One staged batch of a job feed posted to /v1/admin/jobs; the upsert makes redelivery harmless"""
+    # n_process stays 1: a prefork child cannot fork spaCy workers of its own
+    with get_sync_session() as session:
+        stats = job_ingest.ingest_staged(session, path)
+    if stats is None:
+        logger.info(f"[Task] Job feed batch {path} was already ingested")
+        return
+    logger.info(f"[Task] Job feed batch: {stats['upserted']} upserted, {stats['unchanged']} unchanged")
+
+@celery_app.task(name="recommend_jobs", ignore_result=True, autoretry_for=(OperationalError,), retry_backoff=True,
+                 max_retries=5)
+def recommend_jobs(resume_ids: list, user_id: int = None):
+    """Replace the resumes' matches with their top jobs; linked after parsing, so ids come first"""
+    with get_sync_session() as session:
+        recommendations = recommend.recommend(session, resume_ids)
+    if user_id is not None:
+        for resume_id, matches in recommendations.items():
+            publish_event(user_id, {"type": "resume.matches", "resume_id": resume_id, "matches": matches})
@@ -0,0 +1,230 @@
+"""
+Sentence embeddings for skills, shared by ResumeParser and SkillsMatcher.
+
+EMBEDDING_BACKEND selects the implementation:
+  torch - sentence-transformers on PyTorch; the reference
+  onnx  - the same model exported to ONNX with int8 dynamic quantization and
+          run by onnxruntime; torch is never imported
+
+Build and check the ONNX model once (needs torch, transformers, onnxruntime):
+
+    python -m app.utils.embeddings export --out ./models/minilm-onnx
+    python -m app.utils.embeddings validate --out ./models/minilm-onnx
+"""
+import os
+import sys
+import argparse
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+ONNX_MODEL_DIR = Path(os.getenv("ONNX_MODEL_DIR", "./models/minilm-onnx"))
+# Matches the max_seq_length of all-MiniLM-L6-v2 in sentence-transformers
+EMBEDDING_MAX_LENGTH = int(os.getenv("EMBEDDING_MAX_LENGTH", "256"))
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+ONNX_INTRA_OP_THREADS = int(os.getenv("ONNX_INTRA_OP_THREADS", "1"))
+# validate fails if any text's ONNX embedding is less similar than this to the torch one
+ONNX_MIN_COSINE = float(os.getenv("ONNX_MIN_COSINE", "0.98"))
+
+QUANTIZED_FILENAME = "model.int8.onnx"
+
+VALIDATION_TEXTS = [
+    "python", "javascript", "react", "node.js", "postgresql", "docker", "kubernetes", "aws",
+    "machine learning", "rest api", "ci/cd", "c++", "sql server", "project management",
+    "experience with distributed systems", "built data pipelines in apache spark",
+    "proficient in typescript and graphql", "led a team of five backend engineers",
+]
+
+
+def mean_pool(hidden: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+    """Average token embeddings, ignoring padding"""
+    mask = attention_mask[..., None].astype(hidden.dtype)
+    return (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+
+def l2_normalize(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+
+
+def to_bytes(vectors: np.ndarray) -> bytes:
+    """float32 bytes for a LargeBinary column"""
+    return np.ascontiguousarray(vectors, dtype=np.float32).tobytes()
+
+
+def from_bytes(data: bytes, rows: Optional[int] = None) -> np.ndarray:
+    """Inverse of to_bytes; a (rows, dim) matrix when `rows` is given, else a vector"""
+    vectors = np.frombuffer(data, dtype=np.float32)
+    return vectors.reshape(rows, -1) if rows is not None else vectors
+
+
+class TorchEmbedder:
+    backend = "torch"
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL):
+        from sentence_transformers import SentenceTransformer
+        from app.utils.thread_budget import apply_torch_limits
+
+        apply_torch_limits()
+        self.model = SentenceTransformer(model_name)
+        self.dimension = self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: Iterable[str], batch_size: int = EMBEDDING_BATCH_SIZE) -> np.ndarray:
+        return self.model.encode(list(texts), batch_size=batch_size, convert_to_numpy=True)
+
+
+class OnnxEmbedder:
+    backend = "onnx"
+
+    def __init__(self, model_dir: Path = ONNX_MODEL_DIR):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_path = Path(model_dir) / QUANTIZED_FILENAME
+        if not model_path.exists():
+            raise FileNotFoundError(
+                f"{model_path} not found; build it with: python -m app.utils.embeddings export --out {model_dir}"
+            )
+        self.tokenizer = Tokenizer.from_file(str(Path(model_dir) / "tokenizer.json"))
+        self.tokenizer.enable_truncation(EMBEDDING_MAX_LENGTH)
+        self.tokenizer.enable_padding()
+
+        self._ort = ort
+        self.model_path = model_path
+        self._session = None
+        self._session_pid = None
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.dimension = self.session.get_outputs()[0].shape[-1]
+
+    @property
+    def session(self):
+        # onnxruntime's thread pool does not survive fork, so a model preloaded
+        # in a parent process gets a fresh session in each child
+        if self._session is None or self._session_pid != os.getpid():
+            options = self._ort.SessionOptions()
+            options.intra_op_num_threads = ONNX_INTRA_OP_THREADS
+            options.inter_op_num_threads = 1
+            options.graph_optimization_level = self._ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            self._session = self._ort.InferenceSession(str(self.model_path), options, providers=["CPUExecutionProvider"])
+            self._session_pid = os.getpid()
+        return self._session
+
+    def encode(self, texts: Iterable[str], batch_size: int = EMBEDDING_BATCH_SIZE) -> np.ndarray:
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        # Batch texts of similar length together so little compute goes on padding
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        output = np.empty((len(texts), self.dimension), dtype=np.float32)
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            encodings = self.tokenizer.encode_batch([texts[i] for i in batch])
+            input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+            attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+            feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+            if "token_type_ids" in self.input_names:
+                feeds["token_type_ids"] = np.zeros_like(input_ids)
+            hidden = self.session.run(None, feeds)[0]
+            output[batch] = l2_normalize(mean_pool(hidden, attention_mask))
+        return output
+
+
+def load_embedder(backend: str = EMBEDDING_BACKEND):
+    if backend == "torch":
+        return TorchEmbedder()
+    if backend == "onnx":
+        return OnnxEmbedder()
+    raise ValueError(f"Unknown EMBEDDING_BACKEND: {backend}")
+
+
+_embedder = None
+_embedder_lock = threading.Lock()
+
+
+def get_embedder():
+    """Process-wide embedder for EMBEDDING_BACKEND, loaded on first use"""
+    global _embedder
+    if _embedder is None:
+        with _embedder_lock:
+            if _embedder is None:
+                _embedder = load_embedder()
+                logger.info(f"Loaded {_embedder.backend} embedding backend")
+    return _embedder
+
+
+def export_onnx(model_name: str = EMBEDDING_MODEL, out_dir: Path = ONNX_MODEL_DIR, opset: int = 17) -> Path:
+    """Export the transformer to ONNX and write an int8 dynamically quantized copy next to it"""
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModel.from_pretrained(model_name).eval()
+    tokenizer.save_pretrained(out_dir)
+
+    inputs = ("input_ids", "attention_mask", "token_type_ids")
+    sample = tokenizer(["python developer"], return_tensors="pt")
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in inputs + ("last_hidden_state",)}
+    fp32_path = out_dir / "model.onnx"
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in inputs),
+            str(fp32_path),
+            input_names=list(inputs),
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+        )
+    quantized_path = out_dir / QUANTIZED_FILENAME
+    quantize_dynamic(str(fp32_path), str(quantized_path), weight_type=QuantType.QInt8)
+    logger.info(f"Wrote {quantized_path} ({quantized_path.stat().st_size / 2**20:.1f} MB)")
+    return quantized_path
+
+
+def validate(model_dir: Path = ONNX_MODEL_DIR, texts: Optional[list] = None) -> Dict:
+    """Compare ONNX embeddings against the torch reference on `texts`"""
+    texts = texts or VALIDATION_TEXTS
+    reference = l2_normalize(TorchEmbedder().encode(texts))
+    candidate = OnnxEmbedder(model_dir).encode(texts)
+    cosine = np.sum(reference * candidate, axis=1)
+    # Pairwise similarities are what the matcher consumes, so check those too
+    similarity_drift = np.abs(reference @ reference.T - candidate @ candidate.T)
+    return {
+        "texts": len(texts),
+        "min_cosine": float(cosine.min()),
+        "mean_cosine": float(cosine.mean()),
+        "max_similarity_drift": float(similarity_drift.max()),
+        "mean_similarity_drift": float(similarity_drift.mean()),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Build and check the quantized ONNX embedder")
+    parser.add_argument("command", choices=["export", "validate"])
+    parser.add_argument("--model", default=EMBEDDING_MODEL)
+    parser.add_argument("--out", type=Path, default=ONNX_MODEL_DIR)
+    parser.add_argument("--min-cosine", type=float, default=ONNX_MIN_COSINE)
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        print(f"Exported {export_onnx(args.model, args.out)}")
+    report = validate(args.out)
+    for key, value in report.items():
+        print(f"{key:<22} {value:.4f}" if isinstance(value, float) else f"{key:<22} {value}")
+    if report["min_cosine"] < args.min_cosine:
+        print(f"FAILED: min cosine {report['min_cosine']:.4f} < {args.min_cosine}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,9 @@
 import spacy
 import re
-from typing import List, Dict
+import os
+import threading
+from typing import Dict, Iterable, Iterator, List
+from app.utils.stage_timer import stage
 
 # Use the same skills list as resume_parser for consistency
 SKILLS = [
@@ -8,24 +11,41 @@ SKILLS = [
     "kubernetes", "tensorflow", "pytorch", "fastapi", "django", "flask", "git", "linux", "azure"
 ]
 
-try:
-    nlp = spacy.load("en_core_web_sm")
-except OSError:
-    import os
-    os.system("python -m spacy download en_core_web_sm")
-    nlp = spacy.load("en_core_web_sm")
+# Texts per nlp.pipe batch
+JD_PIPE_BATCH_SIZE = int(os.getenv("JD_PIPE_BATCH_SIZE", "64"))
+# All that extract_skills_from_jd reads from a doc is its entities
+NER_PIPES = ("tok2vec", "ner")
 
-def extract_skills_from_jd(text: str) -> List[str]:
+_nlp = None
+_nlp_lock = threading.Lock()
+
+
+def get_nlp():
+    """spaCy pipeline for job descriptions, loaded on first use; app.utils.models warms it at startup"""
+    global _nlp
+    if _nlp is None:
+        with _nlp_lock:
+            if _nlp is None:
+                try:
+                    _nlp = spacy.load("en_core_web_sm")
+                except OSError:
+                    os.system("python -m spacy download en_core_web_sm")
+                    _nlp = spacy.load("en_core_web_sm")
+    return _nlp
+
+def extract_skills_from_jd(text: str, doc=None) -> List[str]:
     text_lower = text.lower()
     found = set()
-    for skill in SKILLS:
-        if skill in text_lower:
-            found.add(skill)
+    with stage("jd_keyword_match"):
+        for skill in SKILLS:
+            if skill in text_lower:
+                found.add(skill)
     # Optionally, use spaCy NER for more
-    doc = nlp(text)
-    for ent in doc.ents:
-        if ent.label_ in ["ORG", "PRODUCT"] and ent.text.lower() in SKILLS:
-            found.add(ent.text.lower())
+    with stage("jd_spacy"):
+        doc = doc if doc is not None else get_nlp()(text)
+        for ent in doc.ents:
+            if ent.label_ in ["ORG", "PRODUCT"] and ent.text.lower() in SKILLS:
+                found.add(ent.text.lower())
     return list(found)
 
 def extract_education_from_jd(text: str) -> List[str]:
@@ -37,9 +57,24 @@ def extract_experience_from_jd(text: str) -> List[str]:
     experience = re.findall(r"(\d+\+?\s*(?:years?|yrs?) of experience)", text, re.IGNORECASE)
     return list(set(experience))
 
-def parse_job_description(text: str) -> Dict:
+def parse_job_description(text: str, doc=None) -> Dict:
+    skills = extract_skills_from_jd(text, doc)
+    with stage("jd_regex_extract"):
+        education = extract_education_from_jd(text)
+        experience = extract_experience_from_jd(text)
     return {
-        "skills": extract_skills_from_jd(text),
-        "education": extract_education_from_jd(text),
-        "experience": extract_experience_from_jd(text)
-    } 
\ No newline at end of file
+        "skills": skills,
+        "education": education,
+        "experience": experience
+    } 
+
+def parse_job_descriptions(texts: Iterable[str], batch_size: int = JD_PIPE_BATCH_SIZE, n_process: int = 1) -> Iterator[Dict]:
+    """
+    parse_job_description for a stream of texts, in order. spaCy batches them
+    through nlp.pipe, running only the components NER needs; n_process > 1
+    forks that many workers, so don't use it inside a Celery child.
+    """
+    nlp = get_nlp()
+    unused = [name for name in nlp.pipe_names if name not in NER_PIPES]
+    for doc in nlp.pipe(texts, batch_size=batch_size, n_process=n_process, disable=unused):
+        yield parse_job_description(doc.text, doc)
@@ -0,0 +1,75 @@
+import os
+import resource
+import sys
+import tracemalloc
+from typing import Dict, List, Optional
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def rss_bytes() -> int:
+    """Current resident set size of this process"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        # No procfs (macOS): fall back to peak RSS, reported in bytes there
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class TracemallocSession:
+    """Start tracemalloc on demand and report allocation growth between snapshots"""
+
+    def __init__(self):
+        self._previous: Optional[tracemalloc.Snapshot] = None
+
+    @property
+    def active(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = 10):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self._previous = self._take()
+
+    def stop(self):
+        tracemalloc.stop()
+        self._previous = None
+
+    def _take(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ))
+
+    def diff(self, limit: int = 20, key_type: str = "lineno") -> Dict:
+        """Top allocation sites by growth since the previous snapshot (or start)"""
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is not running")
+        snapshot = self._take()
+        stats = snapshot.compare_to(self._previous, key_type) if self._previous else snapshot.statistics(key_type)
+        self._previous = snapshot
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "traced_current_bytes": current,
+            "traced_peak_bytes": peak,
+            "rss_bytes": rss_bytes(),
+            "top": [_stat_dict(stat) for stat in stats[:limit]],
+        }
+
+
+def _stat_dict(stat) -> Dict:
+    frames: List[str] = [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback]
+    return {
+        "site": frames[0] if frames else "?",
+        "traceback": frames,
+        "size_bytes": stat.size,
+        "size_diff_bytes": getattr(stat, "size_diff", stat.size),
+        "count": stat.count,
+        "count_diff": getattr(stat, "count_diff", stat.count),
+    }
+
+
+tracemalloc_session = TracemallocSession()
@@ -0,0 +1,148 @@
+"""
+Model registry: loads, warms and reports the NLP models of one process.
+
+Nothing is loaded at import. Each serving process calls warm_up() once at
+startup (Celery: worker_process_init in every child; API: the lifespan). It
+loads every model, runs a dummy inference so lazy allocations, kernel
+selection and tokenizer caches are paid before the first real request, and
+marks the process ready. Request code goes through get(); it loads on first
+use if warm-up did not run.
+
+load_all() only loads: it is safe in a parent before fork (see preload),
+while warm_up() runs inference and belongs in the child.
+"""
+import importlib
+import os
+import threading
+import time
+import logging
+from typing import Callable, Dict, Tuple
+
+from prometheus_client import Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "true").lower() != "false"
+
+WARMUP_TEXT = (
+    "Senior Python developer with 5 years of experience building REST APIs in FastAPI. "
+    "Worked with Docker, Kubernetes and AWS. Bachelor of Science in Computer Science, 2018."
+)
+
+
+def _warm_embedder(embedder):
+    embedder.encode(["python", "machine learning"])
+
+
+def _warm_resume_parser(parser):
+    parser.extract_skills(WARMUP_TEXT)
+
+
+def _warm_job_parser(nlp):
+    from app.utils.job_parser import parse_job_description
+
+    parse_job_description(WARMUP_TEXT)
+
+
+def _warm_skills_matcher(matcher):
+    matcher.get_detailed_matching(["python", "docker"], ["python", "kubernetes"])
+
+
+# name -> (module, getter, dummy inference on the loaded model); loaded in this order
+MODELS: Dict[str, Tuple[str, str, Callable]] = {
+    "embedder": ("app.utils.embeddings", "get_embedder", _warm_embedder),
+    "resume_parser": ("app.utils.resume_parser", "get_resume_parser", _warm_resume_parser),
+    "job_parser": ("app.utils.job_parser", "get_nlp", _warm_job_parser),
+    "skills_matcher": ("app.utils.skills_matcher", "get_skills_matcher", _warm_skills_matcher),
+}
+
+model_warmup_seconds = Histogram(
+    'model_warmup_seconds',
+    'Time to load and warm each model in a process',
+    ['model', 'phase'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 80),
+)
+models_ready_gauge = Gauge(
+    'models_ready',
+    'Whether this process has loaded and warmed all models',
+    multiprocess_mode='liveall',
+)
+
+_state = {"ready": False, "loaded": {}, "warmup_seconds": {}, "error": None}
+_lock = threading.Lock()
+
+
+def get(name: str):
+    """The process-wide instance of model `name`, loading it if needed"""
+    module_name, getter, _ = MODELS[name]
+    return getattr(importlib.import_module(module_name), getter)()
+
+
+def _load(name: str):
+    start = time.perf_counter()
+    model = get(name)
+    elapsed = time.perf_counter() - start
+    model_warmup_seconds.labels(model=name, phase="load").observe(elapsed)
+    _state["loaded"][name] = True
+    return model, elapsed
+
+
+def load_all():
+    """Load every model without running inference"""
+    for name in MODELS:
+        _load(name)
+
+
+def warm_up() -> Dict:
+    """Load and warm every model once; returns model_state()"""
+    with _lock:
+        if _state["ready"]:
+            return model_state()
+        total = time.perf_counter()
+        try:
+            for name, (_, _, warm) in MODELS.items():
+                model, load_seconds = _load(name)
+                start = time.perf_counter()
+                warm(model)
+                warm_seconds = time.perf_counter() - start
+                model_warmup_seconds.labels(model=name, phase="warm").observe(warm_seconds)
+                _state["warmup_seconds"][name] = round(load_seconds + warm_seconds, 3)
+        except Exception as e:
+            # Report degraded rather than crash the process; requests still load lazily
+            _state["error"] = f"{name}: {e}"
+            logger.exception(f"Model warm-up failed in process {os.getpid()} at {name}")
+            return model_state()
+        _state["ready"] = True
+        _state["error"] = None
+        models_ready_gauge.set(1)
+        logger.info(f"Models ready in process {os.getpid()} after {time.perf_counter() - total:.2f}s")
+    return model_state()
+
+
+def model_status() -> str:
+    """warm, warming (not yet serving), lazy (warm-up disabled) or degraded (warm-up failed)"""
+    if _state["ready"]:
+        return "warm"
+    if _state["error"]:
+        # Requests still load lazily, so the process serves; it is only slower
+        return "degraded"
+    return "warming" if MODEL_WARMUP else "lazy"
+
+
+def model_state() -> Dict:
+    """Readiness of this process's models, for the health endpoints"""
+    state = {
+        "status": model_status(),
+        "warm": _state["ready"],
+        "models": {name: _state["loaded"].get(name, False) for name in MODELS},
+        "warmup_seconds": dict(_state["warmup_seconds"]),
+    }
+    if _state["error"]:
+        state["error"] = _state["error"]
+    return state
+
+
+def reset():
+    """Forget readiness (not the loaded models); for tests"""
+    _state.update({"ready": False, "loaded": {}, "warmup_seconds": {}, "error": None})
+    models_ready_gauge.set(0)
@@ -0,0 +1,123 @@
+import asyncio
+import logging
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+from prometheus_client import Counter, Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+# bcrypt cost factor. Raising it makes existing hashes "deprecated", and they
+# are transparently re-hashed the next time the user logs in.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# Threads dedicated to hashing. bcrypt releases the GIL, so this is the real
+# CPU cap for password work on this process.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+# Requests allowed to wait for a hashing thread before we shed load.
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=BCRYPT_ROUNDS,
+)
+
+_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash",
+)
+_pending = 0
+_pending_lock = threading.Lock()
+
+password_hash_queue_depth = Gauge(
+    'password_hash_queue_depth',
+    'Password hash operations waiting for a worker thread',
+    multiprocess_mode='livesum',
+)
+password_hash_in_flight = Gauge(
+    'password_hash_in_flight',
+    'Password hash operations currently running',
+    multiprocess_mode='livesum',
+)
+password_hash_wait_seconds = Histogram(
+    'password_hash_wait_seconds',
+    'Time password hash operations spent queued',
+    ['operation'],
+)
+password_hash_seconds = Histogram(
+    'password_hash_seconds',
+    'Time spent hashing or verifying passwords',
+    ['operation'],
+)
+password_hash_rejected_total = Counter(
+    'password_hash_rejected_total',
+    'Password hash operations rejected because the queue was full',
+    ['operation'],
+)
+password_rehash_total = Counter(
+    'password_rehash_total',
+    'Password hashes upgraded on login after a cost parameter change',
+)
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing queue is full and the request should be retried later"""
+
+
+def _timed(operation: str, enqueued_at: float, fn, *args):
+    started = time.perf_counter()
+    password_hash_wait_seconds.labels(operation=operation).observe(started - enqueued_at)
+    password_hash_queue_depth.dec()
+    password_hash_in_flight.inc()
+    try:
+        return fn(*args)
+    finally:
+        password_hash_in_flight.dec()
+        password_hash_seconds.labels(operation=operation).observe(time.perf_counter() - started)
+
+
+def _release(future):
+    # Runs when the pool is done with the operation, even if the awaiting request was cancelled
+    global _pending
+    with _pending_lock:
+        _pending -= 1
+    if future.cancelled():
+        # Cancelled before a thread picked it up, so _timed never took it off the queue
+        password_hash_queue_depth.dec()
+
+
+async def _run(operation: str, fn, *args):
+    global _pending
+    with _pending_lock:
+        if _pending >= PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_QUEUE:
+            password_hash_rejected_total.labels(operation=operation).inc()
+            raise PasswordHasherBusy(f"Password {operation} queue is full")
+        _pending += 1
+    password_hash_queue_depth.inc()
+    future = _executor.submit(_timed, operation, time.perf_counter(), fn, *args)
+    future.add_done_callback(_release)
+    return await asyncio.wrap_future(future)
+
+
+async def hash_password(password: str) -> str:
+    """Hash a password on the dedicated hashing pool"""
+    return await _run("hash", pwd_context.hash, password)
+
+
+async def verify_password(password: str, password_hash: Optional[str]) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password on the dedicated hashing pool.
+    Returns (valid, new_hash); new_hash is set when the stored hash uses outdated
+    cost parameters and should be persisted in place of the old one.
+    """
+    if not password_hash:
+        return False, None
+    valid, new_hash = await _run("verify", pwd_context.verify_and_update, password, password_hash)
+    if valid and new_hash:
+        password_rehash_total.inc()
+        logger.info("Password hash parameters outdated, re-hashing on login")
+    return valid, new_hash
@@ -23,7 +23,7 @@ def sanitize_pdf(input_path: str, output_path: Optional[str] = None, user_id: Op
     }
     logger.bind(**log_context).info("Sanitization started")
     try:
-        with pikepdf.open(input_path) as pdf:
+        with pikepdf.open(input_path, allow_overwriting_input=True) as pdf:
             # Remove JavaScript
             if "/Names" in pdf.Root:
                 names = pdf.Root["/Names"]
@@ -48,20 +48,20 @@ def sanitize_pdf(input_path: str, output_path: Optional[str] = None, user_id: Op
                     del pdf.Root[action_key]
             pdf.save(output_path)
         duration = time.time() - start_time
-        logger.bind(
+        logger.bind(**{
             **log_context,
-            sanitization_status="success",
-            duration=duration,
-            severity="info"
-        ).info("Sanitization successful")
+            "sanitization_status": "success",
+            "duration": duration,
+            "severity": "info",
+        }).info("Sanitization successful")
         return True
     except Exception as e:
         duration = time.time() - start_time
-        logger.bind(
+        logger.bind(**{
             **log_context,
-            sanitization_status="failed",
-            failure_reason=str(e),
-            duration=duration,
-            severity="error"
-        ).exception("Sanitization failed")
+            "sanitization_status": "failed",
+            "failure_reason": str(e),
+            "duration": duration,
+            "severity": "error",
+        }).exception("Sanitization failed")
         return False 
\ No newline at end of file
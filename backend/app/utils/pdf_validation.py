@@ -0,0 +1,34 @@
+"""Structural checks every PDF passes before it is stored (single uploads and bulk imports)"""
+from io import BytesIO
+
+from PyPDF2 import PdfReader
+
+MAX_PDF_PAGES = 20
+MAX_TEXT_SIZE = 50 * 1024  # 50KB
+
+
+class PDFValidationError(ValueError):
+    pass
+
+
+def validate_pdf_bytes(file_bytes: bytes):
+    """Raise PDFValidationError (or PyPDF2's error for unreadable files) if the PDF is not acceptable"""
+    if not file_bytes.startswith(b'%PDF'):
+        raise PDFValidationError("File is not a valid PDF (magic number mismatch)")
+    pdf = PdfReader(BytesIO(file_bytes))
+    num_pages = len(pdf.pages)
+    if num_pages > MAX_PDF_PAGES:
+        raise PDFValidationError(f"PDF exceeds max page limit of {MAX_PDF_PAGES}")
+    # Extract text, limit to 50KB
+    extracted_text = ""
+    for page in pdf.pages:
+        if len(extracted_text) > MAX_TEXT_SIZE:
+            break
+        extracted_text += page.extract_text() or ""
+    if len(extracted_text.encode('utf-8')) > MAX_TEXT_SIZE:
+        raise PDFValidationError("PDF text content exceeds 50KB limit")
+    # Check for JavaScript or embedded files (basic check)
+    if "/JavaScript" in str(pdf) or "/JS" in str(pdf):
+        raise PDFValidationError("PDF contains JavaScript, which is not allowed")
+    if any("/EmbeddedFile" in str(obj) for obj in pdf.pages):
+        raise PDFValidationError("PDF contains embedded files, which are not allowed")
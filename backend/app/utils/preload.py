@@ -0,0 +1,137 @@
+"""
+Load the NLP models once in the parent process and share them copy-on-write.
+
+With PRELOAD_MODELS=true, the gunicorn master (preload_app) and the Celery
+worker parent (worker_init) load the registry's models before forking and
+move every object they allocated into the GC's permanent generation. Children
+then never write to those pages just to update GC bookkeeping, so the spaCy
+and MiniLM weights stay shared instead of being copied into each worker.
+
+No inference may run in the parent: OpenMP/torch/onnxruntime thread pools do
+not survive fork. Warm-up (app.utils.models.warm_up) belongs in the child.
+
+Shared vs private memory per process:
+
+    python -m app.utils.preload report --pid <gunicorn master or celery parent pid>
+"""
+import argparse
+import gc
+import os
+import sys
+import logging
+from typing import Dict, List, Optional
+
+from prometheus_client import Gauge
+
+from app.metrics import register_refresher
+
+logger = logging.getLogger(__name__)
+
+PRELOAD_MODELS = os.getenv("PRELOAD_MODELS", "false").lower() == "true"
+
+SMAPS_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+process_shared_memory = Gauge(
+    'process_shared_memory_bytes',
+    'Resident memory of this process shared with other processes (e.g. preloaded models)',
+    multiprocess_mode='liveall',
+)
+process_private_memory = Gauge(
+    'process_private_memory_bytes',
+    'Resident memory private to this process',
+    multiprocess_mode='liveall',
+)
+
+
+def preload_models():
+    """Load (but do not run) the registry's models in this (parent) process"""
+    from app.utils import models
+
+    # Collections in the parent leave freed holes in pages the children share
+    gc.disable()
+    models.load_all()
+    logger.info(f"Preloaded models in parent {os.getpid()}")
+
+
+def freeze_for_fork():
+    """Call right before forking: children's collections then skip everything allocated so far"""
+    gc.freeze()
+
+
+def after_fork_in_child():
+    gc.enable()
+
+
+def smaps_rollup(pid: int) -> Optional[Dict[str, int]]:
+    """Memory breakdown of `pid` in bytes, or None if it is gone or unreadable"""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+    values = {}
+    for line in lines:
+        key, _, rest = line.partition(":")
+        if key in SMAPS_FIELDS:
+            values[key] = int(rest.split()[0]) * 1024
+    values["shared"] = values.get("Shared_Clean", 0) + values.get("Shared_Dirty", 0)
+    values["private"] = values.get("Private_Clean", 0) + values.get("Private_Dirty", 0)
+    return values
+
+
+def child_pids(pid: int) -> List[int]:
+    children = []
+    try:
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                children.extend(int(child) for child in f.read().split())
+    except OSError:
+        pass
+    return sorted(set(children))
+
+
+def memory_report(parent: int) -> List[Dict]:
+    """Shared/private memory for `parent` and each of its children"""
+    report = []
+    for pid in [parent] + child_pids(parent):
+        values = smaps_rollup(pid)
+        if values is not None:
+            report.append({"pid": pid, "role": "parent" if pid == parent else "child", **values})
+    return report
+
+
+def refresh_memory_metrics():
+    values = smaps_rollup(os.getpid())
+    if values is not None:
+        process_shared_memory.set(values["shared"])
+        process_private_memory.set(values["private"])
+
+
+register_refresher(refresh_memory_metrics)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Report shared vs private memory of a pre-forking server")
+    parser.add_argument("command", choices=["report"])
+    parser.add_argument("--pid", type=int, required=True, help="gunicorn master or Celery worker parent")
+    args = parser.parse_args(argv)
+
+    rows = memory_report(args.pid)
+    if not rows:
+        print(f"No readable /proc/{args.pid}/smaps_rollup")
+        return 1
+    mb = 2 ** 20
+    print(f"{'pid':>8} {'role':<7} {'rss MB':>9} {'pss MB':>9} {'shared MB':>10} {'private MB':>11}")
+    for row in rows:
+        print(f"{row['pid']:>8} {row['role']:<7} {row.get('Rss', 0) / mb:>9.1f} {row.get('Pss', 0) / mb:>9.1f} "
+              f"{row['shared'] / mb:>10.1f} {row['private'] / mb:>11.1f}")
+    children = [row for row in rows if row["role"] == "child"]
+    if children:
+        print(f"children: {sum(r['private'] for r in children) / mb:.1f} MB private in total, "
+              f"{sum(r['shared'] for r in children) / len(children) / mb:.1f} MB shared each on average; "
+              f"total PSS {sum(r.get('Pss', 0) for r in rows) / mb:.1f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
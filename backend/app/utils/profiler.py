@@ -0,0 +1,71 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+# Frames deeper than this are truncated from the root side
+MAX_STACK_DEPTH = 128
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+
+
+def _stack(frame) -> list:
+    stack = []
+    while frame is not None and len(stack) < MAX_STACK_DEPTH:
+        stack.append(_frame_label(frame))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+class SamplingProfiler:
+    """
+    Wall-clock sampling profiler built on sys._current_frames().
+    Nothing is installed into the interpreter: cost is only paid by the sampling
+    thread while a profile is running. Output is the collapsed-stack format
+    consumed by flamegraph.pl, speedscope and inferno.
+    """
+
+    def __init__(self, interval: float = 0.005, thread_id: Optional[int] = None):
+        self.interval = interval
+        self.thread_id = thread_id
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def sample(self):
+        own = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own or (self.thread_id is not None and ident != self.thread_id):
+                continue
+            thread_name = names.get(ident, str(ident)).replace(";", ":").replace(" ", "_")
+            self.samples[";".join([thread_name] + _stack(frame))] += 1
+
+    def run(self, seconds: float) -> Counter:
+        """Sample all other threads for `seconds`, blocking the calling thread"""
+        deadline = time.monotonic() + seconds
+        while not self._stop.is_set() and time.monotonic() < deadline:
+            self.sample()
+            self._stop.wait(self.interval)
+        return self.samples
+
+    def start(self):
+        """Sample in a background thread until stop() is called"""
+        self._thread = threading.Thread(target=self.run, args=(float("inf"),), name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        return self.samples
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
@@ -6,10 +6,11 @@ from pathlib import Path
 import PyPDF2
 from io import BytesIO
 import logging
-from transformers import pipeline
 import numpy as np
-from sentence_transformers import SentenceTransformer
 import os
+import threading
+from app.utils.stage_timer import stage
+from app.utils.embeddings import get_embedder
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -27,15 +28,8 @@ class ResumeParser:
             os.system("python -m spacy download en_core_web_sm")
             self.nlp = spacy.load("en_core_web_sm")
         
-        # Initialize sentence transformer for embeddings
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-        
-        # Initialize text classification pipeline for skill detection
-        self.classifier = pipeline(
-            "text-classification",
-            model="microsoft/DialoGPT-medium",
-            return_all_scores=True
-        )
+        # Skill embeddings; the same model instance is shared with SkillsMatcher
+        self.embedding_model = get_embedder()
         
         # Common skills database
         self.skills_db = self._load_skills_database()
@@ -89,21 +83,23 @@ class ResumeParser:
         text_lower = text.lower()
         
         # Method 1: Direct keyword matching
-        for category, skill_list in self.skills_db.items():
-            for skill in skill_list:
-                if skill.lower() in text_lower:
-                    skills.add(skill.lower())
+        with stage("keyword_match"):
+            for category, skill_list in self.skills_db.items():
+                for skill in skill_list:
+                    if skill.lower() in text_lower:
+                        skills.add(skill.lower())
         
         # Method 2: NLP-based extraction using spaCy
-        doc = self.nlp(text)
-        
-        # Extract noun phrases that might be skills
-        for chunk in doc.noun_chunks:
-            chunk_text = chunk.text.lower().strip()
-            if len(chunk_text) > 2 and len(chunk_text) < 20:
-                # Check if it looks like a skill (contains common skill indicators)
-                if any(indicator in chunk_text for indicator in ['script', 'sql', 'api', 'sdk', 'framework']):
-                    skills.add(chunk_text)
+        with stage("spacy"):
+            doc = self.nlp(text)
+            
+            # Extract noun phrases that might be skills
+            for chunk in doc.noun_chunks:
+                chunk_text = chunk.text.lower().strip()
+                if len(chunk_text) > 2 and len(chunk_text) < 20:
+                    # Check if it looks like a skill (contains common skill indicators)
+                    if any(indicator in chunk_text for indicator in ['script', 'sql', 'api', 'sdk', 'framework']):
+                        skills.add(chunk_text)
         
         # Method 3: Pattern matching for technical terms
         patterns = [
@@ -112,26 +108,27 @@ class ResumeParser:
             r'\b[a-z]+\.[a-z]+\b',  # dot notation like node.js
         ]
         
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                skills.add(match.lower())
-        
-        # Method 4: Extract from experience sections
-        experience_patterns = [
-            r'(?:worked with|used|developed|implemented|experience with)\s+([^.,]+)',
-            r'(?:proficient in|expert in|skilled in)\s+([^.,]+)',
-        ]
-        
-        for pattern in experience_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                # Clean and split the match
-                skills_text = match.strip()
-                for skill in skills_text.split(','):
-                    skill = skill.strip().lower()
-                    if len(skill) > 2:
-                        skills.add(skill)
+        with stage("regex_extract"):
+            for pattern in patterns:
+                matches = re.findall(pattern, text, re.IGNORECASE)
+                for match in matches:
+                    skills.add(match.lower())
+            
+            # Method 4: Extract from experience sections
+            experience_patterns = [
+                r'(?:worked with|used|developed|implemented|experience with)\s+([^.,]+)',
+                r'(?:proficient in|expert in|skilled in)\s+([^.,]+)',
+            ]
+            
+            for pattern in experience_patterns:
+                matches = re.findall(pattern, text, re.IGNORECASE)
+                for match in matches:
+                    # Clean and split the match
+                    skills_text = match.strip()
+                    for skill in skills_text.split(','):
+                        skill = skill.strip().lower()
+                        if len(skill) > 2:
+                            skills.add(skill)
         
         return list(skills)
     
@@ -236,24 +233,28 @@ class ResumeParser:
         """Main method to parse a resume and extract all information"""
         try:
             # Extract text from PDF
-            text = self.extract_text_from_pdf(pdf_path)
+            with stage("pdf_extract"):
+                text = self.extract_text_from_pdf(pdf_path)
             
             # Extract different components
             skills = self.extract_skills(text)
-            education = self.extract_education(text)
-            experience = self.extract_experience(text)
+            with stage("regex_extract"):
+                education = self.extract_education(text)
+                experience = self.extract_experience(text)
             
             # Calculate skill confidence scores
-            skill_scores = {}
-            for skill in skills:
-                confidence = self.calculate_skill_confidence(skill, text)
-                skill_scores[skill] = confidence
+            with stage("skill_confidence"):
+                skill_scores = {}
+                for skill in skills:
+                    confidence = self.calculate_skill_confidence(skill, text)
+                    skill_scores[skill] = confidence
             
             # Generate embeddings for skills
             skill_embeddings = {}
             if skills:
                 skill_texts = list(skills)
-                embeddings = self.embedding_model.encode(skill_texts)
+                with stage("embed"):
+                    embeddings = self.embedding_model.encode(skill_texts)
                 for i, skill in enumerate(skill_texts):
                     skill_embeddings[skill] = embeddings[i].tolist()
             
@@ -277,5 +278,15 @@ class ResumeParser:
             logger.error(f"Error parsing resume: {e}")
             raise
 
-# Global instance for reuse
-resume_parser = ResumeParser() 
\ No newline at end of file
+_resume_parser = None
+_resume_parser_lock = threading.Lock()
+
+
+def get_resume_parser() -> ResumeParser:
+    """Process-wide parser, loaded on first use; app.utils.models warms it at startup"""
+    global _resume_parser
+    if _resume_parser is None:
+        with _resume_parser_lock:
+            if _resume_parser is None:
+                _resume_parser = ResumeParser()
+    return _resume_parser
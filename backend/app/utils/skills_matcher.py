@@ -1,9 +1,11 @@
 import numpy as np
-from sentence_transformers import SentenceTransformer
 from sklearn.metrics.pairwise import cosine_similarity
 from typing import List, Dict, Tuple
 import logging
 import re
+import threading
+from app.utils.stage_timer import stage
+from app.utils.embeddings import get_embedder
 
 logger = logging.getLogger(__name__)
 
@@ -11,9 +13,9 @@ class SkillsMatcher:
     def __init__(self):
         """Initialize the skills matcher with sentence transformer model"""
         try:
-            # Use a lightweight model for fast inference
-            self.model = SentenceTransformer('all-MiniLM-L6-v2')
-            logger.info("Loaded sentence transformer model successfully")
+            # Backend chosen by EMBEDDING_BACKEND; shared with ResumeParser
+            self.model = get_embedder()
+            logger.info(f"Loaded {self.model.backend} embedding model successfully")
         except Exception as e:
             logger.error(f"Error loading sentence transformer model: {e}")
             raise
@@ -25,32 +27,42 @@ class SkillsMatcher:
         
         try:
             # Convert skills to embeddings
-            embeddings = self.model.encode(skills)
+            with stage("embed"):
+                embeddings = self.model.encode(skills)
             return embeddings
         except Exception as e:
             logger.error(f"Error generating embeddings: {e}")
             return np.array([])
     
-    def calculate_similarity(self, resume_skills: List[str], job_skills: List[str]) -> float:
-        """Calculate similarity between resume skills and job skills"""
+    def calculate_similarity(
+        self,
+        resume_skills: List[str],
+        job_skills: List[str],
+        resume_embeddings: np.ndarray = None,
+        job_embeddings: np.ndarray = None
+    ) -> float:
+        """Calculate similarity between resume skills and job skills; precomputed embeddings skip the model"""
         if not resume_skills or not job_skills:
             return 0.0
         
         try:
             # Get embeddings for both skill sets
-            resume_embeddings = self.get_embeddings(resume_skills)
-            job_embeddings = self.get_embeddings(job_skills)
+            if resume_embeddings is None:
+                resume_embeddings = self.get_embeddings(resume_skills)
+            if job_embeddings is None:
+                job_embeddings = self.get_embeddings(job_skills)
             
             if resume_embeddings.size == 0 or job_embeddings.size == 0:
                 return 0.0
             
             # Calculate cosine similarity matrix
-            similarity_matrix = cosine_similarity(resume_embeddings, job_embeddings)
-            
-            # Calculate overall similarity score
-            # Method 1: Average of maximum similarities for each resume skill
-            max_similarities = np.max(similarity_matrix, axis=1)
-            avg_similarity = np.mean(max_similarities)
+            with stage("similarity"):
+                similarity_matrix = cosine_similarity(resume_embeddings, job_embeddings)
+                
+                # Calculate overall similarity score
+                # Method 1: Average of maximum similarities for each resume skill
+                max_similarities = np.max(similarity_matrix, axis=1)
+                avg_similarity = np.mean(max_similarities)
             
             # Method 2: Weighted average based on skill importance
             # For now, we'll use simple average, but this can be enhanced
@@ -84,7 +96,8 @@ class SkillsMatcher:
                 }
             
             # Calculate similarity matrix
-            similarity_matrix = cosine_similarity(resume_embeddings, job_embeddings)
+            with stage("similarity"):
+                similarity_matrix = cosine_similarity(resume_embeddings, job_embeddings)
             
             # Find best matches for each resume skill
             skill_matches = []
@@ -206,7 +219,9 @@ class SkillsMatcher:
         self, 
         resume_data: Dict, 
         job_data: Dict,
-        weights: Dict = None
+        weights: Dict = None,
+        resume_embeddings: np.ndarray = None,
+        job_embeddings: np.ndarray = None
     ) -> Dict:
         """Calculate overall match score considering skills, experience, and education"""
         
@@ -222,18 +237,21 @@ class SkillsMatcher:
             # Calculate individual scores
             skills_score = self.calculate_similarity(
                 resume_data.get('skills', []), 
-                job_data.get('skills', [])
-            )
-            
-            experience_score = self.calculate_experience_match(
-                resume_data.get('experience', []), 
-                job_data.get('experience', [])
+                job_data.get('skills', []),
+                resume_embeddings,
+                job_embeddings
             )
             
-            education_score = self.calculate_education_match(
-                resume_data.get('education', []), 
-                job_data.get('education', [])
-            )
+            with stage("rule_scoring"):
+                experience_score = self.calculate_experience_match(
+                    resume_data.get('experience', []), 
+                    job_data.get('experience', [])
+                )
+                
+                education_score = self.calculate_education_match(
+                    resume_data.get('education', []), 
+                    job_data.get('education', [])
+                )
             
             # Calculate weighted overall score
             overall_score = (
@@ -260,5 +278,15 @@ class SkillsMatcher:
                 'weights': weights
             }
 
-# Global instance for reuse
-skills_matcher = SkillsMatcher() 
\ No newline at end of file
+_skills_matcher = None
+_skills_matcher_lock = threading.Lock()
+
+
+def get_skills_matcher() -> SkillsMatcher:
+    """Process-wide matcher, loaded on first use; app.utils.models warms it at startup"""
+    global _skills_matcher
+    if _skills_matcher is None:
+        with _skills_matcher_lock:
+            if _skills_matcher is None:
+                _skills_matcher = SkillsMatcher()
+    return _skills_matcher
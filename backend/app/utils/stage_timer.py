@@ -0,0 +1,45 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from prometheus_client import Histogram
+
+pipeline_stage_seconds = Histogram(
+    'pipeline_stage_seconds',
+    'Time spent in each stage of the resume/job analysis pipeline',
+    ['stage'],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("pipeline_stage_timings", default=None)
+
+
+@contextmanager
+def stage(name: str):
+    """Time a pipeline stage into the histogram and the current request's breakdown"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        pipeline_stage_seconds.labels(stage=name).observe(elapsed)
+        timings = _timings.get()
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + elapsed
+
+
+@contextmanager
+def collect_timings():
+    """Collect per-stage totals (seconds) for everything timed inside the block"""
+    timings: Dict[str, float] = {}
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+
+
+def server_timing_header(timings: Dict[str, float]) -> str:
+    """Render timings as a Server-Timing header value (durations in ms)"""
+    return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.items())
@@ -0,0 +1,145 @@
+"""
+Per-process compute thread budget.
+
+Every gunicorn worker and Celery child would otherwise start one OpenMP/MKL/
+torch thread per core, so N processes on N cores run N*N compute threads that
+preempt each other in encode and the similarity matmuls. configure() divides
+the usable CPUs by the number of processes of this role and caps every
+library at that share. It must run before numpy/torch/onnxruntime are
+imported, because the BLAS and OpenMP runtimes read their limits once at load.
+"""
+import math
+import os
+import logging
+from typing import Dict, Optional
+
+from prometheus_client import Gauge
+
+logger = logging.getLogger(__name__)
+
+THREAD_BUDGET_ENABLED = os.getenv("THREAD_BUDGET_ENABLED", "true").lower() != "false"
+# Explicit per-process thread count; otherwise usable CPUs // processes
+COMPUTE_THREADS = os.getenv("COMPUTE_THREADS")
+# Pin each process to its own slice of CPUs (see pin_to_slice)
+CPU_AFFINITY = os.getenv("CPU_AFFINITY", "false").lower() == "true"
+
+# Same process-count variables the DB pool sizing uses
+PROCESSES_ENV = {"api": "WEB_CONCURRENCY", "worker": "CELERY_CONCURRENCY"}
+
+THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "ONNX_INTRA_OP_THREADS",
+)
+
+compute_threads_gauge = Gauge(
+    'process_compute_threads',
+    'Compute thread limit applied to this process by library',
+    ['library'],
+    multiprocess_mode='livemax',
+)
+thread_budget_cpus_gauge = Gauge(
+    'thread_budget_cpus',
+    'CPUs available to the processes sharing the thread budget',
+    multiprocess_mode='livemax',
+)
+thread_budget_processes_gauge = Gauge(
+    'thread_budget_processes',
+    'Processes of this role the CPUs are divided between',
+    multiprocess_mode='livemax',
+)
+cpu_affinity_gauge = Gauge(
+    'process_cpu_affinity_cpus',
+    'CPUs this process is allowed to run on',
+    multiprocess_mode='liveall',
+)
+
+_settings: Dict = {}
+
+
+def usable_cpus() -> int:
+    """CPUs this process may use: affinity mask, capped by a cgroup v2 CPU quota"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def process_count(role: str) -> int:
+    return max(1, int(os.getenv(PROCESSES_ENV.get(role, ""), "1") or 1))
+
+
+def threads_per_process(role: str, cpus: Optional[int] = None) -> int:
+    if COMPUTE_THREADS:
+        return max(1, int(COMPUTE_THREADS))
+    return max(1, (cpus or usable_cpus()) // process_count(role))
+
+
+def configure(role: str) -> Dict:
+    """Apply the budget for `role` (api or worker) to this process and return it"""
+    if not THREAD_BUDGET_ENABLED:
+        return {}
+    cpus = usable_cpus()
+    threads = threads_per_process(role, cpus)
+    for name in THREAD_ENV_VARS:
+        # Explicit operator settings win
+        os.environ.setdefault(name, str(threads))
+    # Tokenizers would start their own pool per process on top of the budget
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+    _settings.update({"role": role, "cpus": cpus, "processes": process_count(role), "threads": threads})
+    thread_budget_cpus_gauge.set(cpus)
+    thread_budget_processes_gauge.set(process_count(role))
+    for library, name in (("openmp", "OMP_NUM_THREADS"), ("mkl", "MKL_NUM_THREADS"),
+                          ("openblas", "OPENBLAS_NUM_THREADS"), ("onnxruntime", "ONNX_INTRA_OP_THREADS")):
+        compute_threads_gauge.labels(library=library).set(int(os.environ[name]))
+    logger.info(f"Thread budget for {role}: {threads} compute threads per process on {cpus} CPUs")
+    return dict(_settings)
+
+
+def apply_torch_limits():
+    """Cap torch's intra/inter-op pools; call right after torch is imported"""
+    if not THREAD_BUDGET_ENABLED:
+        return
+    import torch
+
+    threads = int(os.environ.get("OMP_NUM_THREADS", torch.get_num_threads()))
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Only allowed before torch runs any parallel work
+        pass
+    compute_threads_gauge.labels(library="torch").set(torch.get_num_threads())
+
+
+def pin_to_slice(index: int, processes: int) -> Optional[set]:
+    """
+    With CPU_AFFINITY=true, restrict process number `index` (0-based) of
+    `processes` to its own contiguous share of the usable CPUs. Call after fork.
+    """
+    if not CPU_AFFINITY or not hasattr(os, "sched_setaffinity"):
+        return None
+    available = sorted(os.sched_getaffinity(0))
+    share = max(1, len(available) // max(1, processes))
+    start = (index % max(1, len(available) // share)) * share
+    cpus = set(available[start:start + share])
+    os.sched_setaffinity(0, cpus)
+    cpu_affinity_gauge.set(len(cpus))
+    logger.info(f"Pinned process {os.getpid()} (#{index}) to CPUs {sorted(cpus)}")
+    return cpus
+
+
+def settings() -> Dict:
+    return dict(_settings)
@@ -0,0 +1,193 @@
+"""
+Exact top-k cosine search over L2-normalized float32 vectors, in blocked NumPy.
+
+At 100k x 384 a query costs one matrix-vector product per block plus an
+argpartition (milliseconds), so an approximate index and its recall loss buy
+nothing at this scale.
+
+Rows live in two segments:
+  base  - what was loaded from disk; memory-mapped read-only, so the worker
+          processes on a host share one copy through the page cache
+  delta - rows added since, in a growable in-memory array
+Re-adding or removing an id that is in base only masks its base row, so
+incremental updates never copy the base segment. save() compacts both into
+a new base.
+
+On disk an index is a directory: vectors-<v>.npy and ids-<v>.npy, plus
+manifest.json naming the current version. The manifest is replaced
+atomically after the arrays are written, so readers never see a torn index.
+"""
+import os
+import json
+import uuid
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+# Rows scored per matrix product; bounds the temporary score matrix
+SEARCH_BLOCK_SIZE = int(os.getenv("VECTOR_INDEX_BLOCK_SIZE", "16384"))
+MANIFEST = "manifest.json"
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    return vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+
+
+class VectorIndex:
+    def __init__(self, dimension: Optional[int] = None, meta: Optional[Dict] = None):
+        self.dimension = dimension
+        # Free-form metadata persisted with the index (e.g. how far it is synced)
+        self.meta = dict(meta or {})
+        self._base_vectors = np.zeros((0, dimension or 0), dtype=np.float32)
+        self._base_ids = np.zeros(0, dtype=np.int64)
+        self._base_rows: Dict[int, int] = {}
+        self._base_dead = np.zeros(0, dtype=bool)
+        self._delta_vectors = np.zeros((0, dimension or 0), dtype=np.float32)
+        self._delta_ids = np.zeros(0, dtype=np.int64)
+        self._delta_rows: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._base_rows) + len(self._delta_rows)
+
+    def __contains__(self, item_id: int) -> bool:
+        return item_id in self._base_rows or item_id in self._delta_rows
+
+    def add(self, ids: Iterable[int], vectors: np.ndarray):
+        """Insert or replace; vectors are normalized here"""
+        ids = [int(i) for i in ids]
+        vectors = normalize(vectors) if len(ids) else vectors
+        with self._lock:
+            if self.dimension is None and len(ids):
+                self.dimension = vectors.shape[1]
+                self._base_vectors = self._base_vectors.reshape(0, self.dimension)
+                self._delta_vectors = self._delta_vectors.reshape(0, self.dimension)
+            if len(ids) and vectors.shape[1] != self.dimension:
+                raise ValueError(f"Expected {self.dimension}-dimensional vectors, got {vectors.shape[1]}")
+            rows = []
+            for item_id in ids:
+                row = self._delta_rows.get(item_id)
+                if row is None:
+                    self._mask_base(item_id)
+                    row = self._append_delta(item_id)
+                rows.append(row)
+            self._delta_vectors[rows] = vectors
+
+    def remove(self, ids: Iterable[int]):
+        with self._lock:
+            for item_id in map(int, ids):
+                self._mask_base(item_id)
+                row = self._delta_rows.pop(item_id, None)
+                if row is None:
+                    continue
+                # Move the last delta row into the hole
+                last = len(self._delta_rows)
+                if row != last:
+                    moved = int(self._delta_ids[last])
+                    self._delta_vectors[row] = self._delta_vectors[last]
+                    self._delta_ids[row] = moved
+                    self._delta_rows[moved] = row
+
+    def _mask_base(self, item_id: int):
+        row = self._base_rows.pop(item_id, None)
+        if row is not None:
+            self._base_dead[row] = True
+
+    def _append_delta(self, item_id: int) -> int:
+        row = len(self._delta_rows)
+        if row == len(self._delta_ids):
+            # Grow geometrically so a stream of adds is amortized O(1)
+            capacity = max(1024, 2 * row)
+            vectors = np.zeros((capacity, self.dimension), dtype=np.float32)
+            vectors[:row] = self._delta_vectors[:row]
+            ids = np.zeros(capacity, dtype=np.int64)
+            ids[:row] = self._delta_ids[:row]
+            self._delta_vectors, self._delta_ids = vectors, ids
+        self._delta_ids[row] = item_id
+        self._delta_rows[item_id] = row
+        return row
+
+    def _segments(self):
+        delta_size = len(self._delta_rows)
+        yield self._base_vectors, self._base_ids, self._base_dead if len(self._base_rows) < len(self._base_ids) else None
+        yield self._delta_vectors[:delta_size], self._delta_ids[:delta_size], None
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(ids, scores), each (n_queries, <= k), best first; scores are cosine similarities"""
+        queries = normalize(queries)
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_ids = np.zeros((len(queries), 0), dtype=np.int64)
+        with self._lock:
+            if self.dimension is None or not len(self):
+                return best_ids, best_scores
+            for vectors, ids, dead in self._segments():
+                for start in range(0, len(ids), SEARCH_BLOCK_SIZE):
+                    stop = start + SEARCH_BLOCK_SIZE
+                    scores = queries @ vectors[start:stop].T
+                    if dead is not None:
+                        scores[:, dead[start:stop]] = -np.inf
+                    scores = np.concatenate([best_scores, scores], axis=1)
+                    block_ids = np.concatenate([best_ids, np.broadcast_to(ids[start:stop], (len(queries), len(ids[start:stop])))], axis=1)
+                    if scores.shape[1] > k:
+                        keep = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                        scores = np.take_along_axis(scores, keep, axis=1)
+                        block_ids = np.take_along_axis(block_ids, keep, axis=1)
+                    best_scores, best_ids = scores, block_ids
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        best_ids = np.take_along_axis(best_ids, order, axis=1)
+        # Masked rows can only surface when fewer than k live rows exist
+        live = np.isfinite(best_scores).all(axis=0)
+        return best_ids[:, live], best_scores[:, live]
+
+    def save(self, path: Path):
+        """Compact both segments into `path`; the in-memory index is unchanged"""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            parts = [(vectors[~dead] if dead is not None else vectors, ids[~dead] if dead is not None else ids)
+                     for vectors, ids, dead in self._segments()]
+            vectors = np.concatenate([v for v, _ in parts]) if self.dimension else np.zeros((0, 0), np.float32)
+            ids = np.concatenate([i for _, i in parts])
+            meta = dict(self.meta)
+        version = uuid.uuid4().hex[:12]
+        np.save(path / f"vectors-{version}.npy", vectors)
+        np.save(path / f"ids-{version}.npy", ids)
+        manifest = {"version": version, "dimension": self.dimension, "count": len(ids), "meta": meta}
+        tmp = path / f"{MANIFEST}.{version}.tmp"
+        tmp.write_text(json.dumps(manifest))
+        previous = _read_manifest(path)
+        os.replace(tmp, path / MANIFEST)
+        # Processes that mapped the old files keep them until they exit
+        if previous:
+            for name in (f"vectors-{previous['version']}.npy", f"ids-{previous['version']}.npy"):
+                try:
+                    os.remove(path / name)
+                except OSError:
+                    pass
+
+    @classmethod
+    def load(cls, path: Path, mmap: bool = True) -> "VectorIndex":
+        path = Path(path)
+        manifest = _read_manifest(path)
+        if manifest is None:
+            raise FileNotFoundError(f"No vector index at {path}")
+        index = cls(manifest["dimension"], manifest.get("meta"))
+        mode = "r" if mmap else None
+        version = manifest["version"]
+        if manifest["dimension"]:
+            index._base_vectors = np.load(path / f"vectors-{version}.npy", mmap_mode=mode)
+        index._base_ids = np.load(path / f"ids-{version}.npy")
+        index._base_rows = {int(item_id): row for row, item_id in enumerate(index._base_ids)}
+        index._base_dead = np.zeros(len(index._base_ids), dtype=bool)
+        return index
+
+
+def _read_manifest(path: Path) -> Optional[Dict]:
+    try:
+        return json.loads((Path(path) / MANIFEST).read_text())
+    except FileNotFoundError:
+        return None
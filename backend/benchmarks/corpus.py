@@ -0,0 +1,132 @@
+"""
+Deterministic synthetic corpus for the parse/match benchmarks.
+
+The same seed always yields byte-identical resume PDFs and job descriptions,
+so timings from different commits are measured on the same input.
+"""
+import random
+from pathlib import Path
+from typing import Dict, List
+
+import pikepdf
+
+SKILLS = [
+    "Python", "JavaScript", "TypeScript", "Java", "Go", "Rust", "C++", "SQL", "React", "Angular",
+    "Vue", "Node.js", "Django", "Flask", "FastAPI", "Spring", "PostgreSQL", "MySQL", "MongoDB",
+    "Redis", "Elasticsearch", "AWS", "Azure", "GCP", "Docker", "Kubernetes", "Terraform", "Git",
+    "Jenkins", "Linux", "TensorFlow", "PyTorch", "Kafka", "GraphQL", "REST API", "CI/CD", "Agile",
+]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Hooli", "Stark Industries", "Wayne Tech"]
+TITLES = ["Software Engineer", "Backend Developer", "Data Engineer", "Platform Engineer", "Full Stack Developer"]
+DEGREES = [
+    "Bachelor of Science in Computer Science", "Master of Science in Software Engineering",
+    "Bachelor of Engineering in Electrical Engineering", "PhD in Machine Learning",
+]
+VERBS = ["Developed", "Implemented", "Designed", "Maintained", "Migrated", "Optimized", "Built"]
+OBJECTS = [
+    "a payments service", "the reporting pipeline", "an internal developer platform",
+    "customer-facing dashboards", "a search backend", "batch ETL jobs", "the authentication service",
+]
+
+# Number of experience entries per resume size; large resumes span several pages
+RESUME_SIZES = {"small": 2, "medium": 6, "large": 16}
+JD_SIZES = {"short": 4, "medium": 10, "long": 24}
+
+PAGE_WIDTH, PAGE_HEIGHT = 612, 792
+LINES_PER_PAGE = 58
+CHARS_PER_LINE = 95
+
+
+def _bullet(rng: random.Random) -> str:
+    skills = rng.sample(SKILLS, 2)
+    return (f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} using {skills[0]} and {skills[1]}, "
+            f"worked with {rng.choice(SKILLS)} to cut latency by {rng.randint(10, 70)}%.")
+
+
+def resume_text(rng: random.Random, entries: int) -> str:
+    lines = [
+        f"Candidate {rng.randint(1000, 9999)}",
+        f"{rng.choice(TITLES)} with {rng.randint(1, 15)} years of experience",
+        "",
+        "Skills: " + ", ".join(rng.sample(SKILLS, rng.randint(6, 14))),
+        "",
+        "Experience",
+    ]
+    year = 2024
+    for _ in range(entries):
+        start = year - rng.randint(1, 3)
+        lines.append(f"{rng.choice(TITLES)} at {rng.choice(COMPANIES)} {start} - {year}")
+        lines.extend(f"- {_bullet(rng)}" for _ in range(rng.randint(3, 6)))
+        year = start
+    lines += ["", "Education", f"{rng.choice(DEGREES)}, {year - 4}"]
+    return "\n".join(lines)
+
+
+def job_description(rng: random.Random, requirements: int) -> str:
+    lines = [
+        rng.choice(TITLES),
+        "",
+        f"{rng.choice(COMPANIES)} is hiring. You will work on {rng.choice(OBJECTS)} and {rng.choice(OBJECTS)}.",
+        "",
+        "Requirements:",
+        f"- {rng.randint(2, 8)}+ years of experience in software development",
+        f"- {rng.choice(['Bachelor', 'Master'])} degree in Computer Science or related field",
+    ]
+    lines += [f"- Experience with {', '.join(rng.sample(SKILLS, 3))}" for _ in range(requirements)]
+    lines += ["", "Responsibilities:"] + [f"- {_bullet(rng)}" for _ in range(requirements // 2 + 1)]
+    return "\n".join(lines)
+
+
+def _wrap(text: str) -> List[str]:
+    wrapped = []
+    for line in text.splitlines():
+        while len(line) > CHARS_PER_LINE:
+            cut = line.rfind(" ", 0, CHARS_PER_LINE)
+            cut = cut if cut > 0 else CHARS_PER_LINE
+            wrapped.append(line[:cut])
+            line = line[cut:].lstrip()
+        wrapped.append(line)
+    return wrapped
+
+
+def _escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(text: str, path: Path):
+    """Write `text` as a plain Helvetica PDF whose text layer PyPDF2 can extract"""
+    pdf = pikepdf.new()
+    font = pdf.make_indirect(pikepdf.Dictionary(
+        Type=pikepdf.Name.Font, Subtype=pikepdf.Name.Type1, BaseFont=pikepdf.Name.Helvetica,
+    ))
+    lines = _wrap(text)
+    for start in range(0, len(lines), LINES_PER_PAGE):
+        body = "\n".join(f"({_escape(line)}) Tj T*" for line in lines[start:start + LINES_PER_PAGE])
+        content = f"BT /F1 10 Tf 12 TL 50 {PAGE_HEIGHT - 50} Td\n{body}\nET".encode("latin-1", "replace")
+        pdf.pages.append(pikepdf.Page(pikepdf.Dictionary(
+            Type=pikepdf.Name.Page,
+            MediaBox=[0, 0, PAGE_WIDTH, PAGE_HEIGHT],
+            Resources=pikepdf.Dictionary(Font=pikepdf.Dictionary(F1=font)),
+            Contents=pdf.make_stream(content),
+        )))
+    # Fixed IDs and no timestamps keep the output byte-identical across runs
+    pdf.save(path, static_id=True, deterministic_id=False)
+
+
+def build_corpus(directory: Path, seed: int = 0, per_size: int = 5) -> Dict[str, List]:
+    """
+    Generate `per_size` resumes and job descriptions of every size.
+    Returns {"resumes": [(size, pdf_path), ...], "jobs": [(size, text), ...]}.
+    """
+    rng = random.Random(seed)
+    directory.mkdir(parents=True, exist_ok=True)
+    resumes, jobs = [], []
+    for size, entries in RESUME_SIZES.items():
+        for i in range(per_size):
+            path = directory / f"resume-{size}-{i}.pdf"
+            write_pdf(resume_text(rng, entries), path)
+            resumes.append((size, path))
+    for size, requirements in JD_SIZES.items():
+        for _ in range(per_size):
+            jobs.append((size, job_description(rng, requirements)))
+    return {"resumes": resumes, "jobs": jobs}
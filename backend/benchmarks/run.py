@@ -0,0 +1,210 @@
+"""
+Offline benchmarks for the resume parse/match pipeline.
+
+    cd backend
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json        # exit 1 on regression
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json   # record a new baseline
+
+Every stage the analyze endpoint runs is timed on its own and end to end over
+a deterministic synthetic corpus (see benchmarks.corpus). Compare runs taken on
+the same machine; absolute numbers are not portable.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List
+
+from benchmarks.corpus import build_corpus
+
+# Fail when the compared percentile grows by more than this fraction...
+DEFAULT_TOLERANCE = 0.2
+# ...and by more than this many milliseconds, so sub-millisecond noise is ignored
+DEFAULT_MIN_DELTA_MS = 1.0
+# Size of the synthetic job index the recommendation search is timed against
+VECTOR_INDEX_JOBS = 100_000
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """Linear-interpolated percentile, q in [0, 100]"""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    rank = (len(ordered) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(samples: List[float]) -> Dict:
+    total = sum(samples)
+    return {
+        "n": len(samples),
+        "mean_ms": total / len(samples) * 1000 if samples else 0.0,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "throughput_per_s": len(samples) / total if total else 0.0,
+    }
+
+
+def measure(fn: Callable, inputs: Iterable, repeat: int, warmup: int) -> List[float]:
+    """Call fn on every input `repeat` times after `warmup` untimed passes"""
+    inputs = list(inputs)
+    for _ in range(warmup):
+        for item in inputs:
+            fn(item)
+    samples = []
+    for _ in range(repeat):
+        for item in inputs:
+            start = time.perf_counter()
+            fn(item)
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+def compare(results: Dict, baseline: Dict, metric: str = "p95_ms", tolerance: float = DEFAULT_TOLERANCE,
+            min_delta_ms: float = DEFAULT_MIN_DELTA_MS) -> List[Dict]:
+    """Benchmarks whose `metric` regressed beyond tolerance relative to the baseline"""
+    regressions = []
+    for name, current in results["benchmarks"].items():
+        previous = baseline.get("benchmarks", {}).get(name)
+        if previous is None:
+            continue
+        before, after = previous[metric], current[metric]
+        if after > before * (1 + tolerance) and after - before > min_delta_ms:
+            regressions.append({
+                "benchmark": name,
+                "metric": metric,
+                "baseline": before,
+                "current": after,
+                "change": after / before - 1 if before else float("inf"),
+            })
+    return regressions
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+def run_benchmarks(corpus_dir: Path, seed: int, per_size: int, repeat: int, warmup: int) -> Dict:
+    # Loaded here so loading the models is not part of any measurement and
+    # the comparison helpers above stay importable without them
+    import numpy as np
+    from app.utils import models
+    from app.utils.job_parser import parse_job_description
+    from app.utils.vector_index import VectorIndex
+
+    models.load_all()
+    resume_parser = models.get("resume_parser")
+    skills_matcher = models.get("skills_matcher")
+
+    corpus = build_corpus(corpus_dir, seed=seed, per_size=per_size)
+    benchmarks: Dict[str, Dict] = {}
+
+    def bench(name: str, fn: Callable, inputs: Iterable):
+        benchmarks[name] = summarize(measure(fn, inputs, repeat, warmup))
+        print(f"{name:<45} p50 {benchmarks[name]['p50_ms']:9.2f} ms  p95 {benchmarks[name]['p95_ms']:9.2f} ms")
+
+    texts, resumes = {}, {}
+    for size, path in corpus["resumes"]:
+        texts.setdefault(size, []).append(resume_parser.extract_text_from_pdf(str(path)))
+        resumes.setdefault(size, []).append(resume_parser.parse_resume(str(path)))
+    jobs = {}
+    for size, text in corpus["jobs"]:
+        jobs.setdefault(size, []).append((text, parse_job_description(text)))
+
+    for size in texts:
+        paths = [str(path) for s, path in corpus["resumes"] if s == size]
+        bench(f"extract_text_from_pdf[{size}]", resume_parser.extract_text_from_pdf, paths)
+        bench(f"extract_skills[{size}]", resume_parser.extract_skills, texts[size])
+    for size in jobs:
+        bench(f"parse_job_description[{size}]", parse_job_description, [text for text, _ in jobs[size]])
+
+    for resume_size in resumes:
+        for job_size in jobs:
+            pairs = [(r, j) for r, (_, j) in zip(resumes[resume_size], jobs[job_size])]
+            label = f"{resume_size}/{job_size}"
+            bench(f"calculate_overall_match_score[{label}]",
+                  lambda pair: skills_matcher.calculate_overall_match_score(*pair), pairs)
+            bench(f"get_detailed_matching[{label}]",
+                  lambda pair: skills_matcher.get_detailed_matching(pair[0]["skills"], pair[1]["skills"]), pairs)
+
+    def end_to_end(pair):
+        path, job_text = pair
+        resume_analysis = resume_parser.parse_resume(path)
+        job_analysis = parse_job_description(job_text)
+        skills_matcher.calculate_overall_match_score(resume_analysis, job_analysis)
+        skills_matcher.get_detailed_matching(resume_analysis["skills"], job_analysis["skills"])
+
+    for size in texts:
+        paths = [str(path) for s, path in corpus["resumes"] if s == size]
+        job_texts = [text for _, text in corpus["jobs"]]
+        bench(f"end_to_end[{size}]", end_to_end, list(zip(paths, job_texts)))
+
+    # Exact search cost does not depend on the data, so random unit vectors stand in for jobs
+    rng = np.random.default_rng(seed)
+    dimension = models.get("embedder").dimension
+    index = VectorIndex()
+    index.add(range(VECTOR_INDEX_JOBS), rng.standard_normal((VECTOR_INDEX_JOBS, dimension)).astype(np.float32))
+    bench("vector_index_search[100k]", lambda query: index.search(query, 50), list(rng.standard_normal((20, dimension))))
+
+    return {
+        "meta": {
+            "seed": seed,
+            "per_size": per_size,
+            "repeat": repeat,
+            "warmup": warmup,
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+        },
+        "benchmarks": benchmarks,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the resume parse/match pipeline")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--per-size", type=int, default=5, help="Documents generated per size class")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed passes over each input")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed passes before measuring")
+    parser.add_argument("--corpus-dir", type=Path, help="Where to write the corpus (default: temporary)")
+    parser.add_argument("--output", type=Path, help="Write results JSON here")
+    parser.add_argument("--baseline", type=Path, help="Compare against this results file; exit 1 on regression")
+    parser.add_argument("--save-baseline", type=Path, help="Also write results here as the new baseline")
+    parser.add_argument("--metric", default="p95_ms", choices=["p50_ms", "p95_ms", "p99_ms", "mean_ms"])
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--min-delta-ms", type=float, default=DEFAULT_MIN_DELTA_MS)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = run_benchmarks(args.corpus_dir or Path(tmp), args.seed, args.per_size, args.repeat, args.warmup)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            path.write_text(json.dumps(results, indent=2) + "\n")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        regressions = compare(results, baseline, args.metric, args.tolerance, args.min_delta_ms)
+        for r in regressions:
+            print(f"REGRESSION {r['benchmark']}: {r['metric']} {r['baseline']:.2f} -> {r['current']:.2f} "
+                  f"({r['change']:+.0%})")
+        if regressions:
+            return 1
+        print(f"No regressions against {args.baseline} ({args.metric}, tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
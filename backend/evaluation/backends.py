@@ -0,0 +1,50 @@
+"""
+Backends evaluated by evaluation.run. A backend is any object with:
+
+    name: str
+    analyze_resume(text) -> {"skills": [...], "education": [...], "experience": [...]}
+    analyze_job(text)    -> {"skills": [...], "education": [...], "experience": [...]}
+    score(resume_analysis, job_analysis) -> float in [0, 1]
+
+selected on the command line as "module:factory". The factory is called
+with no arguments after the baseline memory reading, so model loading shows up
+in the reported footprint.
+"""
+import importlib
+
+
+class PipelineBackend:
+    """The production pipeline, configured by the usual environment variables"""
+
+    name = "pipeline"
+
+    def __init__(self):
+        from app.utils.resume_parser import get_resume_parser
+        from app.utils.job_parser import parse_job_description
+        from app.utils.skills_matcher import get_skills_matcher
+
+        self.resume_parser = get_resume_parser()
+        self.parse_job_description = parse_job_description
+        self.skills_matcher = get_skills_matcher()
+
+    def analyze_resume(self, text: str) -> dict:
+        return {
+            "skills": self.resume_parser.extract_skills(text),
+            "education": self.resume_parser.extract_education(text),
+            "experience": self.resume_parser.extract_experience(text),
+        }
+
+    def analyze_job(self, text: str) -> dict:
+        return self.parse_job_description(text)
+
+    def score(self, resume_analysis: dict, job_analysis: dict) -> float:
+        return self.skills_matcher.calculate_overall_match_score(resume_analysis, job_analysis)["overall_score"]
+
+
+def pipeline():
+    return PipelineBackend()
+
+
+def load_backend(spec: str):
+    module_name, _, factory = spec.partition(":")
+    return getattr(importlib.import_module(module_name), factory or "backend")()
@@ -0,0 +1,61 @@
+"""
+Labelled evaluation set: one JSON object per line.
+
+    {
+      "id": "backend-strong",                       # unique, used to join runs
+      "resume_text": "...",                         # or "resume_pdf": path relative to the file
+      "job_description": "...",
+      "expected_skills": ["python", "django"],      # skills the resume should yield
+      "expected_job_skills": ["python", "aws"],     # optional, skills the JD should yield
+      "expected_band": "high"                       # low | medium | high (see MATCH_BANDS)
+    }
+
+Skills are compared case-insensitively.
+"""
+import json
+from pathlib import Path
+from typing import Dict, List
+
+from PyPDF2 import PdfReader
+
+# Lower bound of each band on the 0-1 overall match score
+MATCH_BANDS = {"low": 0.0, "medium": 0.4, "high": 0.7}
+
+REQUIRED_FIELDS = ("id", "job_description", "expected_skills", "expected_band")
+
+
+def band(score: float) -> str:
+    """Band an overall match score falls into"""
+    name = "low"
+    for candidate, low in MATCH_BANDS.items():
+        if score >= low:
+            name = candidate
+    return name
+
+
+def _resume_text(example: Dict, base: Path) -> str:
+    if "resume_text" in example:
+        return example["resume_text"]
+    reader = PdfReader(str(base / example["resume_pdf"]))
+    return "\n".join(page.extract_text() or "" for page in reader.pages).strip()
+
+
+def load_examples(path: Path) -> List[Dict]:
+    examples, seen = [], set()
+    for number, line in enumerate(path.read_text().splitlines(), 1):
+        if not line.strip():
+            continue
+        example = json.loads(line)
+        missing = [field for field in REQUIRED_FIELDS if field not in example]
+        if "resume_text" not in example and "resume_pdf" not in example:
+            missing.append("resume_text|resume_pdf")
+        if missing:
+            raise ValueError(f"{path}:{number}: missing {', '.join(missing)}")
+        if example["expected_band"] not in MATCH_BANDS:
+            raise ValueError(f"{path}:{number}: expected_band must be one of {', '.join(MATCH_BANDS)}")
+        if example["id"] in seen:
+            raise ValueError(f"{path}:{number}: duplicate id {example['id']!r}")
+        seen.add(example["id"])
+        example["resume_text"] = _resume_text(example, path.parent)
+        examples.append(example)
+    return examples
@@ -0,0 +1,48 @@
+import math
+import statistics
+from typing import Dict, Iterable, List, Sequence
+
+
+def normalize(skills: Iterable[str]) -> set:
+    return {skill.strip().lower() for skill in skills if skill and skill.strip()}
+
+
+def skill_counts(predicted: Iterable[str], expected: Iterable[str]) -> Dict[str, int]:
+    predicted, expected = normalize(predicted), normalize(expected)
+    hits = len(predicted & expected)
+    return {"tp": hits, "fp": len(predicted) - hits, "fn": len(expected) - hits}
+
+
+def precision_recall(counts: Sequence[Dict[str, int]]) -> Dict[str, float]:
+    """Micro-averaged precision/recall/F1 over per-example counts"""
+    tp = sum(c["tp"] for c in counts)
+    fp = sum(c["fp"] for c in counts)
+    fn = sum(c["fn"] for c in counts)
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {"precision": precision, "recall": recall, "f1": f1}
+
+
+def _ranks(values: List[float]) -> List[float]:
+    order = sorted(range(len(values)), key=values.__getitem__)
+    ranks = [0.0] * len(values)
+    i = 0
+    while i < len(order):
+        j = i
+        while j + 1 < len(order) and values[order[j + 1]] == values[order[i]]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[order[k]] = (i + j) / 2 + 1
+        i = j + 1
+    return ranks
+
+
+def pearson(x: List[float], y: List[float]) -> float:
+    if len(x) < 2 or len(set(x)) < 2 or len(set(y)) < 2:
+        return math.nan
+    return statistics.correlation(x, y)
+
+
+def spearman(x: List[float], y: List[float]) -> float:
+    return pearson(_ranks(x), _ranks(y))
@@ -0,0 +1,157 @@
+"""
+Accuracy-vs-latency evaluation of a parsing/matching backend.
+
+    cd backend
+    python -m evaluation.run --output ref.json                                  # reference run
+    EMBEDDING_BACKEND=onnx python -m evaluation.run --reference ref.json --output onnx.json
+    python -m evaluation.run --backend mypkg.fast:backend --reference ref.json
+
+Reports precision/recall of extracted skills against the labels, band
+accuracy of the overall score, score correlation and drift against a
+reference run, latency percentiles per step, and memory.
+"""
+import argparse
+import json
+import resource
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from app.utils.memory import rss_bytes
+from benchmarks.run import percentile
+from evaluation.backends import load_backend
+from evaluation.dataset import band, load_examples
+from evaluation.metrics import pearson, precision_recall, skill_counts, spearman
+
+DEFAULT_DATASET = Path(__file__).parent / "data" / "sample.jsonl"
+DEFAULT_BACKEND = "evaluation.backends:pipeline"
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def _latency(samples: List[float]) -> Dict:
+    return {f"p{q}_ms": percentile(samples, q) * 1000 for q in (50, 95, 99)}
+
+
+def _peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def evaluate(backend, examples: List[Dict], reference: Optional[Dict] = None, warmup: int = 1) -> Dict:
+    for example in examples[:warmup]:
+        backend.score(backend.analyze_resume(example["resume_text"]), backend.analyze_job(example["job_description"]))
+
+    rows, timings = [], {"analyze_resume": [], "analyze_job": [], "score": [], "total": []}
+    resume_counts, job_counts = [], []
+    for example in examples:
+        resume, t_resume = _timed(backend.analyze_resume, example["resume_text"])
+        job, t_job = _timed(backend.analyze_job, example["job_description"])
+        score, t_score = _timed(backend.score, resume, job)
+        for name, elapsed in (("analyze_resume", t_resume), ("analyze_job", t_job), ("score", t_score)):
+            timings[name].append(elapsed)
+        timings["total"].append(t_resume + t_job + t_score)
+
+        resume_counts.append(skill_counts(resume["skills"], example["expected_skills"]))
+        if "expected_job_skills" in example:
+            job_counts.append(skill_counts(job["skills"], example["expected_job_skills"]))
+        rows.append({
+            "id": example["id"],
+            "score": float(score),
+            "band": band(score),
+            "expected_band": example["expected_band"],
+            "skills": sorted(resume["skills"]),
+        })
+
+    report = {
+        "examples": len(rows),
+        "resume_skills": precision_recall(resume_counts),
+        "job_skills": precision_recall(job_counts) if job_counts else None,
+        "band_accuracy": sum(r["band"] == r["expected_band"] for r in rows) / len(rows) if rows else 0.0,
+        "latency": {name: _latency(samples) for name, samples in timings.items()},
+        "rows": rows,
+    }
+    if reference is not None:
+        report["vs_reference"] = compare_scores(rows, reference["rows"])
+    return report
+
+
+def compare_scores(rows: List[Dict], reference_rows: List[Dict]) -> Dict:
+    """Agreement of overall scores with a reference run, joined on example id"""
+    reference = {row["id"]: row for row in reference_rows}
+    pairs = [(row, reference[row["id"]]) for row in rows if row["id"] in reference]
+    ours = [row["score"] for row, _ in pairs]
+    theirs = [ref["score"] for _, ref in pairs]
+    diffs = [abs(a - b) for a, b in zip(ours, theirs)]
+    return {
+        "examples": len(pairs),
+        "pearson": pearson(ours, theirs),
+        "spearman": spearman(ours, theirs),
+        "mean_abs_diff": sum(diffs) / len(diffs) if diffs else 0.0,
+        "max_abs_diff": max(diffs, default=0.0),
+        "band_agreement": sum(row["band"] == ref["band"] for row, ref in pairs) / len(pairs) if pairs else 0.0,
+    }
+
+
+def run(backend_spec: str, dataset: Path, reference: Optional[Dict] = None, warmup: int = 1) -> Dict:
+    examples = load_examples(dataset)
+    rss_before = rss_bytes()
+    backend, load_seconds = _timed(load_backend, backend_spec)
+    rss_loaded = rss_bytes()
+    report = evaluate(backend, examples, reference, warmup)
+    report["backend"] = getattr(backend, "name", backend_spec)
+    report["dataset"] = str(dataset)
+    report["load_seconds"] = load_seconds
+    report["memory"] = {
+        "rss_before_load_bytes": rss_before,
+        "model_footprint_bytes": rss_loaded - rss_before,
+        "rss_after_bytes": rss_bytes(),
+        "peak_rss_bytes": _peak_rss_bytes(),
+    }
+    return report
+
+
+def print_report(report: Dict):
+    skills = report["resume_skills"]
+    print(f"backend {report['backend']} on {report['examples']} examples (loaded in {report['load_seconds']:.1f}s)")
+    print(f"resume skills  precision {skills['precision']:.3f}  recall {skills['recall']:.3f}  f1 {skills['f1']:.3f}")
+    if report["job_skills"]:
+        job = report["job_skills"]
+        print(f"job skills     precision {job['precision']:.3f}  recall {job['recall']:.3f}  f1 {job['f1']:.3f}")
+    print(f"band accuracy  {report['band_accuracy']:.3f}")
+    if "vs_reference" in report:
+        ref = report["vs_reference"]
+        print(f"vs reference   pearson {ref['pearson']:.3f}  spearman {ref['spearman']:.3f}  "
+              f"mean |diff| {ref['mean_abs_diff']:.3f}  max |diff| {ref['max_abs_diff']:.3f}  "
+              f"band agreement {ref['band_agreement']:.3f}")
+    for name, latency in report["latency"].items():
+        print(f"{name:<15} p50 {latency['p50_ms']:8.1f} ms  p95 {latency['p95_ms']:8.1f} ms  p99 {latency['p99_ms']:8.1f} ms")
+    memory = report["memory"]
+    print(f"memory         model {memory['model_footprint_bytes'] / 2**20:.0f} MB  "
+          f"peak RSS {memory['peak_rss_bytes'] / 2**20:.0f} MB")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Evaluate a parsing/matching backend on a labelled set")
+    parser.add_argument("--backend", default=DEFAULT_BACKEND, help="module:factory returning a backend")
+    parser.add_argument("--dataset", type=Path, default=DEFAULT_DATASET)
+    parser.add_argument("--reference", type=Path, help="Earlier --output to compare scores against")
+    parser.add_argument("--warmup", type=int, default=1, help="Examples run once untimed first")
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args(argv)
+
+    reference = json.loads(args.reference.read_text()) if args.reference else None
+    report = run(args.backend, args.dataset, reference, args.warmup)
+    print_report(report)
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,33 @@
+import os
+# The master preloads models before any worker imports app.main, so claim the
+# API role here: DB pool sizing and the thread budget are fixed at import time
+os.environ.setdefault("DB_ROLE", "api")
+from app.utils import thread_budget
+thread_budget.configure("api")
+from app.metrics import mark_process_dead
+from app.utils import preload
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+# Also read by app.db to split the API connection budget between workers
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = 120
+
+# PRELOAD_MODELS=true loads the models in the master so workers share them
+preload_app = preload.PRELOAD_MODELS
+if preload_app:
+    preload.preload_models()
+
+def pre_fork(server, worker):
+    if preload_app:
+        preload.freeze_for_fork()
+
+def post_fork(server, worker):
+    # worker.age counts spawns, so a replacement worker takes the next slice
+    thread_budget.pin_to_slice(worker.age - 1, server.num_workers)
+    if preload_app:
+        preload.after_fork_in_child()
+
+def child_exit(server, worker):
+    # Stop counting the exited worker's live gauges in multiprocess metrics
+    mark_process_dead(worker.pid)
@@ -0,0 +1,19 @@
+"""
+ASGI entry point for serving the stand-in app with real worker processes:
+
+    cd backend
+    WEB_CONCURRENCY=4 gunicorn -c gunicorn.conf.py loadtest.app:app
+    python -m loadtest.run --url http://localhost:8000 --users 50
+
+LOADTEST_DIR holds the shared SQLite database and uploads (default ./loadtest-data).
+"""
+import os
+from pathlib import Path
+
+from loadtest.standins import boot
+
+app = boot(
+    Path(os.getenv("LOADTEST_DIR", "./loadtest-data")).resolve(),
+    model_cost_scale=float(os.getenv("LOADTEST_MODEL_COST_SCALE", "1.0")),
+    rate_limits=os.getenv("LOADTEST_RATE_LIMITS", "false").lower() == "true",
+)
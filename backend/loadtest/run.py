@@ -0,0 +1,208 @@
+"""
+Closed-loop load generator for the API.
+
+    cd backend
+    python -m loadtest.run --users 20 --duration 60                 # in-process app on stand-ins
+    python -m loadtest.run --url http://localhost:8000 --users 50   # a running server (see loadtest.app)
+
+Each virtual user registers, uploads a resume, then picks actions by weight
+(--mix) until the duration is up. Reports throughput and latency percentiles
+per route; --output writes them as JSON.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.corpus import build_corpus
+from benchmarks.run import percentile
+
+DEFAULT_MIX = "login=1,upload=1,list=5,analyze=2,batch=1"
+PASSWORD = "loadtest-password"
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+
+    def record(self, route: str, status: int, elapsed: float):
+        self.latencies[route].append(elapsed)
+        self.statuses[route][status] += 1
+
+    def report(self, duration: float) -> Dict:
+        routes = {}
+        for route, samples in sorted(self.latencies.items()):
+            statuses = dict(self.statuses[route])
+            routes[route] = {
+                "requests": len(samples),
+                "errors": sum(count for status, count in statuses.items() if status >= 400),
+                "statuses": statuses,
+                "rps": len(samples) / duration,
+                "p50_ms": percentile(samples, 50) * 1000,
+                "p95_ms": percentile(samples, 95) * 1000,
+                "p99_ms": percentile(samples, 99) * 1000,
+                "max_ms": max(samples) * 1000,
+            }
+        total = sum(r["requests"] for r in routes.values())
+        return {"duration_s": duration, "requests": total, "rps": total / duration, "routes": routes}
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in ACTIONS:
+            raise ValueError(f"Unknown action {name!r}; choose from {', '.join(ACTIONS)}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+class VirtualUser:
+    def __init__(self, index: int, client: httpx.AsyncClient, recorder: Recorder, corpus: Dict, rng: random.Random):
+        self.email = f"loadtest-{index}-{rng.randrange(10**9)}@example.com"
+        self.client = client
+        self.recorder = recorder
+        self.corpus = corpus
+        self.rng = rng
+        self.token: Optional[str] = None
+        self.resume_ids: List[str] = []
+
+    async def request(self, route: str, method: str, url: str, **kwargs) -> httpx.Response:
+        headers = {"Authorization": f"Bearer {self.token}"} if self.token else {}
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=headers, **kwargs)
+            status = response.status_code
+        except httpx.HTTPError:
+            response, status = None, 599
+        self.recorder.record(route, status, time.perf_counter() - start)
+        return response
+
+    async def register(self):
+        response = await self.request("register", "POST", "/v1/auth/register",
+                                      json={"name": "Load Test", "email": self.email, "password": PASSWORD})
+        if response is not None and response.status_code == 200:
+            self.token = response.json()["access_token"]
+
+    async def login(self):
+        response = await self.request("login", "POST", "/v1/auth/login", json={"email": self.email, "password": PASSWORD})
+        if response is not None and response.status_code == 200:
+            self.token = response.json()["access_token"]
+
+    async def upload(self):
+        _, path = self.rng.choice(self.corpus["resumes"])
+        files = {"file": (path.name, path.read_bytes(), "application/pdf")}
+        response = await self.request("upload", "POST", "/v1/resumes", files=files)
+        if response is not None and response.status_code == 202:
+            self.resume_ids.append(response.json()["resume_id"])
+
+    async def list(self):
+        await self.request("list", "GET", "/v1/resumes")
+
+    async def analyze(self):
+        if not self.resume_ids:
+            return await self.upload()
+        await self.request("analyze", "POST", "/v1/analyze", json={
+            "resume_id": self.rng.choice(self.resume_ids),
+            "job_description": self.rng.choice(self.corpus["jobs"])[1],
+        })
+
+    async def batch(self):
+        if not self.resume_ids:
+            return await self.upload()
+        jobs = [text for _, text in self.rng.sample(self.corpus["jobs"], min(5, len(self.corpus["jobs"])))]
+        await self.request("batch", "POST", "/v1/analyze/batch", json={
+            "resume_id": self.rng.choice(self.resume_ids),
+            "job_descriptions": jobs,
+        })
+
+    async def run(self, mix: Dict[str, float], deadline: float, think_time: float):
+        await self.register()
+        await self.upload()
+        actions, weights = list(mix), list(mix.values())
+        while time.monotonic() < deadline:
+            await getattr(self, ACTIONS[self.rng.choices(actions, weights)[0]])()
+            if think_time:
+                await asyncio.sleep(self.rng.expovariate(1 / think_time))
+
+
+ACTIONS = {"login": "login", "upload": "upload", "list": "list", "analyze": "analyze", "batch": "batch"}
+
+
+async def drive(client: httpx.AsyncClient, users: int, duration: float, mix: Dict[str, float],
+                think_time: float, ramp_up: float, corpus: Dict, seed: int) -> Dict:
+    recorder = Recorder()
+    start = time.monotonic()
+    deadline = start + duration
+
+    async def user(index: int):
+        await asyncio.sleep(ramp_up * index / max(users, 1))
+        await VirtualUser(index, client, recorder, corpus, random.Random(seed + index)).run(mix, deadline, think_time)
+
+    await asyncio.gather(*(user(i) for i in range(users)))
+    return recorder.report(time.monotonic() - start)
+
+
+async def main_async(args) -> Dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = args.workdir or Path(tmp)
+        corpus = build_corpus(workdir / "corpus", seed=args.seed, per_size=3)
+        limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+        timeout = httpx.Timeout(args.timeout)
+        mix = parse_mix(args.mix)
+        if args.url:
+            async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=timeout) as client:
+                return await drive(client, args.users, args.duration, mix, args.think_time, args.ramp_up, corpus, args.seed)
+
+        from loadtest.standins import boot
+        app = boot(workdir / "app", model_cost_scale=args.model_cost_scale, rate_limits=args.rate_limits)
+        transport = httpx.ASGITransport(app=app)
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", limits=limits,
+                                         timeout=timeout) as client:
+                return await drive(client, args.users, args.duration, mix, args.think_time, args.ramp_up, corpus, args.seed)
+
+
+def print_report(report: Dict):
+    print(f"{report['requests']} requests in {report['duration_s']:.1f}s ({report['rps']:.1f} req/s)")
+    print(f"{'route':<10} {'requests':>8} {'errors':>7} {'rps':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for route, r in report["routes"].items():
+        print(f"{route:<10} {r['requests']:>8} {r['errors']:>7} {r['rps']:>7.1f} "
+              f"{r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Drive mixed traffic against the ResuMatch API")
+    parser.add_argument("--url", help="Target a running server instead of booting the app in-process")
+    parser.add_argument("--users", type=int, default=10, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds of traffic after ramp-up starts")
+    parser.add_argument("--ramp-up", type=float, default=2, help="Seconds over which users are started")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Mean pause between a user's requests")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Action weights (default {DEFAULT_MIX})")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", type=Path, help="Keep the corpus and stand-in database here")
+    parser.add_argument("--model-cost-scale", type=float, default=1.0,
+                        help="Multiply the simulated model CPU cost (in-process mode)")
+    parser.add_argument("--rate-limits", action="store_true", help="Keep rate limits enabled (in-process mode)")
+    parser.add_argument("--output", type=Path, help="Write the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(main_async(args))
+    print_report(report)
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""
+Boot app.main against local stand-ins: SQLite via aiosqlite instead of
+Postgres, fakeredis instead of Redis, Celery's in-memory broker and stubbed
+model modules. Everything here must run before app.main is imported because
+the app reads its configuration at import time.
+"""
+import os
+from pathlib import Path
+
+from loadtest import stub_models
+
+
+def configure_environment(workdir: Path, rate_limits: bool = False):
+    workdir.mkdir(parents=True, exist_ok=True)
+    (workdir / "uploads").mkdir(exist_ok=True)
+    os.environ.update({
+        "POSTGRES_URL": f"sqlite+aiosqlite:///{workdir / 'loadtest.db'}",
+        "UPLOAD_DIR": str(workdir / "uploads"),
+        # apply_async() publishes into kombu's in-memory transport and returns at once
+        "CELERY_BROKER_URL": "memory://",
+        "RATE_LIMIT_ENABLED": "true" if rate_limits else "false",
+        "JWT_SECRET": os.getenv("JWT_SECRET", "loadtest"),
+    })
+
+
+def create_schema(workdir: Path):
+    """Create tables with the stdlib sqlite driver; safe to call from several workers"""
+    from sqlalchemy import create_engine
+    from app.models import Base
+
+    engine = create_engine(f"sqlite:///{workdir / 'loadtest.db'}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+
+
+def install_fake_redis():
+    import fakeredis
+    from app import redis_client
+
+    server = fakeredis.FakeServer()
+    for purpose in redis_client.REDIS_DATABASES:
+        redis_client._async_clients[purpose] = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+        redis_client._sync_clients[purpose] = fakeredis.FakeRedis(server=server, decode_responses=True)
+
+
+def boot(workdir: Path, model_cost_scale: float = 1.0, rate_limits: bool = False):
+    """Configure the stand-ins and return the FastAPI app"""
+    configure_environment(workdir, rate_limits)
+    stub_models.install(model_cost_scale)
+    create_schema(workdir)
+    install_fake_redis()
+    from app.main import app
+    return app
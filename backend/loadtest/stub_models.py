@@ -0,0 +1,161 @@
+"""
+Lightweight stand-ins for the NLP model modules.
+
+They return the same shapes as app.utils.embeddings / resume_parser /
+job_parser / skills_matcher using keyword matching, and burn a configurable amount of CPU
+per call so the event loop is blocked the way the real models block it.
+The work is timed under the real pipeline's stage names (app.utils.stage_timer),
+so Server-Timing and the stage histograms look as they do in production.
+"""
+import re
+import sys
+import time
+import types
+from typing import Dict, List
+
+import numpy as np
+
+from PyPDF2 import PdfReader
+
+from app.utils.stage_timer import stage
+
+KNOWN_SKILLS = [
+    "python", "javascript", "typescript", "java", "go", "rust", "c++", "sql", "react", "angular",
+    "vue", "node.js", "django", "flask", "fastapi", "spring", "postgresql", "mysql", "mongodb",
+    "redis", "elasticsearch", "aws", "azure", "gcp", "docker", "kubernetes", "terraform", "git",
+    "jenkins", "linux", "tensorflow", "pytorch", "kafka", "graphql",
+]
+
+# Simulated model cost per call, in milliseconds (see install())
+COSTS_MS = {"parse_resume": 150.0, "parse_job_description": 20.0, "match": 10.0}
+
+
+def _burn(ms: float):
+    """Busy-wait: the real models hold the GIL, so sleeping would be too kind"""
+    deadline = time.perf_counter() + ms / 1000
+    while time.perf_counter() < deadline:
+        pass
+
+
+def _skills(text: str) -> List[str]:
+    lowered = text.lower()
+    return [skill for skill in KNOWN_SKILLS if skill in lowered]
+
+
+class StubEmbedder:
+    backend = "stub"
+    dimension = 384
+
+    def encode(self, texts, batch_size: int = 32) -> np.ndarray:
+        return np.zeros((len(list(texts)), self.dimension), dtype=np.float32)
+
+
+class StubResumeParser:
+    def extract_text_from_pdf(self, pdf_path: str) -> str:
+        return "\n".join(page.extract_text() or "" for page in PdfReader(pdf_path).pages).strip()
+
+    def extract_skills(self, text: str) -> List[str]:
+        return _skills(text)
+
+    def parse_resume(self, pdf_path: str) -> Dict:
+        with stage("pdf_extract"):
+            text = self.extract_text_from_pdf(pdf_path)
+        with stage("spacy"):
+            _burn(COSTS_MS["parse_resume"])
+            skills = _skills(text)
+        with stage("regex_extract"):
+            education = [{"degree": line.strip()} for line in text.splitlines() if re.search(r"bachelor|master|phd", line, re.I)]
+            experience = [{"title": line.strip()} for line in text.splitlines() if re.search(r"\d{4}\s*-\s*\d{4}", line)]
+        return {
+            "text_content": text,
+            "skills": skills,
+            "skill_scores": {skill: 0.5 for skill in skills},
+            "skill_embeddings": {},
+            "education": education,
+            "experience": experience,
+            "metadata": {
+                "word_count": len(text.split()),
+                "char_count": len(text),
+                "skills_count": len(skills),
+                "education_count": len(education),
+                "experience_count": len(experience),
+            },
+        }
+
+
+def parse_job_description(text: str) -> Dict:
+    with stage("jd_spacy"):
+        _burn(COSTS_MS["parse_job_description"])
+        skills = _skills(text)
+    with stage("jd_regex_extract"):
+        return {
+            "skills": skills,
+            "education": list(set(re.findall(r"(bachelor|master|phd)", text, re.I))),
+            "experience": list(set(re.findall(r"(\d+\+?\s*years? of experience)", text, re.I))),
+        }
+
+
+class StubSkillsMatcher:
+    def calculate_similarity(self, resume_skills: List[str], job_skills: List[str]) -> float:
+        if not resume_skills or not job_skills:
+            return 0.0
+        return len(set(resume_skills) & set(job_skills)) / len(set(job_skills))
+
+    def get_detailed_matching(self, resume_skills: List[str], job_skills: List[str]) -> Dict:
+        with stage("similarity"):
+            _burn(COSTS_MS["match"])
+        matched = set(resume_skills) & set(job_skills)
+        return {
+            "overall_score": self.calculate_similarity(resume_skills, job_skills),
+            "skill_matches": [{"job_skill": s, "resume_skill": s, "similarity": 1.0} for s in sorted(matched)],
+            "missing_skills": sorted(set(job_skills) - matched),
+            "extra_skills": sorted(set(resume_skills) - matched),
+            "match_percentage": len(matched) / len(job_skills) if job_skills else 0.0,
+        }
+
+    def calculate_overall_match_score(self, resume_data: Dict, job_data: Dict, weights: Dict = None,
+                                      resume_embeddings=None, job_embeddings=None) -> Dict:
+        with stage("rule_scoring"):
+            _burn(COSTS_MS["match"])
+        weights = weights or {"skills": 0.6, "experience": 0.25, "education": 0.15}
+        skills_score = self.calculate_similarity(resume_data.get("skills", []), job_data.get("skills", []))
+        experience_score = 0.8 if resume_data.get("experience") else 0.3
+        education_score = 0.8 if resume_data.get("education") else 0.3
+        return {
+            "overall_score": skills_score * weights["skills"] + experience_score * weights["experience"]
+            + education_score * weights["education"],
+            "skills_score": skills_score,
+            "experience_score": experience_score,
+            "education_score": education_score,
+            "weights": weights,
+        }
+
+
+def install(scale: float = 1.0):
+    """Register the stubs under the real module names; call before importing app.main"""
+    for key in COSTS_MS:
+        COSTS_MS[key] *= scale
+    embedder, parser, matcher = StubEmbedder(), StubResumeParser(), StubSkillsMatcher()
+    embeddings_module = types.ModuleType("app.utils.embeddings")
+    embeddings_module.get_embedder = lambda: embedder
+    # The vector helpers are plain NumPy, so the real ones are kept
+    from app.utils import embeddings as real_embeddings
+    for name in ("l2_normalize", "to_bytes", "from_bytes"):
+        setattr(embeddings_module, name, getattr(real_embeddings, name))
+    resume_module = types.ModuleType("app.utils.resume_parser")
+    resume_module.ResumeParser = StubResumeParser
+    resume_module.get_resume_parser = lambda: parser
+    job_module = types.ModuleType("app.utils.job_parser")
+    job_module.parse_job_description = parse_job_description
+    job_module.parse_job_descriptions = lambda texts, batch_size=64, n_process=1: map(parse_job_description, texts)
+    job_module.get_nlp = lambda: None
+    job_module.SKILLS = KNOWN_SKILLS
+    matcher_module = types.ModuleType("app.utils.skills_matcher")
+    matcher_module.SkillsMatcher = StubSkillsMatcher
+    matcher_module.get_skills_matcher = lambda: matcher
+    sys.modules.update({
+        "app.utils.embeddings": embeddings_module,
+        "app.utils.resume_parser": resume_module,
+        "app.utils.job_parser": job_module,
+        "app.utils.skills_matcher": matcher_module,
+    })
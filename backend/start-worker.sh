@@ -0,0 +1,14 @@
+#!/bin/bash
+# Start a Celery worker for one queue (or a comma-separated list, drained in order)
+#   ./start-worker.sh interactive|ml|bulk|io [extra celery worker args]
+# Pool type, concurrency, prefetch and child recycling come from
+# QUEUE_PROFILES in app/celery_queues.py; override concurrency with
+# CELERY_<QUEUE>_CONCURRENCY.
+
+# One metrics directory per worker, emptied at start so the previous run's
+# counters and live gauges don't carry over (see start.sh)
+export PROMETHEUS_MULTIPROC_DIR=${PROMETHEUS_MULTIPROC_ROOT:-/tmp/resumatch-metrics}/worker-${1:-ml}
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
+exec python -m app.celery_queues "${1:-ml}" "${@:2}"
@@ -6,5 +6,12 @@ echo "Starting ResuMatch Backend..."
 # Run database migrations if needed
 # python -m alembic upgrade head
 
+# Aggregate metrics across gunicorn workers (app.metrics_exporter also reads
+# Celery's directories on the same host). The directory must start empty, or
+# counters and live gauges of the previous run's processes carry over.
+export PROMETHEUS_MULTIPROC_DIR=${PROMETHEUS_MULTIPROC_ROOT:-/tmp/resumatch-metrics}/api
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
 # Start the application
-exec gunicorn -k uvicorn.workers.UvicornWorker app.main:app --bind 0.0.0.0:$PORT --workers 1 --timeout 120 
\ No newline at end of file
+exec gunicorn -c gunicorn.conf.py app.main:app
@@ -7,9 +7,9 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from app.utils.resume_parser import resume_parser
+from app.utils.resume_parser import get_resume_parser
 from app.utils.job_parser import parse_job_description
-from app.utils.skills_matcher import skills_matcher
+from app.utils.skills_matcher import get_skills_matcher
 
 def test_job_parser():
     """Test job description parsing"""
@@ -57,11 +57,11 @@ def test_skills_matcher():
     
     try:
         # Test basic similarity
-        similarity = skills_matcher.calculate_similarity(resume_skills, job_skills)
+        similarity = get_skills_matcher().calculate_similarity(resume_skills, job_skills)
         print(f"✅ Basic similarity calculation: {similarity:.3f}")
         
         # Test detailed matching
-        detailed = skills_matcher.get_detailed_matching(resume_skills, job_skills)
+        detailed = get_skills_matcher().get_detailed_matching(resume_skills, job_skills)
         print(f"✅ Detailed matching successful!")
         print(f"   Overall score: {detailed['overall_score']:.3f}")
         print(f"   Match percentage: {detailed['match_percentage']:.1%}")
@@ -90,7 +90,7 @@ def test_overall_pipeline():
     }
     
     try:
-        result = skills_matcher.calculate_overall_match_score(resume_data, job_data)
+        result = get_skills_matcher().calculate_overall_match_score(resume_data, job_data)
         print("✅ Complete pipeline successful!")
         print(f"   Overall score: {result['overall_score']:.3f}")
         print(f"   Skills score: {result['skills_score']:.3f}")
@@ -107,7 +107,7 @@ def test_model_loading():
     
     try:
         # Test sentence transformer
-        embeddings = skills_matcher.get_embeddings(["Python", "JavaScript"])
+        embeddings = get_skills_matcher().get_embeddings(["Python", "JavaScript"])
         print(f"✅ Sentence transformer loaded: {embeddings.shape}")
         
         # Test spaCy (if available)
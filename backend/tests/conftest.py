@@ -0,0 +1,12 @@
+import pytest
+
+from app.db_metrics import query_budget as _query_budget
+
+@pytest.fixture
+def query_budget():
+    """
+    Assert how many SQL statements a block may run, e.g.
+        with query_budget(2):
+            await client.get("/v1/resumes")
+    """
+    return _query_budget
@@ -0,0 +1,141 @@
+"""
+Endpoint tests on the load-test stand-in app (SQLite, fakeredis, stub models;
+see loadtest.standins).
+
+Booting swaps the model modules and the app reads its configuration at
+import, so each scenario runs in a fresh interpreter
+(python -m tests.test_api_standins SCENARIO WORKDIR OUTPUT) and writes what
+it observed as JSON for the test to check.
+"""
+import asyncio
+import json
+import os
+import subprocess
+import sys
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Statements per request, independent of how many resumes and matches the user has
+QUERY_BUDGETS = {
+    "list_resumes": 2,   # user, resumes with their match counts
+    "get_resume": 3,     # user, resume, its matches with their jobs
+    "list_matches": 2,   # user, matches joined to resumes and jobs
+}
+
+
+def run_scenario(name: str, tmp_path: Path) -> dict:
+    output = tmp_path / "result.json"
+    result = subprocess.run(
+        [sys.executable, "-m", "tests.test_api_standins", name, str(tmp_path / "work"), str(output)],
+        cwd=BACKEND_DIR, env={**os.environ, "BCRYPT_ROUNDS": "4"}, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr[-5000:]
+    return json.loads(output.read_text())
+
+
+def test_read_endpoints_stay_within_query_budgets(tmp_path):
+    counts = run_scenario("query_counts", tmp_path)
+    for route, budget in QUERY_BUDGETS.items():
+        assert counts[route] <= budget, f"{route}: {counts[route]} queries, budget {budget}"
+
+
+def test_analyze_reports_pipeline_stages(tmp_path):
+    result = run_scenario("analyze", tmp_path)
+
+    assert result["status"] == 200
+    assert 0 <= result["overall_match_score"] <= 1
+    stages = dict(entry.split(";dur=") for entry in result["server_timing"].split(", "))
+    assert {"db", "pdf_extract", "spacy", "regex_extract", "jd_spacy", "rule_scoring", "similarity"} <= set(stages)
+    assert all(float(ms) >= 0 for ms in stages.values())
+    # Every stage in the header was also observed by the histogram
+    assert set(stages) <= set(result["histogram_stages"])
+
+
+# Scenarios: run in the child interpreter only
+
+@asynccontextmanager
+async def _signed_up_client(workdir: Path):
+    """A client of the booted stand-in app, signed in as a fresh user, and a generated corpus"""
+    import httpx
+    from benchmarks.corpus import build_corpus
+    from loadtest.standins import boot
+
+    app = boot(workdir)
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app), httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post("/v1/auth/register", json={
+            "name": "Test", "email": "test@example.com", "password": "test-password",
+        })
+        assert response.status_code == 200, response.text
+        client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+        yield client, build_corpus(workdir / "corpus", per_size=1)
+
+
+async def _upload(client, path: Path) -> str:
+    response = await client.post("/v1/resumes", files={"file": (path.name, path.read_bytes(), "application/pdf")})
+    assert response.status_code == 202, response.text
+    return response.json()["resume_id"]
+
+
+def _add_matches(workdir: Path, resume_ids):
+    from sqlalchemy import create_engine, insert
+    from app.models import Job, Match
+
+    engine = create_engine(f"sqlite:///{workdir / 'loadtest.db'}")
+    with engine.begin() as conn:
+        conn.execute(insert(Job), [{"id": i, "title": f"Job {i}", "requirements": {"skills": []}} for i in range(1, 4)])
+        conn.execute(insert(Match), [
+            {"resume_id": resume_id, "job_id": job_id, "score": job_id / 10}
+            for resume_id in resume_ids for job_id in range(1, 4)
+        ])
+    engine.dispose()
+
+
+async def query_counts(workdir: Path) -> dict:
+    async with _signed_up_client(workdir) as (client, corpus):
+        from app.db_metrics import query_budget
+
+        resume_ids = [await _upload(client, path) for _, path in corpus["resumes"][:3]]
+        _add_matches(workdir, resume_ids)
+        counts = {}
+        for route, url in (
+            ("list_resumes", "/v1/resumes"),
+            ("get_resume", f"/v1/resumes/{resume_ids[0]}"),
+            ("list_matches", "/v1/matches"),
+        ):
+            # Over budget raises with the statements listed; the test shows the child's stderr
+            with query_budget(QUERY_BUDGETS[route]) as stats:
+                response = await client.get(url)
+            assert response.status_code == 200, response.text
+            counts[route] = stats.count
+    return counts
+
+
+async def analyze(workdir: Path) -> dict:
+    async with _signed_up_client(workdir) as (client, corpus):
+        from prometheus_client import REGISTRY
+
+        resume_id = await _upload(client, corpus["resumes"][0][1])
+        response = await client.post("/v1/analyze", json={
+            "resume_id": resume_id, "job_description": corpus["jobs"][0][1],
+        })
+    histogram_stages = {
+        sample.labels["stage"]
+        for metric in REGISTRY.collect() if metric.name == "pipeline_stage_seconds"
+        for sample in metric.samples if sample.name.endswith("_count") and sample.value
+    }
+    return {
+        "status": response.status_code,
+        "overall_match_score": response.json().get("overall_match_score"),
+        "server_timing": response.headers.get("Server-Timing", ""),
+        "histogram_stages": sorted(histogram_stages),
+    }
+
+
+SCENARIOS = {"query_counts": query_counts, "analyze": analyze}
+
+if __name__ == "__main__":
+    name, workdir, output = sys.argv[1:]
+    Path(output).write_text(json.dumps(asyncio.run(SCENARIOS[name](Path(workdir)))))
@@ -0,0 +1,44 @@
+import PyPDF2
+
+from benchmarks.corpus import build_corpus
+from benchmarks.run import compare, percentile, summarize
+
+
+def test_corpus_is_deterministic_and_extractable(tmp_path):
+    first = build_corpus(tmp_path / "a", seed=7, per_size=1)
+    second = build_corpus(tmp_path / "b", seed=7, per_size=1)
+
+    for (_, a), (_, b) in zip(first["resumes"], second["resumes"]):
+        assert a.read_bytes() == b.read_bytes()
+    assert [text for _, text in first["jobs"]] == [text for _, text in second["jobs"]]
+
+    size, path = first["resumes"][-1]
+    reader = PyPDF2.PdfReader(str(path))
+    assert size == "large" and len(reader.pages) > 1
+    assert "Experience" in reader.pages[0].extract_text()
+
+
+def test_percentiles_and_summary():
+    samples = [i / 1000 for i in range(1, 101)]
+    assert percentile(samples, 50) == 0.0505
+    assert round(percentile(samples, 99), 5) == 0.09901
+    summary = summarize(samples)
+    assert summary["n"] == 100
+    assert round(summary["p95_ms"], 2) == 95.05
+
+
+def test_compare_flags_only_meaningful_regressions():
+    baseline = {"benchmarks": {
+        "slower": {"p95_ms": 10.0},
+        "noise": {"p95_ms": 0.1},
+        "steady": {"p95_ms": 10.0},
+    }}
+    results = {"benchmarks": {
+        "slower": {"p95_ms": 15.0},
+        "noise": {"p95_ms": 0.3},
+        "steady": {"p95_ms": 11.0},
+        "new": {"p95_ms": 99.0},
+    }}
+    regressions = compare(results, baseline, tolerance=0.2, min_delta_ms=1.0)
+    assert [r["benchmark"] for r in regressions] == ["slower"]
+    assert regressions[0]["change"] == 0.5
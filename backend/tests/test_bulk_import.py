@@ -0,0 +1,146 @@
+import io
+import zipfile
+
+import pikepdf
+import pytest
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from app import db, bulk_import, tasks
+from app.models import Base, User, Resume, ImportJob, ImportItem, ImportItemStatus, ImportStatus
+from app.utils import models
+from app.tasks import import_sanitize_chunk, import_parse_chunk
+
+
+def pdf_bytes() -> bytes:
+    buffer = io.BytesIO()
+    with pikepdf.new() as pdf:
+        pdf.add_blank_page()
+        pdf.save(buffer)
+    return buffer.getvalue()
+
+
+def make_zip(entries) -> io.BytesIO:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, data in entries.items():
+            archive.writestr(name, data)
+    buffer.seek(0)
+    return buffer
+
+
+class FakeParser:
+    def parse_resume(self, path):
+        if "broken" in path:
+            raise RuntimeError("unreadable")
+        return {"skills": ["python"]}
+
+
+@pytest.fixture
+def session_factory(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'import.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine, expire_on_commit=False)
+    monkeypatch.setattr(db, "_sync_sessionmaker", factory)
+    monkeypatch.setattr(models, "get", lambda name: FakeParser())
+    monkeypatch.setattr(tasks, "publish_event", lambda user_id, event: None)
+    with factory() as session:
+        session.add(User(id=1, name="a", email="a@example.com", provider="email"))
+        session.commit()
+    yield factory
+    engine.dispose()
+
+
+def create_import(factory, staged):
+    job, items = bulk_import.import_statements("imp1", 1, "test", staged)
+    with factory() as session:
+        session.execute(job)
+        session.execute(insert(ImportItem), items)
+        session.commit()
+        return list(session.execute(bulk_import.unfinished_items("imp1")).scalars())
+
+
+def test_stage_zip_extracts_pdfs_and_skips_the_rest(tmp_path):
+    archive = make_zip({
+        "a.pdf": pdf_bytes(),
+        "nested/b.PDF": pdf_bytes(),
+        "notes.txt": b"hello",
+        "__MACOSX/._a.pdf": b"junk",
+    })
+
+    staged, skipped = bulk_import.stage_zip(archive, str(tmp_path))
+
+    assert [item["filename"] for item in staged] == ["a.pdf", "nested/b.PDF"]
+    assert all(item["path"].startswith(str(tmp_path)) for item in staged)
+    assert staged[1]["path"].endswith("_b.PDF")
+    assert {item["filename"] for item in skipped} == {"notes.txt", "__MACOSX/._a.pdf"}
+
+
+def test_stage_zip_enforces_limits(tmp_path, monkeypatch):
+    monkeypatch.setattr(bulk_import, "IMPORT_MAX_FILE_BYTES", 10)
+    staged, skipped = bulk_import.stage_zip(make_zip({"big.pdf": b"%PDF" + b"x" * 20}), str(tmp_path))
+    assert staged == [] and skipped[0]["filename"] == "big.pdf"
+
+    monkeypatch.setattr(bulk_import, "IMPORT_MAX_FILE_BYTES", 1000)
+    monkeypatch.setattr(bulk_import, "IMPORT_MAX_FILES", 1)
+    with pytest.raises(bulk_import.ImportTooLarge):
+        bulk_import.stage_zip(make_zip({"a.pdf": b"%PDF", "b.pdf": b"%PDF"}), str(tmp_path))
+    # Files staged before the rejection are removed again
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_stage_directory_cleans_up_when_rejected(tmp_path, monkeypatch):
+    source, uploads = tmp_path / "source", tmp_path / "uploads"
+    source.mkdir()
+    uploads.mkdir()
+    for name in ("a.pdf", "b.pdf", "c.pdf"):
+        (source / name).write_bytes(b"%PDF")
+    monkeypatch.setattr(bulk_import, "IMPORT_MAX_FILES", 2)
+
+    with pytest.raises(bulk_import.ImportTooLarge):
+        bulk_import.stage_directory(source, str(uploads))
+    assert list(uploads.iterdir()) == []
+
+
+def test_chunks_process_items_and_complete_the_job(session_factory, tmp_path):
+    good, broken, invalid = tmp_path / "good.pdf", tmp_path / "broken.pdf", tmp_path / "invalid.pdf"
+    good.write_bytes(pdf_bytes())
+    broken.write_bytes(pdf_bytes())
+    invalid.write_bytes(b"not a pdf")
+    staged = [
+        {"filename": path.name, "resume_id": f"r{i}", "path": str(path)}
+        for i, path in enumerate([good, broken, invalid])
+    ]
+    item_ids = create_import(session_factory, staged)
+
+    sanitized = import_sanitize_chunk.run("imp1", item_ids)
+    assert len(sanitized) == 2
+    import_parse_chunk.run(sanitized, "imp1")
+
+    with session_factory() as session:
+        job = session.get(ImportJob, "imp1")
+        assert (job.status, job.succeeded, job.failed) == (ImportStatus.completed, 1, 2)
+        assert job.finished_at is not None
+        resumes = session.execute(select(Resume)).scalars().all()
+        assert [(r.id, r.filename, r.skills) for r in resumes] == [("r0", "good.pdf", ["python"])]
+        errors = dict(session.execute(bulk_import.failed_items("imp1")).all())
+        assert errors["broken.pdf"] == "unreadable"
+        assert "magic number" in errors["invalid.pdf"]
+    assert not invalid.exists()
+
+
+def test_redelivered_chunks_skip_finished_items(session_factory, tmp_path):
+    path = tmp_path / "good.pdf"
+    path.write_bytes(pdf_bytes())
+    item_ids = create_import(session_factory, [{"filename": "good.pdf", "resume_id": "r0", "path": str(path)}])
+
+    import_parse_chunk.run(import_sanitize_chunk.run("imp1", item_ids), "imp1")
+    # A crash after the commit redelivers both steps; nothing is redone
+    assert import_sanitize_chunk.run("imp1", item_ids) == []
+    import_parse_chunk.run(item_ids, "imp1")
+
+    with session_factory() as session:
+        assert len(session.execute(select(Resume)).scalars().all()) == 1
+        assert session.get(ImportJob, "imp1").succeeded == 1
+        assert list(session.execute(bulk_import.unfinished_items("imp1")).scalars()) == []
+        assert session.get(ImportItem, item_ids[0]).status == ImportItemStatus.ready
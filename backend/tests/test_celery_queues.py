@@ -0,0 +1,69 @@
+import pytest
+from celery import Celery
+
+from app import celery_queues
+from app.utils import thread_budget
+
+
+@pytest.fixture
+def app():
+    app = Celery("test", broker="memory://")
+    app.conf.update(celery_queues.celery_queue_config())
+    return app
+
+
+def route(app, name, **options):
+    return app.amqp.router.route(options, name, (), {})
+
+
+def test_process_pdf_routes_to_ml_queue(app):
+    assert route(app, "process_pdf")["queue"].name == "ml"
+
+
+def test_explicit_queue_overrides_route(app):
+    assert route(app, "process_pdf", queue="interactive")["queue"].name == "interactive"
+
+
+def test_every_queue_is_declared(app):
+    assert {q.name for q in app.conf.task_queues} == set(celery_queues.QUEUE_PROFILES)
+    assert app.conf.task_acks_late
+    assert app.conf.worker_prefetch_multiplier == 1
+
+
+def test_ml_worker_command_recycles_children(monkeypatch):
+    monkeypatch.setenv("CELERY_ML_CONCURRENCY", "3")
+    argv, env = celery_queues.worker_command(["ml"])
+    assert argv[argv.index("-Q") + 1] == "ml"
+    assert argv[argv.index("--concurrency") + 1] == "3"
+    assert argv[argv.index("--prefetch-multiplier") + 1] == "1"
+    assert "--max-tasks-per-child" in argv
+    assert env["CELERY_CONCURRENCY"] == "3"
+
+
+def test_default_concurrency_follows_the_thread_budget_cpus(monkeypatch):
+    # Same CPU count (affinity and cgroup quota) the children divide their thread budget by
+    monkeypatch.setattr(thread_budget, "usable_cpus", lambda: 3)
+    monkeypatch.delenv("CELERY_ML_CONCURRENCY", raising=False)
+    argv, env = celery_queues.worker_command(["ml"])
+    assert argv[argv.index("--concurrency") + 1] == "3"
+
+
+def test_io_worker_uses_threads_and_drains_queues_in_order():
+    argv, env = celery_queues.worker_command(["io", "bulk"], ["--without-gossip"])
+    assert argv[argv.index("--pool") + 1] == "threads"
+    assert argv[argv.index("-Q") + 1] == "io,bulk"
+    assert "--max-tasks-per-child" not in argv
+    assert argv[-1] == "--without-gossip"
+    # Thread pool children share one process's DB pool and thread budget
+    assert env["CELERY_CONCURRENCY"] == "1"
+
+
+def test_unknown_queue_rejected():
+    with pytest.raises(ValueError):
+        celery_queues.worker_command(["nope"])
+
+
+def test_broker_options_enable_priorities():
+    options = celery_queues.broker_priority_options()
+    assert options["queue_order_strategy"] == "priority"
+    assert celery_queues.PRIORITY_INTERACTIVE in options["priority_steps"]
@@ -0,0 +1,60 @@
+import logging
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app import db_metrics
+from app.db_metrics import fingerprint, instrument_engine, track_queries
+
+def test_fingerprint_normalizes_literals_and_params():
+    a = fingerprint("SELECT * FROM users WHERE id = $1 AND email = 'a@b.c'")
+    b = fingerprint("SELECT  *  FROM users\nWHERE id = $2 AND email = 'x@y.z'")
+    assert a == b == "SELECT * FROM users WHERE id = ? AND email = ?"
+    assert fingerprint("SELECT 1 WHERE x IN (1, 2, 3)") == fingerprint("SELECT 7 WHERE x IN (4)")
+    assert fingerprint("SELECT x::int FROM t WHERE y = :y") == "SELECT x::int FROM t WHERE y = ?"
+
+def test_fingerprint_collapses_multi_row_values():
+    two = fingerprint("INSERT INTO jobs (title, hash) VALUES ($1, $2::VARCHAR), ($3, $4::VARCHAR) RETURNING id")
+    three = fingerprint("INSERT INTO jobs (title, hash) VALUES ($1, $2::VARCHAR), ($3, $4::VARCHAR), ($5, $6::VARCHAR) RETURNING id")
+    assert two == three == "INSERT INTO jobs (title, hash) VALUES (?, ?::VARCHAR) RETURNING id"
+    assert fingerprint("INSERT INTO t (a) VALUES (?), (?), (?)") == "INSERT INTO t (a) VALUES (?)"
+
+@pytest_asyncio.fixture
+async def engine():
+    engine = instrument_engine(create_async_engine("sqlite+aiosqlite://"))
+    yield engine
+    await engine.dispose()
+
+@pytest.mark.asyncio
+async def test_query_budget_counts_statements(engine, query_budget):
+    with query_budget(2) as stats:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            await conn.execute(text("SELECT 2"))
+    assert stats.count == 2
+
+    with pytest.raises(AssertionError, match="at most 1 queries, got 2"):
+        with query_budget(1):
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                await conn.execute(text("SELECT 2"))
+
+@pytest.mark.asyncio
+async def test_nested_tracking_rolls_up_to_request(engine):
+    with track_queries({"path": "/v1/resumes"}) as outer:
+        with track_queries() as inner:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+    assert inner.count == outer.count == 1
+    assert inner.route == "/v1/resumes"
+
+@pytest.mark.asyncio
+async def test_slow_statements_are_logged_with_route(engine, monkeypatch, caplog):
+    monkeypatch.setattr(db_metrics, "DB_SLOW_QUERY_MS", 0)
+    with caplog.at_level(logging.WARNING, logger="app.db_metrics"):
+        with track_queries({"path": "/v1/matches"}):
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 42"))
+    assert "Slow query" in caplog.text and "/v1/matches" in caplog.text
@@ -0,0 +1,29 @@
+from sqlalchemy.pool import NullPool
+
+from app import db
+from app.db import pool_sizing, engine_options
+
+def test_pool_size_is_split_across_worker_processes(monkeypatch):
+    monkeypatch.setenv("DB_CONNECTION_BUDGET_API", "40")
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+    pool_size, max_overflow = pool_sizing("api")
+    assert pool_size + max_overflow == 10
+    assert max_overflow == 2
+    monkeypatch.setenv("WEB_CONCURRENCY", "100")
+    assert pool_sizing("api") == (1, 0)
+
+def test_migration_profile_holds_no_idle_connections():
+    assert engine_options("migration")["poolclass"] is NullPool
+
+def test_cli_sessions_use_their_own_unpooled_engine(tmp_path):
+    with db.cli_session(f"sqlite+aiosqlite:///{tmp_path / 'cli.db'}") as session:
+        assert isinstance(session.bind.pool, NullPool)
+        assert session.bind.url.drivername == "sqlite"
+
+def test_pgbouncer_mode_disables_statement_caches(monkeypatch):
+    monkeypatch.setattr(db, "PGBOUNCER_TRANSACTION_MODE", True)
+    args = engine_options("worker")["connect_args"]
+    assert args["statement_cache_size"] == 0
+    assert args["prepared_statement_cache_size"] == 0
+    assert args["prepared_statement_name_func"]() != args["prepared_statement_name_func"]()
+    assert args["server_settings"]["application_name"] == "resumatch-worker"
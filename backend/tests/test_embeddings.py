@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from app.utils import embeddings
+
+
+def test_mean_pool_ignores_padding():
+    hidden = np.array([[[1.0, 1.0], [3.0, 3.0], [100.0, 100.0]]])
+    mask = np.array([[1, 1, 0]])
+    assert np.allclose(embeddings.mean_pool(hidden, mask), [[2.0, 2.0]])
+
+
+def test_l2_normalize_handles_zero_vectors():
+    vectors = embeddings.l2_normalize(np.array([[3.0, 4.0], [0.0, 0.0]]))
+    assert np.allclose(vectors, [[0.6, 0.8], [0.0, 0.0]])
+
+
+def test_embedder_is_loaded_once_per_process(monkeypatch):
+    loads = []
+
+    class Fake:
+        backend = "fake"
+
+    monkeypatch.setattr(embeddings, "_embedder", None)
+    monkeypatch.setattr(embeddings, "load_embedder", lambda: loads.append(1) or Fake())
+    assert embeddings.get_embedder() is embeddings.get_embedder()
+    assert loads == [1]
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match="EMBEDDING_BACKEND"):
+        embeddings.load_embedder("tensorflow")
+
+
+def test_onnx_backend_requires_exported_model(tmp_path):
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("tokenizers")
+    with pytest.raises(FileNotFoundError, match="export"):
+        embeddings.OnnxEmbedder(tmp_path)
@@ -0,0 +1,55 @@
+import json
+import math
+
+import pytest
+
+from evaluation.dataset import band, load_examples
+from evaluation.metrics import precision_recall, skill_counts, spearman
+from evaluation.run import DEFAULT_DATASET, compare_scores, evaluate
+
+
+class KeywordBackend:
+    name = "keyword"
+    vocabulary = ["python", "django", "react", "docker", "aws", "sql", "java", "kubernetes"]
+
+    def analyze_resume(self, text):
+        return {"skills": [s for s in self.vocabulary if s in text.lower()], "education": [], "experience": []}
+
+    analyze_job = analyze_resume
+
+    def score(self, resume, job):
+        if not job["skills"]:
+            return 0.0
+        return len(set(resume["skills"]) & set(job["skills"])) / len(job["skills"])
+
+
+def test_skill_metrics_are_case_insensitive_and_micro_averaged():
+    counts = [skill_counts(["Python", "noise"], ["python", "django"]), skill_counts(["aws"], ["aws"])]
+    assert counts[0] == {"tp": 1, "fp": 1, "fn": 1}
+    assert precision_recall(counts) == {"precision": 2 / 3, "recall": 2 / 3, "f1": pytest.approx(2 / 3)}
+
+
+def test_bands_and_rank_correlation():
+    assert [band(s) for s in (0.1, 0.4, 0.69, 0.7, 1.0)] == ["low", "medium", "medium", "high", "high"]
+    assert spearman([1, 2, 3, 4], [10, 20, 30, 40]) == pytest.approx(1.0)
+    assert spearman([1, 2, 2, 3], [3, 2, 2, 1]) == pytest.approx(-1.0)
+    assert math.isnan(spearman([1, 1], [2, 3]))
+
+
+def test_dataset_validation(tmp_path):
+    path = tmp_path / "bad.jsonl"
+    path.write_text(json.dumps({"id": "a", "job_description": "x", "expected_skills": [], "expected_band": "high"}) + "\n")
+    with pytest.raises(ValueError, match="resume_text"):
+        load_examples(path)
+
+
+def test_evaluate_sample_set_against_itself():
+    examples = load_examples(DEFAULT_DATASET)
+    report = evaluate(KeywordBackend(), examples)
+    assert report["examples"] == len(examples)
+    assert 0 < report["resume_skills"]["recall"] <= 1
+    assert set(report["latency"]) == {"analyze_resume", "analyze_job", "score", "total"}
+
+    agreement = compare_scores(report["rows"], report["rows"])
+    assert agreement["mean_abs_diff"] == 0
+    assert agreement["band_agreement"] == 1
@@ -0,0 +1,77 @@
+import asyncio
+import json
+
+import fakeredis
+import pytest
+import pytest_asyncio
+
+from app import events, redis_client
+
+
+@pytest_asyncio.fixture
+async def broker(monkeypatch):
+    server = fakeredis.FakeServer()
+    monkeypatch.setitem(redis_client._async_clients, "events",
+                        fakeredis.aioredis.FakeRedis(server=server, decode_responses=True))
+    monkeypatch.setitem(redis_client._sync_clients, "events",
+                        fakeredis.FakeRedis(server=server, decode_responses=True))
+    broker = events.EventBroker()
+    yield broker
+    await broker.close()
+
+
+async def receive(queue):
+    return json.loads(await asyncio.wait_for(queue.get(), 2))
+
+
+@pytest.mark.asyncio
+async def test_task_event_reaches_subscribed_user(broker):
+    mine = await broker.subscribe(1)
+    theirs = await broker.subscribe(2)
+
+    events.publish_event(1, events.resume_event("r1", "ready", skills=["python"]))
+
+    assert await receive(mine) == {"type": "resume.status", "resume_id": "r1", "status": "ready", "skills": ["python"]}
+    assert theirs.empty()
+
+
+@pytest.mark.asyncio
+async def test_every_client_of_a_user_gets_the_event(broker):
+    first, second = await broker.subscribe(1), await broker.subscribe(1)
+
+    events.publish_event(1, events.resume_event("r1", "processing"))
+
+    assert (await receive(first))["status"] == "processing"
+    assert (await receive(second))["status"] == "processing"
+
+
+@pytest.mark.asyncio
+async def test_last_client_leaving_unsubscribes(broker):
+    first, second = await broker.subscribe(1), await broker.subscribe(1)
+    await broker.unsubscribe(1, first)
+    assert events.channel(1) in broker._listeners
+    await broker.unsubscribe(1, second)
+    assert broker._listeners == {}
+
+
+def test_slow_client_drops_oldest_events(monkeypatch):
+    monkeypatch.setattr(events, "EVENT_QUEUE_SIZE", 2)
+    broker = events.EventBroker()
+    queue = asyncio.Queue(maxsize=2)
+    broker._listeners["user:1:events"] = {queue}
+    for i in range(3):
+        broker._dispatch("user:1:events", str(i))
+    assert [queue.get_nowait(), queue.get_nowait()] == ["1", "2"]
+
+
+def test_publish_failure_is_swallowed(monkeypatch):
+    def unavailable(purpose):
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(events, "get_sync_redis", unavailable)
+    events.publish_event(1, events.resume_event("r1", "ready"))
+
+
+def test_sse_message_format():
+    assert events.sse_message('{"a": 1}', event="resume") == 'event: resume\ndata: {"a": 1}\n\n'
+    assert events.sse_message("one\ntwo") == "data: one\ndata: two\n\n"
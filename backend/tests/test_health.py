@@ -0,0 +1,70 @@
+import asyncio
+import pytest
+
+from app.health import CachedCheck, EventLoopMonitor, is_ready
+from app.utils import models
+
+@pytest.mark.asyncio
+async def test_cached_check_reuses_result_within_ttl():
+    calls = []
+
+    async def check():
+        calls.append(1)
+        return {}
+
+    cached = CachedCheck("dummy", check, ttl=60)
+    results = await asyncio.gather(*(cached.run() for _ in range(5)))
+    assert len(calls) == 1
+    assert all(r["status"] == "ok" for r in results)
+
+@pytest.mark.asyncio
+async def test_cached_check_reports_timeout_and_errors():
+    async def slow():
+        await asyncio.sleep(1)
+        return {}
+
+    async def broken():
+        raise RuntimeError("connection refused")
+
+    assert (await CachedCheck("slow", slow, timeout=0.01).run())["status"] == "timeout"
+    result = await CachedCheck("broken", broken).run()
+    assert result["status"] == "error" and "connection refused" in result["error"]
+
+@pytest.mark.asyncio
+async def test_event_loop_monitor_measures_blocking():
+    monitor = EventLoopMonitor(interval=0.01)
+    monitor.start()
+    await asyncio.sleep(0.02)
+    import time
+    time.sleep(0.1)  # block the loop
+    await asyncio.sleep(0.02)
+    await monitor.stop()
+    assert monitor.max_lag >= 0.05
+
+def test_readiness_ignores_redis_but_not_pool_saturation():
+    report = {
+        "database": {"status": "ok"},
+        "db_pool": {"saturated": False},
+        "redis": {"status": "error"},
+        "models": {"status": "warm", "warm": True},
+        "event_loop": {"lag_ms": 1.0},
+    }
+    assert is_ready(report)
+    report["db_pool"]["saturated"] = True
+    assert not is_ready(report)
+
+def test_readiness_waits_only_for_a_running_warm_up(monkeypatch):
+    monkeypatch.setattr(models, "MODEL_WARMUP", False)
+    models.reset()
+    report = {
+        "database": {"status": "ok"},
+        "db_pool": {"saturated": False},
+        "models": models.model_state(),
+        "event_loop": {"lag_ms": 1.0},
+    }
+    # MODEL_WARMUP=false: models load on first use and the process is ready at once
+    assert is_ready(report)
+    report["models"] = {"status": "degraded", "warm": False}
+    assert is_ready(report)
+    report["models"] = {"status": "warming", "warm": False}
+    assert not is_ready(report)
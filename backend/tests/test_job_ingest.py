@@ -0,0 +1,114 @@
+import json
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app import job_ingest
+from app.models import Base, Job
+from app.utils import models
+from app.utils.embeddings import from_bytes
+
+SKILLS = ["python", "docker", "aws"]
+
+
+class FakeEmbedder:
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts):
+        self.calls.append(list(texts))
+        return np.array([np.eye(len(SKILLS))[SKILLS.index(text)] * 2 for text in texts], dtype=np.float32)
+
+
+def fake_parse(texts, n_process=1):
+    for text in texts:
+        yield {"skills": [skill for skill in SKILLS if skill in text.lower()], "education": [], "experience": []}
+
+
+@pytest.fixture
+def embedder(monkeypatch):
+    fake = FakeEmbedder()
+    monkeypatch.setattr(models, "get", lambda name: fake)
+    monkeypatch.setattr(job_ingest, "parse_descriptions", fake_parse)
+    return fake
+
+
+@pytest.fixture
+def session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine, expire_on_commit=False)() as session:
+        yield session
+    engine.dispose()
+
+
+def feed(*postings):
+    return [json.dumps(posting) for posting in postings]
+
+
+def test_read_postings_reports_bad_lines():
+    errors = []
+    lines = feed({"title": "Dev", "description": "Python"}) + ["{oops", "", json.dumps({"title": "No description"})]
+
+    postings = list(job_ingest.read_postings(lines, errors))
+
+    assert [p["title"] for p in postings] == ["Dev"]
+    assert [e["line"] for e in errors] == [2, 4]
+
+
+def test_content_hash_ignores_whitespace_and_title_case():
+    assert job_ingest.content_hash("Backend  Dev", "Python\n and SQL") == job_ingest.content_hash("backend dev", "Python and SQL")
+    assert job_ingest.content_hash("Dev", "Python") != job_ingest.content_hash("Dev", "Java")
+
+
+def test_ingest_stores_requirements_and_embeddings(session, embedder):
+    postings = job_ingest.read_postings(feed(
+        {"title": "Backend", "description": "Python and Docker"},
+        {"title": "Cloud", "description": "AWS and Docker"},
+        {"title": "Manager", "description": "People skills"},
+    ), [])
+
+    stats = job_ingest.ingest(session, postings, batch_size=10)
+
+    assert stats == {"upserted": 3, "unchanged": 0}
+    # Each distinct skill of the batch is embedded once
+    assert embedder.calls == [["aws", "docker", "python"]]
+    jobs = {job.title: job for job in session.execute(select(Job)).scalars()}
+    backend = jobs["Backend"]
+    assert backend.requirements["skills"] == ["python", "docker"]
+    skill_vectors = from_bytes(backend.skill_embeddings, len(backend.requirements["skills"]))
+    assert skill_vectors.shape == (2, 3)
+    np.testing.assert_allclose(from_bytes(backend.embedding), [1 / np.sqrt(2), 1 / np.sqrt(2), 0], rtol=1e-6)
+    assert jobs["Manager"].embedding is None
+
+
+def test_unchanged_postings_are_skipped_and_refresh_upserts(session, embedder):
+    lines = feed({"title": "Backend", "description": "Python"}, {"title": "Backend", "description": "Python"})
+    assert job_ingest.ingest(session, job_ingest.read_postings(lines, []))["upserted"] == 1
+
+    assert job_ingest.ingest(session, job_ingest.read_postings(lines, [])) == {"upserted": 0, "unchanged": 2}
+    assert job_ingest.ingest(session, job_ingest.read_postings(lines, []), refresh=True)["upserted"] == 1
+    assert len(session.execute(select(Job)).scalars().all()) == 1
+
+
+def test_batches_commit_as_they_go(session, embedder):
+    lines = feed(*({"title": f"Job {i}", "description": "Docker"} for i in range(5)))
+
+    assert job_ingest.ingest(session, job_ingest.read_postings(lines, []), batch_size=2)["upserted"] == 5
+    assert len(embedder.calls) == 3
+
+
+def test_staged_batches_are_ingested_once_and_removed(session, embedder, tmp_path):
+    postings = job_ingest.read_postings(feed(*({"title": f"Job {i}", "description": "Docker"} for i in range(5))), [])
+
+    staged = list(job_ingest.stage_batches(postings, batch_size=2, directory=str(tmp_path / "feeds")))
+
+    assert [size for _, size in staged] == [2, 2, 1]
+    for path, _ in staged:
+        assert job_ingest.ingest_staged(session, path)["upserted"] >= 1
+        # A redelivered task finds its file gone and does nothing
+        assert job_ingest.ingest_staged(session, path) is None
+    assert len(session.execute(select(Job)).scalars().all()) == 5
+    assert list((tmp_path / "feeds").iterdir()) == []
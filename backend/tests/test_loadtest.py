@@ -0,0 +1,45 @@
+import json
+import os
+import subprocess
+import sys
+
+from loadtest.run import Recorder, parse_mix
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_recorder_reports_per_route_percentiles_and_errors():
+    recorder = Recorder()
+    for i in range(1, 101):
+        recorder.record("list", 200, i / 1000)
+    recorder.record("upload", 400, 0.05)
+    report = recorder.report(duration=10)
+
+    assert report["requests"] == 101
+    assert report["routes"]["list"]["rps"] == 10
+    assert round(report["routes"]["list"]["p50_ms"], 2) == 50.5
+    assert report["routes"]["upload"]["errors"] == 1
+
+
+def test_parse_mix_rejects_unknown_actions():
+    assert parse_mix("list=3,analyze") == {"list": 3.0, "analyze": 1.0}
+    try:
+        parse_mix("delete=1")
+    except ValueError as e:
+        assert "delete" in str(e)
+    else:
+        raise AssertionError("expected ValueError")
+
+
+def test_in_process_run_against_standins(tmp_path):
+    # Runs in a subprocess: booting replaces the model modules and app configuration
+    output = tmp_path / "report.json"
+    env = {**os.environ, "BCRYPT_ROUNDS": "4"}
+    subprocess.run(
+        [sys.executable, "-m", "loadtest.run", "--users", "2", "--duration", "1", "--ramp-up", "0",
+         "--model-cost-scale", "0", "--workdir", str(tmp_path / "work"), "--output", str(output)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, check=True, timeout=120,
+    )
+    report = json.loads(output.read_text())
+    assert {"register", "upload"} <= set(report["routes"])
+    assert all(route["errors"] == 0 for route in report["routes"].values())
@@ -0,0 +1,39 @@
+import pytest
+
+from app.utils.memory import rss_bytes, TracemallocSession
+
+def test_rss_grows_with_allocations():
+    before = rss_bytes()
+    block = bytearray(64 * 1024 * 1024)
+    block[::4096] = b"x" * len(block[::4096])  # touch every page
+    assert rss_bytes() - before > 32 * 1024 * 1024
+
+def test_tracemalloc_diff_reports_growth_site():
+    session = TracemallocSession()
+    session.start(frames=5)
+    try:
+        retained = [bytes(1024) for _ in range(2000)]
+        report = session.diff(limit=5)
+        assert report["top"][0]["size_diff_bytes"] > 1024 * 1000
+        assert "test_memory.py" in report["top"][0]["site"]
+        # The next diff is relative to the previous snapshot
+        assert session.diff(limit=5)["top"][0]["size_diff_bytes"] < 1024 * 1000
+    finally:
+        session.stop()
+    with pytest.raises(RuntimeError):
+        session.diff()
+    del retained
+
+def test_child_memory_limit_needs_a_baseline(monkeypatch):
+    from app.celery_worker import max_memory_per_child_kb
+
+    for name in ("CELERY_MAX_MEMORY_PER_CHILD_MB", "CELERY_CHILD_BASELINE_MB", "CELERY_MEMORY_GROWTH_LIMIT_MB"):
+        monkeypatch.delenv(name, raising=False)
+    assert max_memory_per_child_kb() is None
+    # A growth allowance alone does not enable recycling
+    monkeypatch.setenv("CELERY_MEMORY_GROWTH_LIMIT_MB", "256")
+    assert max_memory_per_child_kb() is None
+    monkeypatch.setenv("CELERY_CHILD_BASELINE_MB", "1024")
+    assert max_memory_per_child_kb() == 1280 * 1024
+    monkeypatch.setenv("CELERY_MAX_MEMORY_PER_CHILD_MB", "2048")
+    assert max_memory_per_child_kb() == 2048 * 1024
@@ -0,0 +1,67 @@
+import os
+import subprocess
+import sys
+
+from app import metrics
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WRITE_GAUGE = """
+from prometheus_client import Gauge, Counter
+Gauge('test_in_flight', 'in flight', multiprocess_mode='livesum').set({value})
+Counter('test_requests', 'requests').inc({value})
+import os; print(os.getpid())
+"""
+
+READ_REGISTRY = """
+from prometheus_client import generate_latest
+from app.metrics import aggregated_registry, mark_process_dead
+for pid in {dead}:
+    mark_process_dead(pid)
+print(generate_latest(aggregated_registry()).decode())
+"""
+
+
+def _run(code, directory):
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(directory)}
+    return subprocess.run(
+        [sys.executable, "-c", code], env=env, cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    ).stdout
+
+
+def test_refreshers_run_and_failures_are_isolated(monkeypatch):
+    monkeypatch.setattr(metrics, "_refreshers", [])
+    calls = []
+
+    def broken():
+        raise RuntimeError("pool gone")
+
+    metrics.register_refresher(broken)
+    metrics.register_refresher(lambda: calls.append(1))
+    metrics.run_refreshers()
+    assert calls == [1]
+
+
+def test_aggregates_across_processes_and_drops_dead_live_gauges(tmp_path):
+    first = int(_run(WRITE_GAUGE.format(value=2), tmp_path))
+    _run(WRITE_GAUGE.format(value=3), tmp_path)
+
+    output = _run(READ_REGISTRY.format(dead=[]), tmp_path)
+    assert "test_requests_total 5.0" in output
+    assert "test_in_flight 5.0" in output
+
+    output = _run(READ_REGISTRY.format(dead=[first]), tmp_path)
+    assert "test_requests_total 5.0" in output
+    assert "test_in_flight 3.0" in output
+
+
+def test_exporter_root_aggregates_every_service_directory(tmp_path):
+    # Laid out by start.sh and start-worker.sh under PROMETHEUS_MULTIPROC_ROOT
+    (tmp_path / "api").mkdir()
+    (tmp_path / "worker-ml").mkdir()
+    _run(WRITE_GAUGE.format(value=2), tmp_path / "api")
+    _run(WRITE_GAUGE.format(value=3), tmp_path / "worker-ml")
+
+    output = _run(READ_REGISTRY.format(dead=[]), tmp_path)
+    assert "test_requests_total 5.0" in output
+    assert "test_in_flight 5.0" in output
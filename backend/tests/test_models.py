@@ -0,0 +1,74 @@
+import sys
+import types
+
+import pytest
+
+from app.utils import models
+
+
+class FakeModel:
+    def __init__(self):
+        self.calls = 0
+
+    def run(self):
+        self.calls += 1
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    fast, broken = FakeModel(), FakeModel()
+    module = types.ModuleType("fake_models")
+    module.get_fast = lambda: fast
+    module.get_broken = lambda: broken
+    monkeypatch.setitem(sys.modules, "fake_models", module)
+    monkeypatch.setattr(models, "MODELS", {
+        "fast": ("fake_models", "get_fast", lambda model: model.run()),
+    })
+    models.reset()
+    yield {"fast": fast, "broken": broken, "module": module}
+    models.reset()
+
+
+def test_warm_up_loads_runs_and_reports_ready(registry):
+    assert models.model_state()["warm"] is False
+
+    state = models.warm_up()
+
+    assert state["warm"] is True
+    assert state["status"] == "warm"
+    assert state["models"] == {"fast": True}
+    assert "fast" in state["warmup_seconds"]
+    assert registry["fast"].calls == 1
+
+
+def test_warm_up_runs_once_per_process(registry):
+    models.warm_up()
+    models.warm_up()
+    assert registry["fast"].calls == 1
+
+
+def test_load_all_does_not_run_inference(registry):
+    models.load_all()
+    assert registry["fast"].calls == 0
+    assert models.model_state() == {"status": "warming", "warm": False, "models": {"fast": True}, "warmup_seconds": {}}
+
+
+def test_failed_warm_up_reports_degraded(registry, monkeypatch):
+    def fail(model):
+        raise RuntimeError("no weights")
+
+    monkeypatch.setitem(models.MODELS, "broken", ("fake_models", "get_broken", fail))
+
+    state = models.warm_up()
+
+    assert state["warm"] is False
+    assert state["status"] == "degraded"
+    assert "broken" in state["error"]
+    # Fixed later (e.g. weights appear): a retry succeeds
+    monkeypatch.setitem(models.MODELS, "broken", ("fake_models", "get_broken", lambda model: model.run()))
+    assert models.warm_up()["warm"] is True
+
+
+def test_disabled_warm_up_is_not_waited_for(registry, monkeypatch):
+    monkeypatch.setattr(models, "MODEL_WARMUP", False)
+    assert models.model_state()["status"] == "lazy"
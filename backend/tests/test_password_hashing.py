@@ -0,0 +1,63 @@
+import os
+import asyncio
+import threading
+import pytest
+from passlib.context import CryptContext
+
+os.environ.setdefault("BCRYPT_ROUNDS", "5")
+
+from app.utils import password_hashing
+from app.utils.password_hashing import hash_password, verify_password, PasswordHasherBusy
+
+@pytest.mark.asyncio
+async def test_hash_and_verify_round_trip():
+    password_hash = await hash_password("s3cret")
+    valid, new_hash = await verify_password("s3cret", password_hash)
+    assert valid is True
+    assert new_hash is None
+    valid, _ = await verify_password("wrong", password_hash)
+    assert valid is False
+
+@pytest.mark.asyncio
+async def test_outdated_cost_is_rehashed_on_verify():
+    old_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4)
+    old_hash = old_context.hash("s3cret")
+    valid, new_hash = await verify_password("s3cret", old_hash)
+    assert valid is True
+    assert new_hash is not None and new_hash != old_hash
+    assert password_hashing.pwd_context.verify("s3cret", new_hash)
+
+@pytest.mark.asyncio
+async def test_missing_hash_is_rejected():
+    # OAuth users have no password hash
+    assert await verify_password("s3cret", None) == (False, None)
+
+@pytest.mark.asyncio
+async def test_full_queue_sheds_load(monkeypatch):
+    monkeypatch.setattr(password_hashing, "PASSWORD_HASH_MAX_QUEUE", 0)
+    monkeypatch.setattr(password_hashing, "_pending", password_hashing.PASSWORD_HASH_WORKERS)
+    with pytest.raises(PasswordHasherBusy):
+        await hash_password("s3cret")
+
+@pytest.mark.asyncio
+async def test_cancelled_requests_release_their_queue_slot():
+    release = threading.Event()
+    blockers = [
+        asyncio.ensure_future(password_hashing._run("hash", release.wait))
+        for _ in range(password_hashing.PASSWORD_HASH_WORKERS)
+    ]
+    queued = asyncio.ensure_future(hash_password("s3cret"))
+    await asyncio.sleep(0.05)
+    depth = password_hashing.password_hash_queue_depth._value.get()
+    assert password_hashing._pending == password_hashing.PASSWORD_HASH_WORKERS + 1
+
+    # A client disconnect cancels the request before a hashing thread frees up
+    queued.cancel()
+    blockers[0].cancel()
+    await asyncio.sleep(0.05)
+    release.set()
+    await asyncio.gather(*blockers, queued, return_exceptions=True)
+    await asyncio.sleep(0.05)
+
+    assert password_hashing._pending == 0
+    assert password_hashing.password_hash_queue_depth._value.get() == depth - 1
@@ -0,0 +1,33 @@
+import os
+import time
+
+from app.utils import preload
+
+
+def test_smaps_rollup_splits_shared_and_private():
+    values = preload.smaps_rollup(os.getpid())
+    if values is None:
+        return  # no procfs
+    assert values["Rss"] > 0
+    assert values["shared"] + values["private"] <= values["Rss"] + 4096
+
+
+def test_memory_report_includes_children():
+    pid = os.fork()
+    if pid == 0:
+        time.sleep(5)
+        os._exit(0)
+    try:
+        time.sleep(0.2)
+        report = preload.memory_report(os.getpid())
+        if not report:
+            return  # no procfs
+        assert report[0]["role"] == "parent"
+        assert pid in [row["pid"] for row in report if row["role"] == "child"]
+    finally:
+        os.kill(pid, 9)
+        os.waitpid(pid, 0)
+
+
+def test_unreadable_process_is_skipped():
+    assert preload.smaps_rollup(2 ** 22 + 1) is None
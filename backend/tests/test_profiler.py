@@ -0,0 +1,36 @@
+import threading
+import time
+
+from app.utils.profiler import SamplingProfiler
+
+def busy_loop(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+def test_run_samples_other_threads_as_collapsed_stacks():
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_loop, args=(stop,), name="busy worker")
+    worker.start()
+    try:
+        profiler = SamplingProfiler(interval=0.001)
+        profiler.run(0.1)
+    finally:
+        stop.set()
+        worker.join()
+    lines = profiler.collapsed().splitlines()
+    busy = [line for line in lines if line.startswith("busy_worker;")]
+    assert busy and "busy_loop (test_profiler.py:" in busy[0]
+    stack, count = busy[0].rsplit(" ", 1)
+    assert int(count) > 0
+    # The sampler never records itself
+    assert not any("SamplingProfiler" in line or "sample (profiler.py" in line for line in lines)
+
+def test_background_profiler_limited_to_one_thread():
+    profiler = SamplingProfiler(interval=0.001, thread_id=threading.get_ident())
+    profiler.start()
+    deadline = time.monotonic() + 0.05
+    while time.monotonic() < deadline:
+        sum(range(1000))
+    samples = profiler.stop()
+    assert samples
+    assert all(stack.startswith("MainThread;") for stack in samples)
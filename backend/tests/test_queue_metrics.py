@@ -0,0 +1,79 @@
+import json
+import types
+
+import fakeredis
+import pytest
+
+from app import queue_metrics
+
+
+@pytest.fixture
+def broker():
+    return fakeredis.FakeRedis(decode_responses=True)
+
+
+def message(enqueued_at):
+    return json.dumps({"body": "", "headers": {"task": "process_pdf", "enqueued_at": enqueued_at}, "properties": {}})
+
+
+def test_queue_stats_spans_priority_lists(broker):
+    high, low = queue_metrics.priority_keys("ml")[0], queue_metrics.priority_keys("ml")[9]
+    broker.lpush(high, message(990.0))
+    broker.lpush(high, message(995.0))
+    broker.lpush(low, message(900.0))
+
+    stats = queue_metrics.queue_stats(broker, "ml", now=1000.0)
+
+    assert stats == {"depth": 3, "oldest_age": 100.0}
+
+
+def test_empty_queue_has_no_age(broker):
+    assert queue_metrics.queue_stats(broker, "ml", now=1000.0) == {"depth": 0, "oldest_age": 0.0}
+
+
+def test_desired_workers_drains_backlog_within_target(monkeypatch):
+    monkeypatch.setattr(queue_metrics, "QUEUE_MIN_WORKERS", 1)
+    monkeypatch.setattr(queue_metrics, "QUEUE_MAX_WORKERS", 10)
+    # 120 tasks of 2s within 60s
+    assert queue_metrics.desired_workers(120, 2.0, 60) == 4
+    assert queue_metrics.desired_workers(0, 2.0, 60) == 1
+    assert queue_metrics.desired_workers(5, None, 60) == 1
+    assert queue_metrics.desired_workers(10000, 2.0, 60) == 10
+
+
+def test_runtime_ewma_moves_toward_new_samples(broker):
+    assert queue_metrics.update_runtime_ewma(broker, "ml", 10.0, alpha=0.5) == 10.0
+    assert queue_metrics.update_runtime_ewma(broker, "ml", 20.0, alpha=0.5) == 15.0
+    assert float(broker.hget(queue_metrics.RUNTIME_EWMA_KEY, "ml")) == 15.0
+
+
+def test_collector_exports_depth_and_desired_workers(broker, monkeypatch):
+    monkeypatch.setenv("CELERY_ML_TARGET_LATENCY", "10")
+    for _ in range(20):
+        broker.lpush("ml", message(0.0))
+    broker.hset(queue_metrics.RUNTIME_EWMA_KEY, "ml", 2.0)
+
+    families = {f.name: f for f in queue_metrics.QueueCollector(broker, broker, ["ml"]).collect()}
+
+    def value(name):
+        return families[name].samples[0].value
+
+    assert value("celery_queue_depth") == 20
+    assert value("celery_queue_runtime_ewma_seconds") == 2.0
+    assert value("celery_queue_desired_workers") == 4
+    assert value("celery_queue_oldest_message_age_seconds") > 0
+
+
+def test_wait_measured_from_enqueue_header(monkeypatch):
+    headers = {}
+    queue_metrics.stamp_enqueued_at(headers=headers)
+    request = types.SimpleNamespace(enqueued_at=headers["enqueued_at"] - 3, eta=None,
+                                    delivery_info={"routing_key": "interactive"})
+    task = types.SimpleNamespace(name="process_pdf", request=request)
+    histogram = queue_metrics.task_wait_seconds.labels(queue="interactive", task="process_pdf")
+    before = histogram._sum.get()
+
+    queue_metrics.record_task_wait(task_id="t1", task=task)
+
+    assert histogram._sum.get() - before >= 3
+    queue_metrics._task_started.pop("t1")
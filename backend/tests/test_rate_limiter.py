@@ -0,0 +1,79 @@
+import pytest
+from fastapi import HTTPException
+
+from app.rate_limiter import RateLimitStore, RateLimit
+
+class FakeScript:
+    def __init__(self, counts=None, fail=False):
+        self.counts = counts or {}
+        self.fail = fail
+        self.calls = []
+
+    async def __call__(self, keys, args):
+        self.calls.append((keys, args))
+        if self.fail:
+            raise ConnectionError("redis down")
+        results = []
+        for i, key in enumerate(keys):
+            self.counts[key] = self.counts.get(key, 0) + args[2 * i]
+            results.append([self.counts[key], args[2 * i + 1]])
+        return results
+
+class FakeRedis:
+    def __init__(self, script):
+        self.script = script
+
+    def register_script(self, source):
+        return self.script
+
+class FakeRequest:
+    def __init__(self, path="/v1/resumes", host="1.2.3.4"):
+        self.scope = {}
+        self.headers = {}
+        self.url = type("URL", (), {"path": path})()
+        self.client = type("Client", (), {"host": host})()
+
+def test_local_bucket_enforces_limit():
+    store = RateLimitStore()
+    for _ in range(5):
+        assert store.hit("k", 5, 60) == 0
+    assert store.hit("k", 5, 60) > 0
+
+@pytest.mark.asyncio
+async def test_dependency_raises_429_with_retry_after():
+    store = RateLimitStore()
+    limit = RateLimit(times=1, seconds=60, store=store)
+    await limit(FakeRequest())
+    with pytest.raises(HTTPException) as exc:
+        await limit(FakeRequest())
+    assert exc.value.status_code == 429
+    assert int(exc.value.headers["Retry-After"]) >= 1
+    # Other clients have their own bucket
+    await limit(FakeRequest(host="5.6.7.8"))
+
+@pytest.mark.asyncio
+async def test_sync_batches_hits_and_applies_global_count():
+    script = FakeScript(counts={"ratelimit:k": 8})
+    store = RateLimitStore()
+    store.redis = FakeRedis(script)
+    store._script = script
+    store.hit("k", 10, 60)
+    store.hit("k", 10, 60)
+    await store.sync()
+    keys, args = script.calls[0]
+    assert keys == ["ratelimit:k"] and args == [2, 60000]
+    # Other processes used the rest of the window
+    assert store.hit("k", 10, 60) > 0
+    # Nothing pending, so no round trip
+    await store.sync()
+    assert len(script.calls) == 1
+
+@pytest.mark.asyncio
+async def test_sync_failure_degrades_to_local_only():
+    store = RateLimitStore()
+    store._script = FakeScript(fail=True)
+    store.hit("k", 2, 60)
+    await store.sync()
+    assert store._degraded is True
+    assert store.hit("k", 2, 60) == 0
+    assert store.hit("k", 2, 60) > 0
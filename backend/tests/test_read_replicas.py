@@ -0,0 +1,99 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import Column, Integer, String, delete
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import declarative_base
+
+from app import db
+from app.db import get_read_db, primary_sticky, READ_YOUR_WRITES_COOKIE
+
+Base = declarative_base()
+
+class Note(Base):
+    __tablename__ = "notes"
+    id = Column(Integer, primary_key=True)
+    body = Column(String)
+
+def make_request(cookies=None):
+    return SimpleNamespace(cookies=cookies or {}, state=SimpleNamespace())
+
+class FakeReplica:
+    name = "replica-0"
+
+    def sessionmaker(self):
+        return AsyncSession(create_async_engine("sqlite+aiosqlite://"))
+
+class FakeRouter:
+    def __init__(self, replica):
+        self.replica = replica
+
+    async def pick(self):
+        return self.replica
+
+async def session_for(request):
+    generator = get_read_db(request)
+    session = await generator.__anext__()
+    await generator.aclose()
+    return session
+
+def test_sticky_cookie_window():
+    assert primary_sticky(make_request({READ_YOUR_WRITES_COOKIE: str(time.time() + 5)}))
+    assert not primary_sticky(make_request({READ_YOUR_WRITES_COOKIE: str(time.time() - 5)}))
+    assert not primary_sticky(make_request({READ_YOUR_WRITES_COOKIE: "garbage"}))
+
+@pytest.mark.asyncio
+async def test_reads_route_to_replica_unless_sticky_or_lagging(monkeypatch):
+    replica = FakeReplica()
+    monkeypatch.setattr(db, "replica_router", FakeRouter(replica))
+    session = await session_for(make_request())
+    assert str(session.bind.url).startswith("sqlite")
+
+    sticky = make_request({READ_YOUR_WRITES_COOKIE: str(time.time() + 5)})
+    assert (await session_for(sticky)).bind is db.engine
+
+    monkeypatch.setattr(db, "replica_router", FakeRouter(None))
+    assert (await session_for(make_request())).bind is db.engine
+
+@pytest.mark.asyncio
+async def test_writes_flag_the_request_for_stickiness():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    request = make_request()
+    async with AsyncSession(engine) as session:
+        session.info["request"] = request
+        await session.get(Note, 1)
+        assert not getattr(request.state, "wrote_to_primary", False)
+        session.add(Note(body="hello"))
+        await session.flush()
+    assert request.state.wrote_to_primary is True
+
+    request = make_request()
+    async with AsyncSession(engine) as session:
+        session.info["request"] = request
+        await session.execute(delete(Note))
+    assert request.state.wrote_to_primary is True
+    await engine.dispose()
+
+class HangingEngine:
+    def connect(self):
+        return self
+
+    async def __aenter__(self):
+        await asyncio.sleep(60)
+
+    async def __aexit__(self, *exc):
+        return False
+
+@pytest.mark.asyncio
+async def test_lag_check_times_out_on_an_unreachable_replica(monkeypatch):
+    monkeypatch.setattr(db, "REPLICA_LAG_CHECK_TIMEOUT", 0.05)
+    replica = db.Replica("replica-0", "sqlite+aiosqlite://")
+    replica.engine = HangingEngine()
+    started = time.monotonic()
+    assert await replica.current_lag() is None
+    assert time.monotonic() - started < 1
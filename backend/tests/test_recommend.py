@@ -0,0 +1,137 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app import recommend
+from app.models import Base, User, Resume, ResumeStatus, Job, Match
+from app.utils import models
+from app.utils.embeddings import to_bytes
+
+SKILLS = ["python", "docker", "aws", "react"]
+
+
+class FakeEmbedder:
+    def encode(self, texts):
+        return np.array([np.eye(len(SKILLS))[SKILLS.index(text)] for text in texts], dtype=np.float32)
+
+
+class FakeMatcher:
+    """Scores by skill-embedding overlap, like the real matcher's skills component"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def calculate_overall_match_score(self, resume_data, job_data, weights=None, resume_embeddings=None,
+                                      job_embeddings=None):
+        self.calls += 1
+        assert job_embeddings is not None
+        return {"overall_score": float((resume_embeddings @ job_embeddings.T).max(axis=1).mean())}
+
+
+def job(job_id, title, skills, updated_at):
+    vectors = FakeEmbedder().encode(skills)
+    mean = vectors.mean(axis=0)
+    return Job(
+        id=job_id, title=title, requirements={"skills": skills, "education": [], "experience": []},
+        content_hash=f"{job_id:064d}", skill_embeddings=to_bytes(vectors),
+        embedding=to_bytes(mean / np.linalg.norm(mean)), updated_at=updated_at,
+    )
+
+
+@pytest.fixture
+def matcher(monkeypatch):
+    fake = FakeMatcher()
+    registry = {"embedder": FakeEmbedder(), "skills_matcher": fake}
+    monkeypatch.setattr(models, "get", registry.__getitem__)
+    monkeypatch.setattr(recommend, "VECTOR_INDEX_PATH", "/nonexistent/job-index")
+    monkeypatch.setattr(recommend, "VECTOR_INDEX_SYNC_SECONDS", 0)
+    recommend.reset_index()
+    yield fake
+    recommend.reset_index()
+
+
+@pytest.fixture
+def session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'recommend.db'}")
+    Base.metadata.create_all(engine)
+    now = datetime.now(timezone.utc)
+    with sessionmaker(bind=engine, expire_on_commit=False)() as session:
+        session.add(User(id=1, name="a", email="a@example.com", provider="email"))
+        session.add_all([
+            job(1, "Backend", ["python", "docker"], now),
+            job(2, "Frontend", ["react"], now),
+            job(3, "Cloud", ["aws", "docker"], now),
+            Job(id=4, title="Legacy", requirements={"skills": []}),
+        ])
+        session.add_all([
+            Resume(id="r1", filename="a.pdf", user_id=1, skills=["python", "docker"], status=ResumeStatus.ready),
+            Resume(id="r2", filename="b.pdf", user_id=1, skills=[], status=ResumeStatus.ready),
+        ])
+        session.commit()
+        yield session
+    engine.dispose()
+
+
+def stored_matches(session, resume_id):
+    return session.execute(
+        select(Match.job_id, Match.score).where(Match.resume_id == resume_id).order_by(Match.score.desc())
+    ).all()
+
+
+def test_top_k_jobs_are_reranked_and_stored(session, matcher):
+    result = recommend.recommend(session, ["r1", "r2"], k=2)
+
+    assert [match["job_id"] for match in result["r1"]] == [1, 3]
+    assert result["r1"][0]["score"] == pytest.approx(1.0)
+    assert result["r2"] == []
+    assert [job_id for job_id, _ in stored_matches(session, "r1")] == [1, 3]
+    # Only candidates from the index are scored; the unembedded job never is
+    assert matcher.calls == 3
+
+
+def test_recomputing_replaces_matches(session, matcher):
+    recommend.recommend(session, ["r1"], k=3)
+    recommend.recommend(session, ["r1"], k=1)
+
+    assert [job_id for job_id, _ in stored_matches(session, "r1")] == [1]
+
+
+def test_index_picks_up_new_and_changed_jobs(session, matcher):
+    recommend.recommend(session, ["r1"], k=1)
+    later = datetime.now(timezone.utc) + timedelta(seconds=1)
+    session.get(Job, 1).skill_embeddings = None
+    session.get(Job, 1).embedding = None
+    session.get(Job, 1).updated_at = later
+    session.add(job(5, "Python platform", ["python", "docker", "aws"], later))
+    session.commit()
+
+    result = recommend.recommend(session, ["r1"], k=3)
+
+    assert 1 not in recommend.get_job_index(session)
+    assert [match["job_id"] for match in result["r1"]][0] == 5
+
+
+def test_build_index_saves_a_loadable_copy(session, matcher, tmp_path):
+    built = recommend.build_index(session, str(tmp_path / "index"))
+
+    loaded = recommend.load_index(str(tmp_path / "index"))
+    assert len(loaded) == len(built) == 3
+    assert loaded.meta["synced_until"] == built.meta["synced_until"]
+    # Every job was stamped within the safety window behind the high-water mark, so all are read again
+    assert recommend.sync_index(session, loaded) == 4
+
+
+def test_sync_picks_up_late_commits_stamped_before_the_high_water_mark(session, matcher):
+    index = recommend.get_job_index(session)
+    synced_until = datetime.fromisoformat(index.meta["synced_until"])
+    # A writer stamped this row before the last sync but committed after it
+    session.add(job(5, "Python platform", ["python", "docker", "aws"], synced_until - timedelta(seconds=30)))
+    session.commit()
+
+    recommend.sync_index(session, index)
+
+    assert 5 in index
+    assert index.meta["synced_until"] == synced_until.isoformat()
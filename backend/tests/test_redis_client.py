@@ -0,0 +1,28 @@
+import pytest
+
+from app import redis_client
+from app.redis_client import redis_url, get_async_redis, get_sync_redis, celery_redis_config
+
+def test_each_purpose_gets_its_own_logical_db(monkeypatch):
+    monkeypatch.setattr(redis_client, "REDIS_URL", "redis://:secret@cache.internal:6380/0")
+    assert redis_url("limiter") == "redis://:secret@cache.internal:6380/2"
+    monkeypatch.setenv("REDIS_DB_LIMITER", "7")
+    assert redis_url("limiter") == "redis://:secret@cache.internal:6380/7"
+    with pytest.raises(ValueError):
+        redis_url("unknown")
+
+def test_clients_share_one_bounded_pool_per_purpose(monkeypatch):
+    monkeypatch.setenv("REDIS_MAX_CONNECTIONS_CACHE", "3")
+    monkeypatch.setattr(redis_client, "_async_clients", {})
+    monkeypatch.setattr(redis_client, "_sync_clients", {})
+    client = get_async_redis("cache")
+    assert get_async_redis("cache") is client
+    assert client.connection_pool.max_connections == 3
+    assert get_sync_redis("cache").connection_pool.max_connections == 3
+
+def test_celery_config_uses_pooling_policy(monkeypatch):
+    monkeypatch.delenv("CELERY_BROKER_URL", raising=False)
+    config = celery_redis_config()
+    assert config["broker_url"].endswith("/0")
+    assert config["broker_transport_options"]["socket_keepalive"] is redis_client.REDIS_SOCKET_KEEPALIVE
+    assert config["broker_pool_limit"] == redis_client.max_connections("celery_broker")
@@ -0,0 +1,23 @@
+import time
+
+from app.utils.stage_timer import stage, collect_timings, server_timing_header, pipeline_stage_seconds
+
+def test_stages_accumulate_into_request_breakdown():
+    with collect_timings() as timings:
+        with stage("spacy"):
+            time.sleep(0.01)
+        with stage("embed"):
+            pass
+        with stage("spacy"):
+            time.sleep(0.01)
+    assert list(timings) == ["spacy", "embed"]
+    assert timings["spacy"] >= 0.02
+
+def test_stages_outside_a_request_only_feed_the_histogram():
+    before = pipeline_stage_seconds.labels(stage="pdf_extract")._sum.get()
+    with stage("pdf_extract"):
+        time.sleep(0.005)
+    assert pipeline_stage_seconds.labels(stage="pdf_extract")._sum.get() > before
+
+def test_server_timing_header_format():
+    assert server_timing_header({"pdf_extract": 0.0123, "db": 0.002}) == "pdf_extract;dur=12.3, db;dur=2.0"
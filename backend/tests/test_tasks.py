@@ -0,0 +1,99 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import db
+from app.models import Base, User, Resume, ResumeStatus
+from app.utils import models
+from app.tasks import process_pdf
+
+
+class FakeParser:
+    def __init__(self, error=None):
+        self.error = error
+
+    def parse_resume(self, path):
+        if self.error:
+            raise self.error
+        return {"skills": ["python", "docker"]}
+
+
+@pytest.fixture
+def session_factory(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'tasks.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine, expire_on_commit=False)
+    monkeypatch.setattr(db, "_sync_sessionmaker", factory)
+    with factory() as session:
+        session.add(User(id=1, name="a", email="a@example.com", provider="email"))
+        session.add(Resume(id="r1", filename="cv.pdf", user_id=1, skills=[]))
+        session.commit()
+    yield factory
+    engine.dispose()
+
+
+def use_parser(monkeypatch, parser):
+    monkeypatch.setattr(models, "get", lambda name: parser)
+
+
+def resume(factory):
+    with factory() as session:
+        return session.get(Resume, "r1")
+
+
+def test_new_resume_is_queued(session_factory):
+    assert resume(session_factory).status == ResumeStatus.queued
+
+
+def test_success_stores_skills_and_ready_status(session_factory, monkeypatch):
+    use_parser(monkeypatch, FakeParser())
+
+    assert process_pdf.run("r1", "/tmp/cv.pdf") is None
+
+    stored = resume(session_factory)
+    assert stored.status == ResumeStatus.ready
+    assert stored.skills == ["python", "docker"]
+    assert stored.processed_at is not None
+
+
+def test_retryable_error_requeues(session_factory, monkeypatch):
+    use_parser(monkeypatch, FakeParser(RuntimeError("model busy")))
+
+    with pytest.raises(RuntimeError):
+        process_pdf.run("r1", "/tmp/cv.pdf")
+
+    assert resume(session_factory).status == ResumeStatus.queued
+
+
+def test_last_attempt_marks_failed(session_factory, monkeypatch):
+    use_parser(monkeypatch, FakeParser(RuntimeError("corrupt pdf")))
+    process_pdf.push_request(retries=process_pdf.max_retries)
+    try:
+        with pytest.raises(RuntimeError):
+            process_pdf.run("r1", "/tmp/cv.pdf")
+    finally:
+        process_pdf.pop_request()
+
+    stored = resume(session_factory)
+    assert stored.status == ResumeStatus.failed
+    assert stored.error == "corrupt pdf"
+
+
+def test_sync_url_swaps_driver():
+    assert db.sync_url("postgresql+asyncpg://u:p@h/db") == "postgresql+psycopg2://u:p@h/db"
+    assert db.sync_url("sqlite+aiosqlite:///x.db") == "sqlite:///x.db"
+    with pytest.raises(ValueError):
+        db.sync_url("mysql+aiomysql://h/db")
+
+
+def test_status_changes_published_to_owner(session_factory, monkeypatch):
+    from app import tasks
+
+    published = []
+    monkeypatch.setattr(tasks, "publish_event", lambda user_id, event: published.append((user_id, event)))
+    use_parser(monkeypatch, FakeParser())
+
+    process_pdf.run("r1", "/tmp/cv.pdf", 1)
+
+    assert [(user_id, event["status"]) for user_id, event in published] == [(1, "processing"), (1, "ready")]
+    assert published[-1][1]["skills"] == ["python", "docker"]
@@ -0,0 +1,42 @@
+import os
+
+from app.utils import thread_budget
+
+
+def test_threads_divided_between_processes(monkeypatch):
+    monkeypatch.setattr(thread_budget, "COMPUTE_THREADS", None)
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+    monkeypatch.setenv("CELERY_CONCURRENCY", "3")
+    assert thread_budget.threads_per_process("api", cpus=8) == 2
+    assert thread_budget.threads_per_process("worker", cpus=8) == 2
+    # Never below one thread, even with more processes than CPUs
+    assert thread_budget.threads_per_process("api", cpus=2) == 1
+
+
+def test_explicit_thread_count_wins(monkeypatch):
+    monkeypatch.setattr(thread_budget, "COMPUTE_THREADS", "3")
+    monkeypatch.setenv("WEB_CONCURRENCY", "8")
+    assert thread_budget.threads_per_process("api", cpus=4) == 3
+
+
+def test_configure_sets_library_limits_without_overriding_operator(monkeypatch):
+    monkeypatch.setattr(thread_budget, "COMPUTE_THREADS", None)
+    monkeypatch.setattr(thread_budget, "usable_cpus", lambda: 8)
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+    for name in thread_budget.THREAD_ENV_VARS + ("TOKENIZERS_PARALLELISM",):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("MKL_NUM_THREADS", "1")
+
+    settings = thread_budget.configure("api")
+
+    assert settings == {"role": "api", "cpus": 8, "processes": 4, "threads": 2}
+    assert os.environ["OMP_NUM_THREADS"] == "2"
+    assert os.environ["MKL_NUM_THREADS"] == "1"
+    assert os.environ["TOKENIZERS_PARALLELISM"] == "false"
+    assert thread_budget.compute_threads_gauge.labels(library="mkl")._value.get() == 1
+
+
+def test_pinning_is_opt_in(monkeypatch):
+    monkeypatch.setattr(thread_budget, "CPU_AFFINITY", False)
+    assert thread_budget.pin_to_slice(0, 4) is None
+    assert thread_budget.usable_cpus() >= 1
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from app.utils import vector_index
+from app.utils.vector_index import VectorIndex, normalize
+
+
+@pytest.fixture
+def vectors():
+    return np.random.default_rng(0).standard_normal((500, 16)).astype(np.float32)
+
+
+def brute_force(vectors, ids, query, k):
+    scores = normalize(vectors) @ normalize(query)[0]
+    order = np.argsort(-scores)[:k]
+    return np.asarray(ids)[order]
+
+
+def test_search_matches_brute_force_across_blocks(vectors, monkeypatch):
+    monkeypatch.setattr(vector_index, "SEARCH_BLOCK_SIZE", 64)
+    index = VectorIndex()
+    index.add(range(100, 600), vectors)
+    queries = vectors[:3] + 0.1
+
+    ids, scores = index.search(queries, 10)
+
+    assert ids.shape == scores.shape == (3, 10)
+    for query, found in zip(queries, ids):
+        np.testing.assert_array_equal(found, brute_force(vectors, range(100, 600), query, 10))
+    assert (np.diff(scores, axis=1) <= 0).all()
+
+
+def test_add_replaces_and_remove_deletes(vectors):
+    index = VectorIndex()
+    index.add([1, 2, 3], vectors[:3])
+
+    index.add([2], vectors[3:4])
+    index.remove([1, 42])
+
+    assert len(index) == 2 and 1 not in index
+    ids, scores = index.search(vectors[3], 5)
+    assert ids[0].tolist()[0] == 2
+    assert ids.shape == (1, 2)
+    assert scores[0][0] == pytest.approx(1.0, abs=1e-5)
+
+
+def test_save_and_load_keeps_results_and_accepts_updates(vectors, tmp_path):
+    index = VectorIndex(meta={"synced_until": "2024-01-01T00:00:00"})
+    index.add(range(len(vectors)), vectors)
+    expected, _ = index.search(vectors[7], 5)
+    index.save(tmp_path)
+
+    loaded = VectorIndex.load(tmp_path)
+    ids, _ = loaded.search(vectors[7], 5)
+    np.testing.assert_array_equal(ids, expected)
+    assert loaded.meta["synced_until"] == "2024-01-01T00:00:00"
+    assert not loaded._base_vectors.flags.writeable
+
+    # Updates land in the delta segment; the mapped base only gets masked
+    loaded.add([7], -vectors[7:8])
+    loaded.add([1000], vectors[7:8])
+    loaded.remove([int(expected[0][1])])
+    ids, _ = loaded.search(vectors[7], 3)
+    assert ids[0][0] == 1000 and 7 not in ids[0].tolist() and int(expected[0][1]) not in ids[0].tolist()
+
+    loaded.save(tmp_path)
+    compacted = VectorIndex.load(tmp_path)
+    assert len(compacted) == len(vectors)
+    np.testing.assert_array_equal(compacted.search(vectors[7], 3)[0], ids)
+    # The replaced version's files are removed
+    version = vector_index._read_manifest(tmp_path)["version"]
+    assert sorted(p.name for p in tmp_path.glob("*.npy")) == [f"ids-{version}.npy", f"vectors-{version}.npy"]
+
+
+def test_empty_and_missing_indexes(tmp_path):
+    ids, scores = VectorIndex().search(np.ones(4), 3)
+    assert ids.shape == (1, 0)
+    with pytest.raises(FileNotFoundError):
+        VectorIndex.load(tmp_path)
+    with pytest.raises(ValueError):
+        index = VectorIndex()
+        index.add([1], np.ones((1, 4)))
+        index.add([2], np.ones((1, 5)))